@@ -0,0 +1,191 @@
+"""
+Columnar analytics export of the notary network.
+
+Next to the RDF, the conversion can write flat tables of notaries, name
+variants, address and occupation roles, events, relations and inventory books
+in the same pass. Every table is a gzip-compressed CSV file with a typed
+header (`name:type`):
+
+    * `int`, `float` and `date` (ISO 8601) columns hold plain values;
+    * `str` columns hold plain strings;
+    * `dict` columns are dictionary-encoded: they hold integer codes into
+      `<table>.<column>.dict.csv.gz` (with `code` and `value` columns).
+
+`schema.json` lists the tables, their columns and row counts. Rows are
+streamed to disk as they are added, only the dictionaries are kept in memory.
+"""
+
+import csv
+import gzip
+import json
+import os
+
+TABLES = {
+    'notaries': [
+        ('id', 'int'),
+        ('name', 'str'),
+        ('title', 'dict'),
+        ('firstName', 'dict'),
+        ('patronym', 'dict'),
+        ('prefix', 'dict'),
+        ('lastName', 'dict'),
+        ('place', 'dict'),
+        ('col_id', 'int'),
+        ('section_id', 'int'),
+        ('rep_id', 'int'),
+        ('portrait', 'str'),
+        ('uri', 'str'),
+    ],
+    'nameVariants': [
+        ('notary', 'int'),
+        ('name', 'str'),
+    ],
+    'addresses': [
+        ('notary', 'int'),
+        ('role', 'int'),
+        ('address', 'int'),
+        ('street', 'dict'),
+        ('from', 'dict'),
+        ('to', 'dict'),
+        ('earliestBegin', 'date'),
+        ('latestBegin', 'date'),
+        ('earliestEnd', 'date'),
+        ('latestEnd', 'date'),
+        ('adamlink', 'dict'),
+        ('adamlinkConfidence', 'float'),
+    ],
+    'occupations': [
+        ('notary', 'int'),
+        ('role', 'int'),
+        ('occupation', 'dict'),
+        ('from', 'dict'),
+        ('to', 'dict'),
+        ('earliestBegin', 'date'),
+        ('latestBegin', 'date'),
+        ('earliestEnd', 'date'),
+        ('latestEnd', 'date'),
+    ],
+    'events': [
+        ('notary', 'int'),
+        ('event', 'int'),
+        ('type', 'dict'),
+        ('date', 'dict'),
+        ('earliestBegin', 'date'),
+        ('latestBegin', 'date'),
+        ('earliestEnd', 'date'),
+        ('latestEnd', 'date'),
+        ('place', 'dict'),
+    ],
+    'relations': [
+        ('source', 'int'),
+        ('target', 'int'),
+        ('type', 'dict'),
+        ('property', 'dict'),
+    ],
+    'inventoryBooks': [
+        ('notary', 'int'),
+        ('code', 'str'),
+        ('uri', 'str'),
+    ],
+}
+
+
+class Table:
+
+    def __init__(self, directory: str, name: str, columns: list):
+        self.directory = directory
+        self.name = name
+        self.columns = columns
+        self.dictionaries = {
+            column: {}
+            for column, columnType in columns if columnType == 'dict'
+        }
+        self.rows = 0
+
+        self.file = gzip.open(os.path.join(directory, f"{name}.csv.gz"),
+                              'wt',
+                              newline='',
+                              encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(
+            [f"{column}:{columnType}" for column, columnType in columns])
+
+    def _encode(self, column: str, columnType: str, value):
+        if value is None or value == '':
+            return ''
+        elif columnType == 'dict':
+            dictionary = self.dictionaries[column]
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            return code
+        elif columnType == 'int':
+            return int(value)
+        else:
+            return str(value)
+
+    def add(self, row: dict):
+        self.writer.writerow([
+            self._encode(column, columnType, row.get(column))
+            for column, columnType in self.columns
+        ])
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+        for column, dictionary in self.dictionaries.items():
+            path = os.path.join(self.directory,
+                                f"{self.name}.{column}.dict.csv.gz")
+            with gzip.open(path, 'wt', newline='',
+                           encoding='utf-8') as outfile:
+                writer = csv.writer(outfile)
+                writer.writerow(['code:int', 'value:str'])
+                for value, code in dictionary.items():
+                    writer.writerow([code, value])
+
+
+class ColumnarWriter:
+    """Writes the analytics tables to a directory.
+
+    Args:
+        directory (str): Destination directory.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.tables = {
+            name: Table(directory, name, columns)
+            for name, columns in TABLES.items()
+        }
+
+    def add(self, table: str, **row):
+        self.tables[table].add(row)
+
+    def close(self) -> dict:
+        """Finish all tables and write `schema.json`.
+
+        Returns:
+            dict: Number of rows per table.
+        """
+
+        schema = {}
+        for name, table in self.tables.items():
+            table.close()
+            schema[name] = {
+                'file': f"{name}.csv.gz",
+                'rows': table.rows,
+                'columns': [{
+                    'name': column,
+                    'type': columnType,
+                    'dictionary': f"{name}.{column}.dict.csv.gz"
+                    if columnType == 'dict' else None
+                } for column, columnType in table.columns]
+            }
+
+        with open(os.path.join(self.directory, 'schema.json'), 'w') as outfile:
+            json.dump(schema, outfile, indent=4)
+
+        return {name: table.rows for name, table in self.tables.items()}
@@ -0,0 +1,150 @@
+"""
+Long-running conversion worker that keeps the pipeline warm.
+
+Every run of `main.py` first imports rdflib and RDFAlchemy, loads the lookup
+tables in `data/` and builds the place and street indices. This worker does
+that once and then converts jobs from a queue directory:
+
+```bash
+python daemon.py queue/
+```
+
+A job is a JSON file in the queue directory with the path of a saved export
+and the destination, plus any keyword arguments of `main.main`:
+
+```json
+{"export": "data/notarissen.json", "target": "trig/notarissennetwerk.trig",
+ "options": {"canonical": true}}
+```
+
+The worker claims a job by renaming it to `<job>.running`, and writes the
+output path and run report (or the error) to `<job>.result.json` when done.
+Use `submit` and `waitForResult` to do this from Python.
+"""
+
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+
+import main
+
+JOB_SUFFIX = '.job.json'
+
+
+def submit(queue: str, export: str, target: str, **options) -> str:
+    """Put a conversion job in the queue.
+
+    Returns:
+        str: Path of the job file.
+    """
+
+    os.makedirs(queue, exist_ok=True)
+
+    job = os.path.join(queue, f"{time.time():.6f}-{uuid.uuid4().hex[:8]}")
+    with open(job + '.tmp', 'w') as outfile:
+        json.dump({
+            'export': export,
+            'target': target,
+            'options': options
+        }, outfile)
+    os.replace(job + '.tmp', job + JOB_SUFFIX)
+
+    return job + JOB_SUFFIX
+
+
+def resultPath(job: str) -> str:
+    return job[:-len(JOB_SUFFIX)] + '.result.json'
+
+
+def waitForResult(job: str, timeout: float = None,
+                  interval: float = 0.05) -> dict:
+    """Wait until the worker has written the result of a job."""
+
+    path = resultPath(job)
+    start = time.monotonic()
+
+    while not os.path.exists(path):
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise TimeoutError(f"No result for {job} after {timeout}s")
+        time.sleep(interval)
+
+    with open(path) as infile:
+        return json.load(infile)
+
+
+def runJob(job: dict) -> dict:
+
+    start = time.perf_counter()
+
+    with open(job['export']) as infile:
+        loadData = json.load(infile)
+
+    report = main.main(loadData=loadData,
+                       target=job['target'],
+                       **job.get('options', {}))
+
+    return {
+        'status': 'ok',
+        'target': job['target'],
+        'report': report,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def work(queue: str, interval: float = 0.1, once: bool = False):
+    """Convert the jobs in `queue`, oldest first, polling every `interval`
+    seconds.
+
+    Args:
+        queue (str): Queue directory.
+        interval (float, optional): Polling interval in seconds.
+        once (bool, optional): Stop when the queue is empty. Defaults to
+        False.
+    """
+
+    os.makedirs(queue, exist_ok=True)
+
+    while True:
+        jobs = sorted(f for f in os.listdir(queue) if f.endswith(JOB_SUFFIX))
+
+        if not jobs:
+            if once:
+                return
+            time.sleep(interval)
+            continue
+
+        for name in jobs:
+            path = os.path.join(queue, name)
+            running = path[:-len(JOB_SUFFIX)] + '.running'
+
+            try:
+                os.rename(path, running)  # claim
+            except FileNotFoundError:
+                continue  # claimed by another worker
+
+            try:
+                with open(running) as infile:
+                    result = runJob(json.load(infile))
+            except Exception as e:
+                result = {
+                    'status': 'error',
+                    'error': repr(e),
+                    'traceback': traceback.format_exc()
+                }
+
+            with open(resultPath(path) + '.tmp', 'w') as outfile:
+                json.dump(result, outfile, indent=4)
+            os.replace(resultPath(path) + '.tmp', resultPath(path))
+
+            os.remove(running)
+
+
+if __name__ == "__main__":
+
+    QUEUE = sys.argv[1] if len(sys.argv) > 1 else 'queue'
+
+    print(f"Waiting for jobs in {QUEUE}/")
+    work(QUEUE)
@@ -1,4 +1,5 @@
 import json
+import os
 import xmltodict
 
 from datetime import datetime, timedelta
@@ -6,6 +7,8 @@ from dateutil import parser
 
 from dataclasses import dataclass
 
+from metrics import Metrics
+
 
 @dataclass
 class Collection:
@@ -42,19 +45,30 @@ class C:
     level: str
 
 
-def parseEAD(xmlfile):
+def parseEAD(xmlfile, metricsTarget=None):
     with open(xmlfile, 'rb') as xmlrbfile:
         parse = xmltodict.parse(xmlrbfile,
                                 force_list={'note', 'c'},
                                 dict_constructor=dict)
         ead = parse['ead']
 
-    collection = parseCollection(ead)
+    # Progress of the components, see metrics.py
+    metrics = None
+    if metricsTarget:
+        metrics = Metrics(metricsTarget, unit='components', prefix='ead')
+
+    collection = parseCollection(ead, metrics)
+
+    if metrics:
+        metrics.close()
 
     return collection
 
 
-def parseDsc(serie, parentElement=None):
+def parseDsc(serie, parentElement=None, metrics=None):
+
+    if metrics:
+        metrics.step()
 
     did = serie['did']
 
@@ -94,13 +108,14 @@ def parseDsc(serie, parentElement=None):
             if k not in ['head', '@level', 'did']:
                 for subelement in serie[k]:
                     if type(subelement) != str:
-                        children.append(parseDsc(subelement))
+                        children.append(
+                            parseDsc(subelement, metrics=metrics))
 
         return C(id, code, date, title, comment, scans, children,
                  serie['@level'])
 
 
-def parseCollection(ead):
+def parseCollection(ead, metrics=None):
 
     head = ead['eadheader']
     archdesc = ead['archdesc']
@@ -121,7 +136,9 @@ def parseCollection(ead):
         collectionRepository=archdesc['did']['repository']['corpname'],
         collectionOrigination=archdesc['did']['origination'],
         # collectionCorporation=archdesc['did']['origination']['corpname'],
-        children=[parseDsc(serie) for serie in archdesc['dsc']['c']])
+        children=[
+            parseDsc(serie, metrics=metrics) for serie in archdesc['dsc']['c']
+        ])
 
     return collection
 
@@ -213,8 +230,13 @@ def parseDate(date,
 
 if __name__ == '__main__':
 
-    ead = parseEAD(
-        '5075.ead.xml')  # https://archief.amsterdam/archives/xml/5075.ead.xml
+    from sources import fetchSources, SOURCES
+
+    # https://archief.amsterdam/archives/xml/5075.ead.xml
+    PATHS = fetchSources({'5075.ead': SOURCES['5075.ead']}, 'sources')
+
+    os.makedirs('data', exist_ok=True)
+    ead = parseEAD(PATHS['5075.ead'], metricsTarget='data/5075.ead.prom')
 
     data = dict()
 
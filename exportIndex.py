@@ -0,0 +1,196 @@
+"""
+Random access to the notaries of a saved export.
+
+`ExportIndex` keeps the byte offset and length of every notary in an export
+file (e.g. the cached `sources/notarissen/<sha256>.json`), together with its
+relations, in a sidecar file (`<export>.index.json`). A notary can then be
+read without parsing the whole export, and a subset of notaries (with their
+relation neighbours) can be converted on its own, see
+`main.toRDFSubset`:
+
+```python
+from main import toRDFSubset
+
+toRDFSubset('data/notarissen.json', [1234, 5678], 'subset.trig', depth=1)
+```
+
+The index is rebuilt when the export file changed.
+"""
+
+import json
+import os
+from collections import defaultdict
+
+WHITESPACE = ' \t\n\r'
+
+
+def _skip(text: str, i: int) -> int:
+    while text[i] in WHITESPACE:
+        i += 1
+    return i
+
+
+def scanNotaries(text: str):
+    """Find the notaries in the text of an export.
+
+    Yields:
+        tuple: Notary, character offset and character end of every notary in
+        the top-level `notaries` array.
+    """
+
+    decoder = json.JSONDecoder()
+
+    i = _skip(text, 0)
+    if text[i] != '{':
+        raise ValueError("An export should be a JSON object")
+    i = _skip(text, i + 1)
+
+    while text[i] != '}':
+        key, i = decoder.raw_decode(text, i)
+        i = _skip(text, i)
+        if text[i] != ':':
+            raise ValueError(f"Expected ':' at {i}")
+        i = _skip(text, i + 1)
+
+        if key == 'notaries':
+            if text[i] != '[':
+                raise ValueError("'notaries' should be an array")
+            i = _skip(text, i + 1)
+
+            while text[i] != ']':
+                notary, end = decoder.raw_decode(text, i)
+                yield notary, i, end
+
+                i = _skip(text, end)
+                if text[i] == ',':
+                    i = _skip(text, i + 1)
+            i += 1
+        else:
+            _, i = decoder.raw_decode(text, i)  # skip the value
+
+        i = _skip(text, i)
+        if text[i] == ',':
+            i = _skip(text, i + 1)
+
+
+class ExportIndex:
+    """Index of the notaries in an export file by id.
+
+    Args:
+        path (str): Export file (JSON).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.indexPath = path + '.index.json'
+
+        stat = os.stat(path)
+        self.stamp = [stat.st_size, stat.st_mtime_ns]
+
+        index = None
+        if os.path.exists(self.indexPath):
+            with open(self.indexPath) as infile:
+                index = json.load(infile)
+
+        if index is None or index['stamp'] != self.stamp:
+            index = self.build()
+
+        # id, byte offset, byte length and [type, id] relations per notary
+        self.entries = index['notaries']
+        self.position = {e[0]: n for n, e in enumerate(self.entries)}
+
+        self.neighbourIds = defaultdict(set)
+        for notaryId, _, _, relations in self.entries:
+            for _, other in relations:
+                self.neighbourIds[notaryId].add(other)
+                self.neighbourIds[other].add(notaryId)
+
+    def build(self) -> dict:
+        """Scan the export and write the index file."""
+
+        # Without newline translation, so that the offsets are those of the
+        # bytes in the file (e.g. with CRLF line endings)
+        with open(self.path, encoding='utf-8', newline='') as infile:
+            text = infile.read()
+
+        entries = []
+        byteOffset = 0
+        previous = 0
+
+        for notary, start, end in scanNotaries(text):
+            byteOffset += len(text[previous:start].encode('utf-8'))
+            length = len(text[start:end].encode('utf-8'))
+
+            entries.append([
+                notary['id'], byteOffset, length,
+                [[r['type'], int(r['id'])]
+                 for r in notary['relations']
+                 if r.get('id') is not None]
+            ])
+
+            byteOffset += length
+            previous = end
+
+        index = {'stamp': self.stamp, 'notaries': entries}
+
+        with open(self.indexPath + '.tmp', 'w') as outfile:
+            json.dump(index, outfile)
+        os.replace(self.indexPath + '.tmp', self.indexPath)
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, notaryId) -> bool:
+        return notaryId in self.position
+
+    def get(self, notaryId) -> dict:
+        """Read a single notary."""
+        return next(self.read([notaryId]))
+
+    def read(self, ids):
+        """Read notaries, in the order of `ids`."""
+
+        with open(self.path, 'rb') as infile:
+            for notaryId in ids:
+                _, offset, length, _ = self.entries[self.position[notaryId]]
+                infile.seek(offset)
+                yield json.loads(infile.read(length))
+
+    def neighbourhood(self, ids, depth: int = 0) -> set:
+        """The notaries in `ids` and their relation neighbours (in both
+        directions) up to `depth` steps away."""
+
+        found = set(ids)
+        frontier = set(ids)
+
+        for _ in range(depth):
+            frontier = {
+                other
+                for notaryId in frontier
+                for other in self.neighbourIds[notaryId]
+            } - found
+            found |= frontier
+
+        return found
+
+    def subset(self, ids, depth: int = 0) -> dict:
+        """An export with only the notaries of `neighbourhood(ids, depth)`
+        that are in the export, in export order."""
+
+        selected = self.neighbourhood(ids, depth)
+        ordered = [e[0] for e in self.entries if e[0] in selected]
+
+        return {'notaries': list(self.read(ordered))}
+
+    def mentions(self, ids) -> list:
+        """All (source, type, target) relation mentions in the export that
+        involve one of the notaries in `ids`, in export order."""
+
+        ids = set(ids)
+
+        return [(notaryId, relationType, other)
+                for notaryId, _, _, relations in self.entries
+                for relationType, other in relations
+                if notaryId in ids or other in ids]
@@ -0,0 +1,215 @@
+"""
+Validation of the external links in the RDF of https://notarissennetwerk.nl.
+
+Portraits, TGN and Ecartico sameAs links, Adamlink closeMatch links and the
+inventory URIs of archief.amsterdam are emitted without being checked. The
+`LinkChecker` checks every distinct link with asyncio, with bounded
+concurrency over a pool of keep-alive connections, a rate limit per host and
+an on-disk cache of earlier results. Requires `aiohttp`:
+
+```bash
+pip install aiohttp
+```
+"""
+
+import asyncio
+import csv
+import datetime
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from rdflib import URIRef, Literal, RDF, OWL, SKOS, Namespace
+
+schema = Namespace("https://schema.org/")
+
+LINK_PREDICATES = [schema.image, schema.url, OWL.sameAs, SKOS.closeMatch]
+LINK_TYPES = [schema.Book, schema.VisualArtwork]
+
+# Path of skolem IRIs (our own, e.g. of hosted portraits), which are no links
+GENID = '/.well-known/genid/'
+
+
+def collectLinks(g) -> list:
+    """Distinct external http(s) links in a graph, sorted. Links can be
+    URIs or literals (e.g. the `schema:url` of archief.amsterdam). Skolem
+    IRIs are skipped: a hosted portrait is checked by its `schema:image`.
+
+    Args:
+        g (Graph): Graph (or Dataset) to collect the links from.
+    """
+
+    links = set()
+
+    for predicate in LINK_PREDICATES:
+        for o in g.objects(None, predicate):
+            links.add(o)
+
+    for rdfType in LINK_TYPES:
+        for s in g.subjects(RDF.type, rdfType):
+            links.add(s)
+
+    return sorted(
+        str(link) for link in links if isinstance(link, (URIRef, Literal))
+        and str(link).startswith(('http://', 'https://'))
+        and GENID not in str(link))
+
+
+class LinkChecker:
+    """Asynchronous link checker.
+
+    Args:
+        cachePath (str, optional): JSON file with results of earlier runs.
+        Defaults to None (no cache).
+        concurrency (int, optional): Maximum number of requests in flight.
+        Defaults to 20.
+        perHost (int, optional): Maximum number of connections per host.
+        Defaults to 4.
+        rateLimit (float, optional): Maximum number of requests per second
+        per host. Defaults to 5.
+        timeout (float, optional): Timeout per request in seconds. Defaults
+        to 30.
+        maxAge (int, optional): Number of days a cached result stays valid.
+        Defaults to 7.
+        failureMaxAge (float, optional): Number of hours a cached broken
+        result (no response, 4xx or 5xx) stays valid, so that a transient
+        outage does not hide a link for long. Defaults to 1.
+    """
+
+    def __init__(self,
+                 cachePath: str = None,
+                 concurrency: int = 20,
+                 perHost: int = 4,
+                 rateLimit: float = 5,
+                 timeout: float = 30,
+                 maxAge: int = 7,
+                 failureMaxAge: float = 1):
+
+        self.cachePath = cachePath
+        self.concurrency = concurrency
+        self.perHost = perHost
+        self.interval = 1 / rateLimit if rateLimit else 0
+        self.timeout = timeout
+        self.maxAge = datetime.timedelta(days=maxAge)
+        self.failureMaxAge = datetime.timedelta(hours=failureMaxAge)
+
+        self.cache = {}
+        if cachePath and os.path.exists(cachePath):
+            with open(cachePath) as infile:
+                self.cache = json.load(infile)
+
+        self.hostLocks = {}
+        self.hostLast = {}
+
+        self.requests = 0
+        self.cacheHits = 0
+
+    def _isFresh(self, url: str) -> bool:
+        result = self.cache.get(url)
+        if result is None:
+            return False
+
+        checked = datetime.datetime.fromisoformat(result['checked'])
+        maxAge = self.failureMaxAge if isBroken(result) else self.maxAge
+
+        return datetime.datetime.now() - checked < maxAge
+
+    async def _throttle(self, host: str):
+        lock = self.hostLocks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = self.hostLast.get(host, 0) + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.hostLast[host] = time.monotonic()
+
+    async def _check(self, session, semaphore, url: str) -> dict:
+
+        status = None
+        error = None
+
+        async with semaphore:
+            for method in ('HEAD', 'GET'):
+                await self._throttle(urlsplit(url).netloc)
+                self.requests += 1
+                try:
+                    async with session.request(method,
+                                               url,
+                                               allow_redirects=True) as r:
+                        status = r.status
+                        error = None if status < 400 else r.reason
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status = None
+                    error = f"{type(e).__name__}: {e}"
+
+                # Some servers do not allow HEAD requests
+                if status not in (405, 501):
+                    break
+
+        return {
+            'status': status,
+            'error': error,
+            'checked': datetime.datetime.now().isoformat(timespec='seconds')
+        }
+
+    async def checkAll(self, urls) -> dict:
+        """Check `urls`, using cached results where still valid.
+
+        Returns:
+            dict: Url to a result with `status`, `error` and `checked`.
+        """
+
+        urls = sorted(set(urls))
+        todo = [url for url in urls if not self._isFresh(url)]
+        self.cacheHits += len(urls) - len(todo)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency,
+                                         limit_per_host=self.perHost)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector,
+                                         timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self._check(session, semaphore, url) for url in todo))
+
+        self.cache.update(zip(todo, results))
+
+        if self.cachePath:
+            with open(self.cachePath, 'w') as outfile:
+                json.dump(self.cache, outfile, indent=1)
+
+        return {url: self.cache[url] for url in urls}
+
+    def check(self, urls) -> dict:
+        return asyncio.run(self.checkAll(urls))
+
+
+def isBroken(result: dict) -> bool:
+    return result['status'] is None or result['status'] >= 400
+
+
+def writeReport(results: dict, target: str) -> int:
+    """Write the broken links to a CSV file.
+
+    Returns:
+        int: Number of broken links.
+    """
+
+    broken = 0
+
+    with open(target, 'w', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['url', 'status', 'error', 'checked'])
+
+        for url, result in results.items():
+            if isBroken(result):
+                writer.writerow([
+                    url, result['status'] or '', result['error'] or '',
+                    result['checked']
+                ])
+                broken += 1
+
+    return broken
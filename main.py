@@ -13,20 +13,39 @@ Questions:
 """
 
 import datetime
+import gc
+import hashlib
 import json
 import re
 import urllib
+from functools import lru_cache
 from itertools import count
+from collections import Counter
 import calendar
 
 from unidecode import unidecode
 
-import requests
-
 import rdflib
-from rdflib import Dataset, ConjunctiveGraph, Graph, URIRef, Literal, XSD, Namespace, RDFS, BNode, OWL, SKOS
+from rdflib import Dataset, ConjunctiveGraph, Graph, URIRef, Literal, XSD, Namespace, RDF, RDFS, BNode, OWL, SKOS
 from rdfalchemy import rdfSubject, rdfMultiple, rdfSingle
 
+from network import NetworkBuilder
+from relations import RelationCollector
+from places import PlaceIndex, PlaceRegistry
+from streetIndex import StreetIndex
+from spill import ChunkSpill, currentRss
+from metrics import Metrics
+from sqliteStore import openDataset
+from publish import publish, canonicalLines
+from columnar import ColumnarWriter
+from vocabulary import Vocabulary
+from validator import (compileRules, ValidationReport, Required, Valid,
+                       Known, Ordered, Covered, Check, after)
+from exportIndex import ExportIndex
+from propertyGraph import PropertyGraphWriter, stableId
+from mapping import (compileResource, Call, Const, Dates, Field, Resource,
+                     Template, Var)
+
 ga = Namespace("https://data.goldenagents.org/")
 schema = Namespace("https://schema.org/")
 sem = Namespace("http://semanticweb.cs.vu.nl/2009/11/sem/")
@@ -58,6 +77,23 @@ nsOccupation = Namespace(
     "https://data.goldenagents.org/datasets/notarissennetwerk/occupation/")
 nsPlace = Namespace(
     "https://data.goldenagents.org/datasets/notarissennetwerk/place/")
+nsGenid = Namespace(
+    "https://data.goldenagents.org/datasets/notarissennetwerk/.well-known/genid/"
+)
+
+NAMESPACES = [
+    ('owl', OWL),
+    ('dcterms', dcterms),
+    ('ga', ga),
+    ('schema', schema),
+    ('sem', sem),
+    ('void', void),
+    ('foaf', foaf),
+    ('bio', bio),
+    ('skos', SKOS),
+    ('pnv', pnv),
+    ('rel', rel),
+]
 
 with open('data/name2adamlink.json') as infile:
     name2adamlink = json.load(infile)
@@ -71,6 +107,9 @@ with open('data/place2ecartico.json') as infile:
 with open('data/notarissenEAD.json') as infile:
     notarissenEAD = json.load(infile)
 
+placeIndex = PlaceIndex(place2tgn, place2ecartico)
+streetIndex = StreetIndex(name2adamlink)
+
 
 class Entity(rdfSubject):
     rdf_type = URIRef('urn:entity')
@@ -335,20 +374,214 @@ class IntendedMarriage(GroupEvent):
     hasDocument = rdfSingle(saa.hasDocument)
 
 
-def main(loadData: dict, target: str = 'data/notarissennetwerk.trig'):
+type2class = {
+    None: None,
+    '': None,
+    'aanstelling': IndividualEvent,
+    'admissie': IndividualEvent,
+    'ambtsbeëindiging': Resignation,
+    'begraven': Burial,
+    'benoeming': IndividualEvent,
+    'doop': Baptism,
+    'faillissement': IndividualEvent,
+    'geboren': Birth,
+    'gescheiden': Divorce,
+    'huwelijk': Marriage,
+    'ondertrouw': IntendedMarriage,
+    'overlijden': Death,
+    'tijdelijk ambt gestaakt': IndividualEvent
+}
+
+type2label = {
+    None: "",
+    '': "",
+    'aanstelling': 'aanstelling',
+    'admissie': 'admissie',
+    'ambtsbeëindiging': 'ambtsbeëindiging',
+    'begraven': 'begrafenis',
+    'benoeming': 'benoeming',
+    'doop': 'doop',
+    'faillissement': 'faillissement',
+    'geboren': 'geboorte',
+    'gescheiden': 'echtscheiding',
+    'huwelijk': 'huwelijk',
+    'ondertrouw': 'ondertrouw',
+    'overlijden': 'overlijden',
+    'tijdelijk ambt gestaakt': 'tijdelijke ambtsstaking'
+}
+
+rel2prop = {
+    'achter-achterkleinzoon van': None,
+    'achterkleinzoon van': None,
+    'achterneef van': None,
+    'betovergrootvader van': None,
+    'broer van': rel.siblingOf,
+    'grootvader van': rel.grandparentOf,
+    'had als getuige': None,
+    'had als klerk': None,
+    'had als vertaler': None,
+    'kind trouwde met kind van': None,
+    'kleinzoon van': rel.grandchildOf,
+    'neef van': None,
+    'niet gespecificeerd': None,
+    'oom van': None,
+    'opgevolgd door': None,
+    'opvolger van': None,
+    'oudoom van': None,
+    'overgrootvader van': None,
+    'samenwerking met': rel.collaboratesWith,
+    'schoonvader van': None,
+    'schoonzoon van': None,
+    'stiefvader van': None,
+    'stiefzoon van': None,
+    'vader van': rel.parentOf,
+    'was getuige bij': None,
+    'was klerk bij': None,
+    'was vertaler bij': None,
+    'zoon van': rel.childOf,
+    'zwager van': None
+}
+
+rel2prop_inverse = {
+    'achter-achterkleinzoon van': None,
+    'achterkleinzoon van': None,
+    'achterneef van': None,
+    'betovergrootvader van': None,
+    'broer van': rel.siblingOf,
+    'grootvader van': rel.grandchildOf,
+    'had als getuige': None,
+    'had als klerk': None,
+    'had als vertaler': None,
+    'kind trouwde met kind van': None,
+    'kleinzoon van': rel.grandparentOf,
+    'neef van': None,
+    'niet gespecificeerd': None,
+    'oom van': None,
+    'opgevolgd door': None,
+    'opvolger van': None,
+    'oudoom van': None,
+    'overgrootvader van': None,
+    'samenwerking met': rel.collaboratesWith,
+    'schoonvader van': None,
+    'schoonzoon van': None,
+    'stiefvader van': None,
+    'stiefzoon van': None,
+    'vader van': rel.childOf,
+    'was getuige bij': None,
+    'was klerk bij': None,
+    'was vertaler bij': None,
+    'zoon van': rel.parentOf,
+    'zwager van': None
+}
+
+
+def main(loadData: dict,
+         target: str = 'data/notarissennetwerk.trig',
+         networkTarget: str = None,
+         linkReport: str = None,
+         linkCache: str = None,
+         chunkSize: int = None,
+         memoryLimit: int = None,
+         store: str = None,
+         canonical: bool = False,
+         tablesTarget: str = None,
+         graphTarget: str = None,
+         sparqlEndpoint: str = None,
+         validate: bool = True,
+         metricsTarget: str = None):
     """Main function that starts the download and conversion to RDF.
 
     Args:
         loadData (dict): notarissen data as dictionary
         target (str, optional): Destination file location. Defaults to
         'data/notarissennetwerk.trig'.
+        networkTarget (str, optional): Destination of the relation network
+        (.json or .csv). Defaults to None (not written).
+        linkReport (str, optional): Destination of the report of broken
+        external links (.csv). Defaults to None (links are not checked).
+        linkCache (str, optional): Cache of earlier link checks (.json).
+        chunkSize (int, optional): Convert in chunks of this many notaries,
+        spilled to disk, to bound memory use. Defaults to None (all at once).
+        memoryLimit (int, optional): Memory ceiling in MB for the chunked
+        conversion. Defaults to None (no limit).
+        store (str, optional): Persistent SQLite store to convert into
+        (not in chunked mode). Defaults to None (in memory).
+        canonical (bool, optional): Write canonical, sorted TriG and skip
+        rewriting it when its checksum is unchanged. Defaults to False.
+        tablesTarget (str, optional): Directory for the columnar analytics
+        tables. Defaults to None (not written).
+        graphTarget (str, optional): Directory for the property-graph bulk
+        import files. Defaults to None (not written).
+        sparqlEndpoint (str, optional): SPARQL 1.1 Update endpoint to load
+        the graph (or only its changes) into. Requires `canonical`.
+        Defaults to None (not published).
+        validate (bool, optional): Check the export against the data-quality
+        rules and report the violations. Defaults to True.
+        metricsTarget (str, optional): Metrics file (Prometheus text format)
+        to rewrite during the conversion, for monitoring. Defaults to None.
+
+    Returns:
+        dict: Run report with counts of the conversion.
     """
 
     #######
     # RDF #
     #######
 
-    toRDF(loadData, target=target)
+    if chunkSize and store:
+        raise ValueError("A SQLite store cannot be used in chunked mode "
+                         "(chunkSize)")
+
+    if sparqlEndpoint and not canonical:
+        raise ValueError("Publishing to a SPARQL endpoint needs canonical "
+                         "output (canonical=True)")
+
+    if chunkSize:
+        report = toRDFChunked(loadData,
+                              target=target,
+                              chunkSize=chunkSize,
+                              memoryLimit=memoryLimit,
+                              networkTarget=networkTarget,
+                              linkReport=linkReport,
+                              linkCache=linkCache,
+                              canonical=canonical,
+                              tablesTarget=tablesTarget,
+                              graphTarget=graphTarget,
+                              validate=validate,
+                              metricsTarget=metricsTarget)
+    else:
+        report = toRDF(loadData,
+                       target=target,
+                       networkTarget=networkTarget,
+                       linkReport=linkReport,
+                       linkCache=linkCache,
+                       store=store,
+                       canonical=canonical,
+                       tablesTarget=tablesTarget,
+                       graphTarget=graphTarget,
+                       validate=validate,
+                       metricsTarget=metricsTarget)
+
+    ##########
+    # SPARQL #
+    ##########
+
+    if sparqlEndpoint:
+        report['sparql'] = publishSparql(sparqlEndpoint, target,
+                                         report.get('publish'))
+
+    return report
+
+
+def skolemize(*parts) -> URIRef:
+    """Deterministic skolem IRI for a resource without a URI of its own,
+    derived from its content (e.g. the notary id and identifier value), so
+    that unchanged input gives byte-identical output."""
+
+    digest = hashlib.sha1("\x1f".join(str(part)
+                                      for part in parts).encode()).hexdigest()
+
+    return nsGenid.term(digest)
 
 
 def yearToDate(yearString):
@@ -389,500 +622,1237 @@ def street2adamlink(street, name2adamlink=name2adamlink):
     return adamlink
 
 
+def street2adamlinkCandidates(street, streetIndex=streetIndex) -> list:
+    """Approximate Adamlink matches of a street that `street2adamlink`
+    cannot resolve, trying the part in parentheses or before a comma, or
+    the street without its house number. Other truncated fragments of the
+    name (e.g. `Op de` of `Op de hoek`) are not matched.
+
+    Returns:
+        list: (name, uri, confidence) tuples, best first.
+    """
+
+    candidates = streetIndex.search(street)
+
+    if not candidates:
+        matches = re.findall(r'\((.*)\)', street)
+        if matches:
+            candidates = street2adamlinkCandidates(matches[0], streetIndex)
+
+    if not candidates and ',' in street:
+        candidates = street2adamlinkCandidates(
+            street.split(',')[0], streetIndex)
+    elif not candidates and re.search(r' \S*\d\S*$', street):
+        candidates = street2adamlinkCandidates(
+            street.rsplit(' ', 1)[0], streetIndex)
+
+    return candidates
+
+
+def addCloseMatchCandidate(g, resource, uri, confidence: float):
+    """Add a skos:closeMatch to an approximate match, with its confidence
+    on a reified statement."""
+
+    g.add((resource, SKOS.closeMatch, uri))
+
+    statement = skolemize('closeMatch', resource, uri)
+    g.add((statement, RDF.type, RDF.Statement))
+    g.add((statement, RDF.subject, resource))
+    g.add((statement, RDF.predicate, SKOS.closeMatch))
+    g.add((statement, RDF.object, uri))
+    g.add((statement, RDF.value, Literal(confidence, datatype=XSD.decimal)))
+
+
 def getSameAsPlace(placename: str) -> list:
 
-    links = []
+    # tgn, ecartico
+    return [URIRef(uri) for uri in placeIndex.links(placename)]
 
-    # tgn
-    tgn = place2tgn.get(placename)
-    if tgn:
-        links.append(URIRef(tgn))
 
-    # ecartico
-    ecartico = place2ecartico.get(placename)
-    if ecartico:
-        links.append(URIRef(ecartico))
+def placeIdentifier(placename: str) -> str:
+    return "".join(
+        [i for i in placename if i.lower() in 'abcdefghijklmnopqrstuvwxyz-'])
 
-    return links
 
+def newPlace(placename: str):
+    return Place(nsPlace.term(placeIdentifier(placename)),
+                 name=[placename],
+                 sameAs=getSameAsPlace(placename))
 
-def toRDF(d: dict, target: str):
-    """Convert the earlier harvested and structured data to RDF.
 
-    Args:
-        d (dict): Dictionary from Notarissennetwerk
-        target (str): Destination file path.
+def bindNamespaces(ds):
+
+    for prefix, namespace in NAMESPACES:
+        ds.bind(prefix, namespace)
+
+
+def familyName(prefix: str, lastName: str) -> str:
+    if prefix:
+        return prefix.capitalize() + ' ' + lastName
+    else:
+        return lastName
+
+
+def protocolData(notary: dict) -> dict:
+    """The EAD data of the protocol of a notary in the Notarieel Archief
+    (5075), if any."""
+
+    if notary['section_id'] and notary['col_id'] == 5075:
+        return notarissenEAD[str(notary['section_id'])]
+
+
+def present(*values) -> list:
+    return [v for v in values if v is not None]
+
+
+def dateValue(value):
+    """`value` if it can be a date (a string or a number), else None. Other
+    values (e.g. a list) cannot be passed to the cached `roleDates` and
+    `eventDates`, and are reported by validation instead."""
+
+    return value if isinstance(value, (str, int, float)) else None
+
+
+# Bounded, so that a long-running worker (see daemon.py) does not keep every
+# date of every export it converted
+DATE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def roleDates(begin, end) -> tuple:
+    """Dates of a Role from the years (or months) it began and ended.
+    Cached, as the same years recur.
+
+    Returns:
+        tuple: startDate, endDate and the earliest/latest begin and end
+        timestamps.
     """
 
-    type2class = {
-        None: None,
-        '': None,
-        'aanstelling': IndividualEvent,
-        'admissie': IndividualEvent,
-        'ambtsbeëindiging': Resignation,
-        'begraven': Burial,
-        'benoeming': IndividualEvent,
-        'doop': Baptism,
-        'faillissement': IndividualEvent,
-        'geboren': Birth,
-        'gescheiden': Divorce,
-        'huwelijk': Marriage,
-        'ondertrouw': IntendedMarriage,
-        'overlijden': Death,
-        'tijdelijk ambt gestaakt': IndividualEvent
-    }
+    startDate = Literal(begin, datatype=XSD.gYear,
+                        normalize=False) if begin else None
+    endDate = Literal(end, datatype=XSD.gYear,
+                      normalize=False) if end else None
+
+    earliestBeginTimeStamp, latestBeginTimeStamp = yearToDate(begin)
+    earliestEndTimeStamp, latestEndTimeStamp = yearToDate(end)
+
+    return (startDate, endDate, earliestBeginTimeStamp, latestBeginTimeStamp,
+            earliestEndTimeStamp, latestEndTimeStamp)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def eventDates(dateString) -> tuple:
+    """Date and SEM timestamps of an event. Cached, as the same dates
+    recur.
+
+    Returns:
+        tuple: date, timeStamp, beginTimeStamp, endTimeStamp, the earliest
+        and latest begin and end timestamps, and the year for the label.
+    """
+
+    if not dateString or dateString in ('0000', '0000-00-00'):
+        return None, None, None, None, None, None, None, None, "?"
+
+    dateString = str(dateString)
+
+    yearLabel = dateString[:4]
 
-    type2label = {
-        None: "",
-        '': "",
-        'aanstelling': 'aanstelling',
-        'admissie': 'admissie',
-        'ambtsbeëindiging': 'ambtsbeëindiging',
-        'begraven': 'begrafenis',
-        'benoeming': 'benoeming',
-        'doop': 'doop',
-        'faillissement': 'faillissement',
-        'geboren': 'geboorte',
-        'gescheiden': 'echtscheiding',
-        'huwelijk': 'huwelijk',
-        'ondertrouw': 'ondertrouw',
-        'overlijden': 'overlijden',
-        'tijdelijk ambt gestaakt': 'tijdelijke ambtsstaking'
+    try:
+        date = datetime.datetime.fromisoformat(dateString).date()
+        date = Literal(date, datatype=XSD.date)
+
+        return date, date, date, date, date, date, date, date, yearLabel
+
+    except:
+        if dateString.endswith('00-00') or len(dateString) == 4:
+            date = Literal(dateString[:4], datatype=XSD.gYear, normalize=False)
+            begin, end = yearToDate(dateString[:4])
+        elif dateString.endswith('-00') or len(dateString) == 7:
+            date = Literal(dateString[:7],
+                           datatype=XSD.gYearMonth,
+                           normalize=False)
+            begin, end = yearToDate(dateString[:7])
+        else:  # see the events.date.valid rule
+            return None, None, None, None, None, None, None, None, yearLabel
+
+        return date, None, None, None, begin, end, begin, end, yearLabel
+
+
+def streetCandidates(adamlink, street: str, counts: Counter) -> list:
+    """Approximate Adamlink matches of a street without exact match."""
+
+    if adamlink is not None:
+        return []
+
+    candidates = street2adamlinkCandidates(street)
+    if candidates:
+        counts['approximateStreets'] += 1
+    else:
+        counts['unresolvedStreets'] += 1
+
+    return candidates
+
+
+def addCloseMatchCandidates(g, address, candidates: list):
+
+    for _, uri, confidence in candidates:
+        addCloseMatchCandidate(g, address.resUri, URIRef(uri), confidence)
+
+
+def bestAdamlink(adamlink, candidates: list) -> tuple:
+    """The Adamlink street of an address, with its confidence."""
+
+    if adamlink:
+        return adamlink, 1.0
+    elif candidates:
+        _, uri, confidence = candidates[0]
+        return uri, confidence
+    else:
+        return None, None
+
+
+def hostedPortrait(portrait: str):
+    if portrait.startswith('https://notarissennetwerk.nl/images/'):
+        return URIRef(urllib.parse.quote(portrait, safe=':/'))
+
+
+def setParticipant(event, person):
+
+    try:
+        event.principal = person
+    except AttributeError:
+        event.partner = [person]
+
+
+###########
+# Mapping #
+###########
+
+# (identifier, label) of the sem:EventType of every event type
+EVENT_TYPES = {
+    'aanstelling': ('aanstelling', 'Aanstelling'),
+    'admissie': ('admissie', 'Admissie'),
+    'ambtsbeëindiging': ('ambtsbeeindiging', 'Ambtsbeëindiging'),
+    'begraven': ('begrafenis', 'Begrafenis'),
+    'benoeming': ('benoeming', 'Benoeming'),
+    'doop': ('doop', 'Doop'),
+    'faillissement': ('faillissement', 'Faillissement'),
+    'geboren': ('geboorte', 'Geboorte'),
+    'gescheiden': ('scheiding', 'Scheiding'),
+    'huwelijk': ('huwelijk', 'Huwelijk'),
+    'ondertrouw': ('ondertrouw', 'Ondertrouw'),
+    'overlijden': ('overlijden', 'Overlijden'),
+    'tijdelijk ambt gestaakt':
+    ('tijdelijkeambtsstaking', 'Tijdelijke ambtsstaking')
+}
+
+EVENT_TYPE_URIS = {
+    eventType: nsEventType.term(identifier)
+    for eventType, (identifier, _) in EVENT_TYPES.items()
+}
+
+
+def vocabularyTriples():
+    """The triples that are the same in every run: the event types and the
+    subproperty axioms of the relation properties."""
+
+    for eventType, (_, label) in EVENT_TYPES.items():
+        uri = EVENT_TYPE_URIS[eventType]
+        yield uri, RDF.type, sem.EventType
+        yield uri, RDFS.label, Literal(label, lang='nl')
+
+    for prop in list(rel2prop.values()) + list(rel2prop_inverse.values()):
+        if prop:
+            yield prop, RDFS.subPropertyOf, schema.knows
+
+
+VOCABULARY = Vocabulary(vocabularyTriples())
+
+# Names of the parts of roleDates and eventDates, as variables of a mapping
+ROLE_DATES = ('startDate', 'endDate', 'earliestBeginTimeStamp',
+              'latestBeginTimeStamp', 'earliestEndTimeStamp',
+              'latestEndTimeStamp')
+EVENT_DATES = ('date', 'timeStamp', 'beginTimeStamp', 'endTimeStamp',
+               'earliestBeginTimeStamp', 'latestBeginTimeStamp',
+               'earliestEndTimeStamp', 'latestEndTimeStamp', 'yearLabel')
+
+
+def roleMapping(attribute: str, label) -> Resource:
+    """A Role (address or occupation) of a notary, with the resource it is a
+    role of (variable `target`) as property `attribute`."""
+
+    return Resource(Role,
+                    Template(nsRole, '{id}-{roleNumber}'),
+                    dates=Dates(roleDates,
+                                Call(dateValue, 'from'),
+                                Call(dateValue, 'to'),
+                                names=ROLE_DATES),
+                    startDate=Var('startDate'),
+                    endDate=Var('endDate'),
+                    name=[label],
+                    hasEarliestBeginTimeStamp=Var('earliestBeginTimeStamp'),
+                    hasLatestBeginTimeStamp=Var('latestBeginTimeStamp'),
+                    hasEarliestEndTimeStamp=Var('earliestEndTimeStamp'),
+                    hasLatestEndTimeStamp=Var('latestEndTimeStamp'),
+                    **{attribute: Var('target')})
+
+
+def eventMapping(eventType: str, EventClass) -> Resource:
+    """An event of type `eventType`, specialized for its class and label."""
+
+    return Resource(
+        EventClass,
+        Template(nsEvent, '{id}-{n}'),
+        dates=Dates(eventDates, Call(dateValue, 'date'), names=EVENT_DATES),
+        eventType=EVENT_TYPE_URIS.get(eventType),
+        date=Var('date'),
+        hasTimeStamp=Var('timeStamp'),
+        hasBeginTimeStamp=Var('beginTimeStamp'),
+        hasEndTimeStamp=Var('endTimeStamp'),
+        hasEarliestBeginTimeStamp=Var('earliestBeginTimeStamp'),
+        hasLatestBeginTimeStamp=Var('latestBeginTimeStamp'),
+        hasEarliestEndTimeStamp=Var('earliestEndTimeStamp'),
+        hasLatestEndTimeStamp=Var('latestEndTimeStamp'),
+        place=Call('getPlace', 'place'),
+        label=[
+            Template(None, f"{type2label[eventType].title()} van "
+                     "{name} ({yearLabel})")
+        ])
+
+
+# The resources of a notary and of the records in its lists. A record maps
+# to its resource with `EMIT[name](record, notary, variables)`, see
+# `emitNotary`. Inventory books and portraits that are not hosted can be
+# shared by notaries, so `emitNotary` adds their author and about to what
+# the other notaries have.
+NOTARY_MAPPING = {
+    'page':
+    Resource(CreativeWork, Call(URIRef, 'uri')),
+    'personName':
+    Resource(PersonName,
+             Template(nsPersonName, '{id}'),
+             prefix=Field('title'),
+             givenName=Field('firstName'),
+             patronym=Field('patronym'),
+             baseSurname=Field('lastName'),
+             surnamePrefix=Field('prefix'),
+             literalName=Field('name'),
+             label=[Field('name')]),
+    'person':
+    Resource(Person,
+             Template(nsPerson, '{id}'),
+             name=[Field('name')],
+             hasName=[Var('personName')],
+             givenName=Field('firstName'),
+             familyName=Call(familyName, 'prefix', 'lastName'),
+             birthPlace=Call('getPlace', 'place')),
+    'protocol':
+    Resource(PropertyValue,
+             Call(skolemize, Const('protocol'), 'id', 'section_id'),
+             name=[Literal("Protocol Notarieel Archief", lang="nl")],
+             value=Call(str, 'section_id')),
+    'inventoryBook':
+    Resource(InventoryBook, Call(URIRef, 'uri'), name=[Field('code')]),
+    'repertorium':
+    Resource(PropertyValue,
+             Call(skolemize, Const('repertorium'), 'id', 'rep_id'),
+             name=[Literal("Repertorium", lang="nl")],
+             value=Call(str, 'rep_id')),
+    'address':
+    Resource(PostalAddress,
+             Template(nsAddress, '{id}-{n}'),
+             streetAddress=Field('street'),
+             name=[Field('street')],
+             closeMatch=Var('adamlink')),
+    'addressRole':
+    roleMapping('address', Field('street')),
+    'occupation':
+    Resource(Occupation,
+             Call(nsOccupation.term, Call(placeIdentifier, 'details')),
+             name=[Field('details')]),
+    'occupationRole':
+    roleMapping('hasOccupation', Field('details')),
+    'hostedPortrait':
+    Resource(VisualArtwork,
+             Call(skolemize, Const('portrait'), 'id', Var('image')),
+             about=Var('person'),
+             image=Var('image')),
+    'portrait':
+    Resource(VisualArtwork, Call(URIRef, 'portrait')),
+}
+
+# Events have a mapping per event type; events of a type without class are
+# skipped
+EVENT_MAPPING = {
+    eventType: eventMapping(eventType, EventClass)
+    for eventType, EventClass in type2class.items() if EventClass
+}
+
+# Properties of the person that refer to its birth and death, and their date
+PERSON_EVENTS = {Birth: ('birth', 'birthDate'), Death: ('death', 'deathDate')}
+
+EMIT = {
+    name: compileResource(resource)
+    for name, resource in NOTARY_MAPPING.items()
+}
+EMIT_EVENT = {
+    eventType: compileResource(resource)
+    for eventType, resource in EVENT_MAPPING.items()
+}
+
+# Dates that eventDates converts: an ISO date, or a year or month with
+# '-00' for the unknown parts
+PARTIAL_DATE = re.compile(r"\d{4}(-00-00|-(0[1-9]|1[0-2])(-00)?)?")
+
+# Years (or months) of addresses and occupations, see roleDates
+ROLE_DATE = re.compile(r"\d{4}(-(0[1-9]|1[0-2]))?")
+
+
+def validEventDate(dateString: str) -> bool:
+
+    try:
+        datetime.date.fromisoformat(dateString)
+        return True
+    except ValueError:
+        return PARTIAL_DATE.fullmatch(dateString) is not None
+
+
+def lifespan(notary: dict):
+    """The birth and death date of a notary if the birth is after the
+    death. Invalid dates are not compared, they are reported by the
+    `events.date.valid` rule."""
+
+    dates = {e['type']: e['date'] for e in notary.get('events') or ()}
+    birth = dates.get('geboren')
+    death = dates.get('overlijden')
+
+    if not (birth and death and validEventDate(str(birth))
+            and validEventDate(str(death))):
+        return None
+
+    if after(birth, death):
+        return [birth, death]
+
+
+# Data-quality checks of the export, run for every notary in the mapping
+NOTARY_RULES = [
+    Required(None, 'id'),
+    Required(None, 'name'),
+    Required(None, 'uri'),
+    Covered(None, ('id', 'uri', 'place', 'title', 'firstName', 'patronym',
+                   'lastName', 'prefix', 'name', 'section_id', 'col_id',
+                   'rep_id', 'name_variants', 'addresses', 'events', 'jobs',
+                   'portrait', 'relations')),
+    Check('notary.lifespan.ordered', None, lifespan, "Born after death"),
+    Required('name_variants', 'name'),
+    Covered('name_variants', ('name', )),
+    Required('addresses', 'street'),
+    Valid('addresses', 'from', ROLE_DATE.fullmatch),
+    Valid('addresses', 'to', ROLE_DATE.fullmatch),
+    Ordered('addresses', 'from', 'to'),
+    Covered('addresses', ('street', 'from', 'to')),
+    Known('events', 'type', type2class,
+          "Event type without mapping, the event is skipped"),
+    Valid('events', 'date', validEventDate,
+          "Invalid date, the event has no date"),
+    Covered('events', ('type', 'date', 'place')),
+    Required('jobs', 'details'),
+    Valid('jobs', 'from', ROLE_DATE.fullmatch),
+    Valid('jobs', 'to', ROLE_DATE.fullmatch),
+    Ordered('jobs', 'from', 'to'),
+    Covered('jobs', ('details', 'from', 'to')),
+    Required('relations', 'id', "No id, the relation is skipped"),
+    Known('relations', 'type', rel2prop,
+          "Relation type without mapping, emitted as schema:knows"),
+    Covered('relations', ('type', 'id')),
+]
+
+validateNotary = compileRules('validateNotary', NOTARY_RULES)
+
+# Columns of the notaries table, as they are in the export
+NOTARY_COLUMNS = ('id', 'name', 'title', 'firstName', 'patronym', 'prefix',
+                  'lastName', 'place', 'col_id', 'section_id', 'rep_id',
+                  'portrait', 'uri')
+
+###########
+# Convert #
+###########
+
+
+def emitRole(emit, notary: dict, record: dict, roleNumber: int,
+             target) -> tuple:
+    """A Role (address or occupation) of a notary, with the mapping of
+    `emit`, of resource `target` in the years of `record`.
+
+    Returns:
+        tuple: The Role and its earliest/latest begin and end timestamps.
+    """
+
+    variables = {'roleNumber': roleNumber, 'target': target}
+    role = emit(record, notary, variables)
+
+    return role, [variables[name] for name in ROLE_DATES[2:]]
+
+
+def roleRow(notary: dict, record: dict, roleNumber: int,
+            timeStamps: list) -> dict:
+    """The columns that the address and occupation tables share."""
+
+    earliestBegin, latestBegin, earliestEnd, latestEnd = timeStamps
+
+    return {
+        'notary': notary['id'],
+        'role': roleNumber,
+        'earliestBegin': earliestBegin,
+        'latestBegin': latestBegin,
+        'earliestEnd': earliestEnd,
+        'latestEnd': latestEnd,
+        'from': record['from'],
+        'to': record['to']
     }
 
-    rel2prop = {
-        'achter-achterkleinzoon van': None,
-        'achterkleinzoon van': None,
-        'achterneef van': None,
-        'betovergrootvader van': None,
-        'broer van': rel.siblingOf,
-        'grootvader van': rel.grandparentOf,
-        'had als getuige': None,
-        'had als klerk': None,
-        'had als vertaler': None,
-        'kind trouwde met kind van': None,
-        'kleinzoon van': rel.grandchildOf,
-        'neef van': None,
-        'niet gespecificeerd': None,
-        'oom van': None,
-        'opgevolgd door': None,
-        'opvolger van': None,
-        'oudoom van': None,
-        'overgrootvader van': None,
-        'samenwerking met': rel.collaboratesWith,
-        'schoonvader van': None,
-        'schoonzoon van': None,
-        'stiefvader van': None,
-        'stiefzoon van': None,
-        'vader van': rel.parentOf,
-        'was getuige bij': None,
-        'was klerk bij': None,
-        'was vertaler bij': None,
-        'zoon van': rel.childOf,
-        'zwager van': None
+
+def roleEdge(propertyGraph: PropertyGraphWriter, edgeType: str,
+             notary: dict, roleNumber: int, record: dict, timeStamps: list,
+             target: int):
+    """The relationship in the property graph of a notary to the resource of
+    a Role, with the properties of the Role."""
+
+    earliestBegin, latestBegin, earliestEnd, latestEnd = timeStamps
+
+    propertyGraph.edge(edgeType,
+                       stableId(nsPerson.term(f"{notary['id']}")),
+                       target,
+                       uri=nsRole.term(f"{notary['id']}-{roleNumber}"),
+                       startDate=record['from'],
+                       endDate=record['to'],
+                       hasEarliestBeginTimeStamp=earliestBegin,
+                       hasLatestBeginTimeStamp=latestBegin,
+                       hasEarliestEndTimeStamp=earliestEnd,
+                       hasLatestEndTimeStamp=latestEnd)
+
+
+def emitAddress(notary: dict, n: int, a: dict, roleNumber: int, g,
+                tables: ColumnarWriter, propertyGraph: PropertyGraphWriter,
+                counts: Counter):
+
+    street = a['street']
+
+    adamlink = street2adamlink(street)
+    candidates = streetCandidates(adamlink, street, counts)
+
+    address = EMIT['address'](a, notary, {'n': n, 'adamlink': adamlink})
+    addCloseMatchCandidates(g, address, candidates)
+
+    role, timeStamps = emitRole(EMIT['addressRole'], notary, a, roleNumber,
+                                address)
+
+    if tables:
+        adamlinkMatch, adamlinkConfidence = bestAdamlink(adamlink, candidates)
+        tables.add('addresses',
+                   **roleRow(notary, a, roleNumber, timeStamps),
+                   address=n,
+                   street=street,
+                   adamlink=adamlinkMatch,
+                   adamlinkConfidence=adamlinkConfidence)
+
+    if propertyGraph:
+        roleEdge(
+            propertyGraph, 'ADDRESS', notary, roleNumber, a, timeStamps,
+            propertyGraph.node('PostalAddress',
+                               address.resUri,
+                               streetAddress=street,
+                               closeMatch=adamlink))
+
+    return role
+
+
+def emitOccupation(notary: dict, occ: dict, roleNumber: int,
+                   tables: ColumnarWriter,
+                   propertyGraph: PropertyGraphWriter):
+
+    occupation = EMIT['occupation'](occ, notary, {})
+
+    role, timeStamps = emitRole(EMIT['occupationRole'], notary, occ,
+                                roleNumber, occupation)
+
+    if tables:
+        tables.add('occupations',
+                   **roleRow(notary, occ, roleNumber, timeStamps),
+                   occupation=occ['details'])
+
+    if propertyGraph:
+        roleEdge(
+            propertyGraph, 'OCCUPATION', notary, roleNumber, occ, timeStamps,
+            propertyGraph.node('Occupation',
+                               occupation.resUri,
+                               name=occ['details']))
+
+    return role
+
+
+def emitEvent(notary: dict, n: int, e: dict, emit, person,
+              places: PlaceRegistry, tables: ColumnarWriter):
+    """An event of a notary, with the mapping of its type (`emit`)."""
+
+    variables = {'n': n, 'getPlace': places.get}
+    event = emit(e, notary, variables)
+    setParticipant(event, person)
+
+    if tables:
+        tables.add('events',
+                   notary=notary['id'],
+                   event=n,
+                   type=e['type'],
+                   date=e['date'],
+                   earliestBegin=variables['earliestBeginTimeStamp'],
+                   latestBegin=variables['latestBeginTimeStamp'],
+                   earliestEnd=variables['earliestEndTimeStamp'],
+                   latestEnd=variables['latestEndTimeStamp'],
+                   place=e['place'])
+
+    if emit.resource.cls in PERSON_EVENTS:
+        eventProperty, dateProperty = PERSON_EVENTS[emit.resource.cls]
+        setattr(person, eventProperty, event)
+        setattr(person, dateProperty, variables['date'])
+
+    return event
+
+
+def emitNotary(notary: dict,
+               g,
+               places: PlaceRegistry,
+               relationCollector: RelationCollector,
+               networkBuilder: NetworkBuilder,
+               tables: ColumnarWriter = None,
+               propertyGraph: PropertyGraphWriter = None,
+               validation: ValidationReport = None,
+               counts: Counter = None):
+    """Convert a notary to RDF with the compiled `NOTARY_MAPPING` and
+    `EVENT_MAPPING`, and to rows of the analytics tables and nodes of the
+    property graph if given. See `convertNotaries`."""
+
+    if validation:
+        validateNotary(notary, validation)
+
+    roleCounter = count(1)
+    networkBuilder.addNode(notary['id'])
+
+    notaryData = protocolData(notary)
+
+    variables = {'getPlace': places.get}
+    page = EMIT['page'](notary, notary, variables)
+    variables['personName'] = EMIT['personName'](notary, notary, variables)
+    p = variables['person'] = EMIT['person'](notary, notary, variables)
+
+    if tables:
+        tables.add('notaries',
+                   **{column: notary[column]
+                      for column in NOTARY_COLUMNS})
+
+    if propertyGraph:
+        person = propertyGraph.node(
+            'Person',
+            p.resUri,
+            name=notary['name'],
+            title=notary['title'],
+            givenName=notary['firstName'],
+            patronym=notary['patronym'],
+            surnamePrefix=notary['prefix'],
+            baseSurname=notary['lastName'],
+            familyName=familyName(notary['prefix'], notary['lastName']),
+            alternateName=[v['name'] for v in notary['name_variants']],
+            protocol=notary['section_id'] if notaryData else None,
+            repertorium=notary['rep_id'],
+            url=notaryData['uri'] if notaryData else None,
+            portrait=notary['portrait'],
+            page=notary['uri'])
+
+        if notary['place']:
+            propertyGraph.edge(
+                'BORN_IN', person,
+                propertyGraph.node(
+                    'Place',
+                    nsPlace.term(placeIdentifier(notary['place'])),
+                    name=notary['place'],
+                    sameAs=placeIndex.lookup(notary['place'])))
+
+    # identifiers
+    protocol = repertorium = None
+
+    if notaryData:
+        protocol = EMIT['protocol'](notary, notary, variables)
+
+        p.url = notaryData['uri']
+        for inv, code in zip(notaryData['inventories'], notaryData['codes']):
+            book = EMIT['inventoryBook']({
+                'uri': inv,
+                'code': code
+            }, notary, variables)
+            g.add((book.resUri, schema.author, p.resUri))
+            if tables:
+                tables.add('inventoryBooks',
+                           notary=notary['id'],
+                           code=code,
+                           uri=inv)
+            if propertyGraph:
+                propertyGraph.edge(
+                    'AUTHOR', propertyGraph.node('InventoryBook',
+                                                 inv,
+                                                 name=code), person)
+
+    if notary['rep_id']:
+        repertorium = EMIT['repertorium'](notary, notary, variables)
+
+    p.identifier = present(protocol, repertorium)
+    page.mainEntity = p
+    p.mainEntityOfPage = page
+
+    # name variants
+    names = [variant['name'] for variant in notary['name_variants']]
+    if tables:
+        for name in names:
+            tables.add('nameVariants', notary=notary['id'], name=name)
+    p.alternateName = names
+
+    # addresses
+    p.address = [
+        emitAddress(notary, n, a, next(roleCounter), g, tables,
+                    propertyGraph, counts)
+        for n, a in enumerate(notary['addresses'], 1)
+    ]
+
+    # events, skipped (and counted) if their type has no class
+    lifeEvents = []
+    for n, e in enumerate(notary['events'], 1):
+        emit = EMIT_EVENT.get(e['type'])
+        if emit is None:
+            counts['skippedEvents', e['type'] or ''] += 1
+            continue
+
+        lifeEvents.append(emitEvent(notary, n, e, emit, p, places, tables))
+    p.event = lifeEvents
+
+    # occupations
+    p.hasOccupation = [
+        emitOccupation(notary, occ, next(roleCounter), tables, propertyGraph)
+        for occ in notary['jobs']
+    ]
+
+    # portrait
+    if notary['portrait']:
+        variables['image'] = hostedPortrait(notary['portrait'])
+        if variables['image']:
+            portrait = EMIT['hostedPortrait'](notary, notary, variables)
+        else:
+            portrait = EMIT['portrait'](notary, notary, variables)
+            g.add((portrait.resUri, schema.about, p.resUri))
+        p.subjectOf = [portrait]
+
+    # relations (emitted after all notaries are collected), skipping those
+    # without id (see NOTARY_RULES)
+    for relation in notary['relations']:
+        if relation.get('id') is not None:
+            relationCollector.add(notary['id'], relation['type'],
+                                  relation['id'])
+
+
+def skippedEvents(counts: Counter) -> dict:
+    """Number of skipped events per event type without class."""
+
+    return {
+        key[1]: n
+        for key, n in sorted(counts.items(), key=lambda i: str(i[0]))
+        if isinstance(key, tuple) and key[0] == 'skippedEvents'
     }
 
-    rel2prop_inverse = {
-        'achter-achterkleinzoon van': None,
-        'achterkleinzoon van': None,
-        'achterneef van': None,
-        'betovergrootvader van': None,
-        'broer van': rel.siblingOf,
-        'grootvader van': rel.grandchildOf,
-        'had als getuige': None,
-        'had als klerk': None,
-        'had als vertaler': None,
-        'kind trouwde met kind van': None,
-        'kleinzoon van': rel.grandparentOf,
-        'neef van': None,
-        'niet gespecificeerd': None,
-        'oom van': None,
-        'opgevolgd door': None,
-        'opvolger van': None,
-        'oudoom van': None,
-        'overgrootvader van': None,
-        'samenwerking met': rel.collaboratesWith,
-        'schoonvader van': None,
-        'schoonzoon van': None,
-        'stiefvader van': None,
-        'stiefzoon van': None,
-        'vader van': rel.childOf,
-        'was getuige bij': None,
-        'was klerk bij': None,
-        'was vertaler bij': None,
-        'zoon van': rel.parentOf,
-        'zwager van': None
+
+def convertNotaries(notaries: list,
+                    g,
+                    places: PlaceRegistry,
+                    relationCollector: RelationCollector,
+                    networkBuilder: NetworkBuilder,
+                    tables: ColumnarWriter = None,
+                    propertyGraph: PropertyGraphWriter = None,
+                    validation: ValidationReport = None,
+                    metrics: Metrics = None) -> Counter:
+    """Convert notaries to RDF in graph `g`, which should also be the
+    `rdfSubject.db`, with `emitNotary`. Their relations are only collected,
+    see `relationsToRDF`. Events of a type without class are skipped and
+    counted per type, see `skippedEvents`.
+
+    Args:
+        notaries (list): Notaries from the Notarissennetwerk export.
+        g (Graph): Graph to add the triples to.
+        places (PlaceRegistry): Registry of the places in `g`.
+        relationCollector (RelationCollector): Collects the relations.
+        networkBuilder (NetworkBuilder): Collects the notaries in the
+        relation network.
+        tables (ColumnarWriter, optional): Analytics tables to fill in the
+        same pass. Defaults to None.
+        propertyGraph (PropertyGraphWriter, optional): Property-graph
+        import files to write in the same pass. Defaults to None.
+        validation (ValidationReport, optional): Report to add the
+        violations of `NOTARY_RULES` to. Defaults to None (not checked).
+        metrics (Metrics, optional): Progress to count the notaries in.
+        Defaults to None.
+
+    Returns:
+        Counter: Counts for the run report.
+    """
+
+    counts = Counter()
+
+    for notary in notaries:
+        emitNotary(notary, g, places, relationCollector, networkBuilder,
+                   tables, propertyGraph, validation, counts)
+        if metrics:
+            metrics.step()
+
+    return counts
+
+
+def relationsToRDF(g,
+                   relationCollector: RelationCollector,
+                   networkBuilder: NetworkBuilder,
+                   tables: ColumnarWriter = None,
+                   propertyGraph: PropertyGraphWriter = None):
+    """Resolve the collected relations and add them to graph `g` (and the
+    analytics tables and property graph, if given). The subproperty axioms
+    of the relation properties are in `VOCABULARY`.
+
+    Returns:
+        tuple: The canonical relations and their distinct triples.
+    """
+
+    relations = relationCollector.resolve()
+    relationTriples = relationCollector.triples(relations, nsPerson)
+
+    g.addN((s, p, o, g) for s, p, o in relationTriples)
+
+    for s, t, o in relations:
+        networkBuilder.addEdge(s, o, t)
+        prop = rel2prop.get(t) or schema.knows
+
+        if tables:
+            tables.add('relations',
+                       source=s,
+                       target=o,
+                       type=t,
+                       property=prop)
+
+        if propertyGraph:
+            propertyGraph.relation(nsPerson.term(str(s)), t,
+                                   nsPerson.term(str(o)), prop)
+
+    return relations, relationTriples
+
+
+def checkLinks(links, linkReport: str, linkCache: str = None) -> dict:
+    """Check external links and write the broken ones to `linkReport`."""
+
+    from linkChecker import LinkChecker, writeReport
+
+    checker = LinkChecker(cachePath=linkCache)
+    results = checker.check(links)
+
+    return {
+        'checked': len(results),
+        'requests': checker.requests,
+        'cached': checker.cacheHits,
+        'broken': writeReport(results, linkReport)
     }
 
-    ds = Dataset()
-    dataset = ns.term('')
 
+def publishSparql(endpoint: str, target: str, published: dict) -> dict:
+    """Load the canonical TriG in `target` into a SPARQL endpoint: only the
+    diff if the endpoint has the previous version, and nothing if it has
+    this version. See `sparqlPublisher.py`."""
+
+    from sparqlPublisher import SparqlPublisher
+
+    return SparqlPublisher(endpoint, ns).publish(target, published)
+
+
+def addCacheMetrics(metrics: Metrics):
+    """Report the hit rates of the place link, Adamlink and date lookups.
+    These caches are global, so they are registered once per run, and only
+    the `PlaceRegistry` of every chunk is registered again."""
+
+    metrics.cache('placeLinks', placeIndex)
+    metrics.cache('adamlink', streetIndex)
+    metrics.cache('eventDates', eventDates.cache_info)
+    metrics.cache('roleDates', roleDates.cache_info)
+
+
+def toRDF(d: dict,
+          target: str,
+          networkTarget: str = None,
+          linkReport: str = None,
+          linkCache: str = None,
+          store: str = None,
+          canonical: bool = False,
+          tablesTarget: str = None,
+          graphTarget: str = None,
+          relationMentions: list = None,
+          validate: bool = True,
+          metricsTarget: str = None):
+    """Convert the earlier harvested and structured data to RDF.
+
+    Args:
+        d (dict): Dictionary from Notarissennetwerk
+        target (str): Destination file path.
+        networkTarget (str, optional): Destination of the relation network,
+        collected in the same pass. Defaults to None (not written).
+        linkReport (str, optional): Check all external links and write the
+        broken ones to this CSV file. Defaults to None (not checked).
+        linkCache (str, optional): JSON file to cache link checks in.
+        store (str, optional): SQLite file to build the dataset in, which
+        can be reopened with `sqliteStore.openDataset`. Defaults to None
+        (in memory).
+        canonical (bool, optional): Write sorted, canonical TriG with a
+        checksum manifest, and leave `target` untouched if unchanged. See
+        `publish.py`. Defaults to False.
+        tablesTarget (str, optional): Directory to write the columnar
+        analytics tables to, in the same pass. See `columnar.py`. Defaults
+        to None (not written).
+        graphTarget (str, optional): Directory to write the property-graph
+        bulk-import files to, in the same pass. See `propertyGraph.py`.
+        Defaults to None (not written).
+        relationMentions (list, optional): (source, type, target) relation
+        mentions to use instead of the relations of the notaries in `d`,
+        for a subset of an export. Defaults to None.
+        validate (bool, optional): Check the notaries against the
+        data-quality rules in `NOTARY_RULES` during the conversion and add
+        the violations to the report. Defaults to True.
+        metricsTarget (str, optional): Metrics file (Prometheus text format)
+        that is rewritten during the conversion, together with a progress
+        line on stderr. See `metrics.py`. Defaults to None (silent).
+
+    Returns:
+        dict: Run report with counts of the conversion.
+    """
+
+    ds = openDataset(store, overwrite=True)
     g = rdfSubject.db = ds.graph(identifier=ns)
 
-    type2eventType = {
-        None:
-        None,
-        '':
-        None,
-        'aanstelling':
-        EventType(nsEventType.term('aanstelling'),
-                  label=[Literal('Aanstelling', lang='nl')]),
-        'admissie':
-        EventType(nsEventType.term('admissie'),
-                  label=[Literal('Admissie', lang='nl')]),
-        'ambtsbeëindiging':
-        EventType(nsEventType.term('ambtsbeeindiging'),
-                  label=[Literal('Ambtsbeëindiging', lang='nl')]),
-        'begraven':
-        EventType(nsEventType.term('begrafenis'),
-                  label=[Literal('Begrafenis', lang='nl')]),
-        'benoeming':
-        EventType(nsEventType.term('benoeming'),
-                  label=[Literal('Benoeming', lang='nl')]),
-        'doop':
-        EventType(nsEventType.term('doop'), label=[Literal('Doop',
-                                                           lang='nl')]),
-        'faillissement':
-        EventType(nsEventType.term('faillissement'),
-                  label=[Literal('Faillissement', lang='nl')]),
-        'geboren':
-        EventType(nsEventType.term('geboorte'),
-                  label=[Literal('Geboorte', lang='nl')]),
-        'gescheiden':
-        EventType(nsEventType.term('scheiding'),
-                  label=[Literal('Scheiding', lang='nl')]),
-        'huwelijk':
-        EventType(nsEventType.term('huwelijk'),
-                  label=[Literal('Huwelijk', lang='nl')]),
-        'ondertrouw':
-        EventType(nsEventType.term('ondertrouw'),
-                  label=[Literal('Ondertrouw', lang='nl')]),
-        'overlijden':
-        EventType(nsEventType.term('overlijden'),
-                  label=[Literal('Overlijden', lang='nl')]),
-        'tijdelijk ambt gestaakt':
-        EventType(nsEventType.term('tijdelijkeambtsstaking'),
-                  label=[Literal('Tijdelijke ambtsstaking', lang='nl')])
-    }
+    places = PlaceRegistry(newPlace)
 
-    #############
-    # Resources #
-    #############
+    networkBuilder = NetworkBuilder(rel2prop)
+    relationCollector = RelationCollector(rel2prop,
+                                          rel2prop_inverse,
+                                          default=schema.knows)
 
-    for notary in d['notaries']:
+    if relationMentions is not None:
+        for mention in relationMentions:
+            relationCollector.add(*mention)
+        relationCollector.freeze()
 
-        roleCounter = count(1)
+    tables = ColumnarWriter(tablesTarget) if tablesTarget else None
+    propertyGraph = PropertyGraphWriter(graphTarget) if graphTarget else None
+    validation = ValidationReport(NOTARY_RULES) if validate else None
 
-        page = CreativeWork(URIRef(notary['uri']))
+    metrics = None
+    if metricsTarget:
+        metrics = Metrics(metricsTarget, total=len(d['notaries']))
+        metrics.gauge('triples', lambda: len(g))
+        metrics.cache('places', places)
+        addCacheMetrics(metrics)
 
-        if notary['place']:
-            placeidentifier = "".join([
-                i for i in notary['place']
-                if i.lower() in 'abcdefghijklmnopqrstuvwxyz-'
-            ])
-            birthPlace = Place(nsPlace.term(placeidentifier),
-                               name=[notary['place']],
-                               sameAs=getSameAsPlace(notary['place']))
-        else:
-            birthPlace = None
-
-        pn = PersonName(nsPersonName.term(str(notary['id'])),
-                        prefix=notary['title'],
-                        givenName=notary['firstName'],
-                        patronym=notary['patronym'],
-                        baseSurname=notary['lastName'],
-                        surnamePrefix=notary['prefix'],
-                        literalName=notary['name'],
-                        label=[notary['name']])
-
-        if notary['prefix']:
-            familyName = notary['prefix'].capitalize(
-            ) + ' ' + notary['lastName']
-        else:
-            familyName = notary['lastName']
-
-        p = Person(nsPerson.term(str(notary['id'])),
-                   name=[notary['name']],
-                   hasName=[pn],
-                   givenName=notary['firstName'],
-                   familyName=familyName,
-                   birthPlace=birthPlace)
-
-        # identifiers
-        identifiers = []
-        ## protocol
-        if notary['section_id'] and notary['col_id'] == 5075:
-            identifier = PropertyValue(
-                None,
-                name=[Literal("Protocol Notarieel Archief", lang="nl")],
-                value=str(notary['section_id']))
-            identifiers.append(identifier)
-
-            notaryData = notarissenEAD[str(notary['section_id'])]
-
-            uri = notaryData['uri']
-            p.url = uri
-
-            inventoryCodes = zip(notaryData['inventories'],
-                                 notaryData['codes'])
-
-            for inv, code in inventoryCodes:
-                b = InventoryBook(URIRef(inv), name=[code], author=[p])
-
-        ## repertorium
-        if notary['rep_id']:
-            identifier = PropertyValue(
-                None,
-                name=[Literal("Repertorium", lang="nl")],
-                value=str(notary['rep_id']))
-            identifiers.append(identifier)
-
-        p.identifier = identifiers
-
-        page.mainEntity = p
-        p.mainEntityOfPage = page
-
-        names = []
-        for n in notary['name_variants']:
-            names.append(n['name'])
-        p.alternateName = names
-
-        # Adresses
-        addresses = []
-        for n, a in enumerate(notary['addresses'], 1):
-            startDate = Literal(a['from'], datatype=XSD.gYear,
-                                normalize=False) if a['from'] else None
-            endDate = Literal(a['to'], datatype=XSD.gYear,
-                              normalize=False) if a['to'] else None
-
-            earliestBeginTimeStamp, latestBeginTimeStamp = yearToDate(
-                a['from'])
-            earliestEndTimeStamp, latestEndTimeStamp = yearToDate(a['to'])
-
-            adamlink = street2adamlink(a['street'])
-
-            if adamlink is None:
-                print(a['street'])
-
-            address = PostalAddress(nsAddress.term(f"{notary['id']}-{n}"),
-                                    streetAddress=a['street'],
-                                    name=[a['street']],
-                                    closeMatch=adamlink)  # TODO: Adamlink
-
-            r = Role(nsRole.term(f"{notary['id']}-{next(roleCounter)}"),
-                     startDate=startDate,
-                     endDate=endDate,
-                     address=address,
-                     name=[a['street']],
-                     hasEarliestBeginTimeStamp=earliestBeginTimeStamp,
-                     hasLatestBeginTimeStamp=latestBeginTimeStamp,
-                     hasEarliestEndTimeStamp=earliestEndTimeStamp,
-                     hasLatestEndTimeStamp=latestEndTimeStamp)
-
-            addresses.append(r)
-
-        # Events
-        lifeEvents = []
-        for nEvent, e in enumerate(notary['events'], 1):
-
-            EventClass = type2class[e['type']]
-            eventTypeLabel = type2label.get(e['type'], "").title()
-            eventType = type2eventType[e['type']]
-
-            if EventClass:
-                if e['date'] and e['date'] not in  ('0000', '0000-00-00'):
-
-                    yearLabel = e['date'][:4]
-
-                    try:
-                        date = datetime.datetime.fromisoformat(
-                            e['date']).date()
-                        date = Literal(date, datatype=XSD.date)
-
-                        timeStamp = date
-                        beginTimeStamp = date
-                        endTimeStamp = date
-                        earliestBeginTimeStamp = date
-                        latestBeginTimeStamp = date
-                        earliestEndTimeStamp = date
-                        latestEndTimeStamp = date
-
-                    except:
-                        if e['date'].endswith('00-00') or len(e['date']) == 4:
-                            date = Literal(e['date'][:4],
-                                           datatype=XSD.gYear,
-                                           normalize=False)
-
-                            timeStamp = None
-                            beginTimeStamp = None
-                            endTimeStamp = None
-                            earliestBeginTimeStamp, latestEndTimeStamp = yearToDate(
-                                e['date'][:4])
-                            earliestEndTimeStamp, latestEndTimeStamp = yearToDate(
-                                e['date'][:4])
-
-                        elif e['date'].endswith('-00') or len(e['date']) == 7:
-                            date = Literal(e['date'][:7],
-                                           datatype=XSD.gYearMonth,
-                                           normalize=False)
-
-                            timeStamp = None
-                            beginTimeStamp = None
-                            endTimeStamp = None
-                            earliestBeginTimeStamp, latestEndTimeStamp = yearToDate(
-                                e['date'][:7])
-                            earliestEndTimeStamp, latestEndTimeStamp = yearToDate(
-                                e['date'][:7])
-
-                        else:
-                            print(e['date'])
-                else:
-                    date = None
-                    timeStamp = date
-                    beginTimeStamp = date
-                    endTimeStamp = date
-                    earliestBeginTimeStamp = date
-                    latestBeginTimeStamp = date
-                    earliestEndTimeStamp = date
-                    latestEndTimeStamp = date
-
-                    yearLabel = "?"
-
-                if e['place']:
-                    placeidentifier = "".join([
-                        i for i in e['place']
-                        if i.lower() in 'abcdefghijklmnopqrstuvwxyz-'
-                    ])
-                    place = Place(nsPlace.term(placeidentifier),
-                                  name=[e['place']],
-                                  sameAs=getSameAsPlace(e['place']))
-                else:
-                    place = None
-
-                o = EventClass(
-                    nsEvent.term(f"{notary['id']}-{nEvent}"),
-                    eventType=eventType,
-                    date=date,
-                    hasTimeStamp=timeStamp,
-                    hasBeginTimeStamp=beginTimeStamp,
-                    hasEndTimeStamp=endTimeStamp,
-                    hasEarliestBeginTimeStamp=earliestBeginTimeStamp,
-                    hasLatestBeginTimeStamp=latestEndTimeStamp,
-                    hasEarliestEndTimeStamp=earliestEndTimeStamp,
-                    hasLatestEndTimeStamp=latestEndTimeStamp,
-                    place=place,
-                    label=[f"{eventTypeLabel} van {p.name[0]} ({yearLabel})"])
-                try:
-                    o.principal = p
-                except AttributeError:
-                    o.partner = [p]
-
-                lifeEvents.append(o)
-
-                if EventClass == Birth:
-                    p.birth = o
-                    p.birthDate = date
-                elif EventClass == Death:
-                    p.death = o
-                    p.deathDate = date
-
-        p.address = addresses
-        p.event = lifeEvents
-
-        # Occupations
-        occupations = []
-        for occ in notary['jobs']:
-            startDate = Literal(occ['from'],
-                                datatype=XSD.gYear,
-                                normalize=False) if occ['from'] else None
-            endDate = Literal(occ['to'], datatype=XSD.gYear,
-                              normalize=False) if occ['to'] else None
-
-            earliestBeginTimeStamp, latestBeginTimeStamp = yearToDate(
-                occ['from'])
-            earliestEndTimeStamp, latestEndTimeStamp = yearToDate(occ['to'])
-
-            occupation = Occupation(nsOccupation.term("".join([
-                i for i in occ['details']
-                if i.lower() in 'abcdefghijklmnopqrstuvwxyz-'
-            ])),
-                                    name=[occ['details']])
-
-            r = Role(nsRole.term(f"{notary['id']}-{next(roleCounter)}"),
-                     startDate=startDate,
-                     endDate=endDate,
-                     hasOccupation=occupation,
-                     name=[occ['details']],
-                     hasEarliestBeginTimeStamp=earliestBeginTimeStamp,
-                     hasLatestBeginTimeStamp=latestBeginTimeStamp,
-                     hasEarliestEndTimeStamp=earliestEndTimeStamp,
-                     hasLatestEndTimeStamp=latestEndTimeStamp)
-
-            occupations.append(r)
-
-        p.hasOccupation = occupations
-
-        # Portrait
-
-        if notary['portrait']:
-            if notary['portrait'].startswith(
-                    'https://notarissennetwerk.nl/images/'):
-                portraituri = URIRef(urllib.parse.quote(notary['portrait']))
-                portrait = VisualArtwork(None, about=p, image=portraituri)
-            else:
-                portrait = VisualArtwork(URIRef(notary['portrait']), about=p)
-            p.subjectOf = [portrait]
-
-        # Relations
-        for relation in notary['relations']:
-            prop = rel2prop[relation['type']]
-            propInverse = rel2prop_inverse[relation['type']]
-
-            if prop is None:
-                prop = schema.knows
-            if propInverse is None:
-                propInverse = schema.knows
-
-            # prop = schema.knows
-            obj = nsPerson.term(str(relation['id']))
-
-            g.add((p.resUri, prop, obj))
-            g.add((obj, propInverse, p.resUri))
+    #############
+    # Resources #
+    #############
 
-    for prop in list(rel2prop.values()) + list(rel2prop_inverse.values()):
-        if prop:
-            g.add((prop, RDFS.subPropertyOf, schema.knows))
+    counts = convertNotaries(d['notaries'], g, places, relationCollector,
+                             networkBuilder, tables, propertyGraph,
+                             validation, metrics)
+
+    relations, relationTriples = relationsToRDF(g, relationCollector,
+                                                networkBuilder, tables,
+                                                propertyGraph)
 
     ########
     # Meta #
     ########
 
+    VOCABULARY.addTo(g)
+
     rdfSubject.db = ds
 
-    ds.bind('owl', OWL)
-    ds.bind('dcterms', dcterms)
-    ds.bind('ga', ga)
-    ds.bind('schema', schema)
-    ds.bind('sem', sem)
-    ds.bind('void', void)
-    ds.bind('foaf', foaf)
-    ds.bind('bio', bio)
-    ds.bind('skos', SKOS)
-    ds.bind('pnv', pnv)
-    ds.bind('rel', rel)
+    bindNamespaces(ds)
+
+    if canonical:
+        published = publish(canonicalLines(g), target, ns)
+    else:
+        ds.serialize(target, format='trig')
+
+    if networkTarget:
+        networkBuilder.build().write(networkTarget)
+
+    report = {
+        'notaries': len(d['notaries']),
+        'places': {
+            'resources': len(places.places),
+            'linked': sum(1 for p in places.places if placeIndex.lookup(p))
+        },
+        'approximateStreets': counts['approximateStreets'],
+        'unresolvedStreets': counts['unresolvedStreets'],
+        'skippedEvents': skippedEvents(counts),
+        'relations': relationCollector.report(relations, relationTriples)
+    }
+
+    if canonical:
+        report['publish'] = published
+
+    if tables:
+        report['tables'] = tables.close()
+
+    if propertyGraph:
+        report['propertyGraph'] = propertyGraph.close()
+
+    if validation:
+        report['validation'] = validation.report()
+
+    if metrics:
+        report['metrics'] = metrics.close()
+
+    if linkReport:
+        from linkChecker import collectLinks
 
-    ds.serialize(target, format='trig')
+        report['links'] = checkLinks(collectLinks(g), linkReport, linkCache)
+
+    if store:
+        ds.store.commit()
+        ds.close()
+
+    return report
+
+
+def toRDFChunked(d: dict,
+                 target: str,
+                 chunkSize: int = 500,
+                 spillDirectory: str = None,
+                 memoryLimit: int = None,
+                 networkTarget: str = None,
+                 linkReport: str = None,
+                 linkCache: str = None,
+                 canonical: bool = False,
+                 tablesTarget: str = None,
+                 graphTarget: str = None,
+                 validate: bool = True,
+                 metricsTarget: str = None):
+    """Convert the data to RDF in chunks of `chunkSize` notaries, keeping
+    only one chunk in memory. Every chunk is converted into a fresh graph,
+    spilled to disk and released. The chunks are merged into `target`.
+
+    Args:
+        d (dict): Dictionary from Notarissennetwerk
+        target (str): Destination file path.
+        chunkSize (int, optional): Number of notaries per chunk. Defaults to
+        500.
+        spillDirectory (str, optional): Directory for the chunk files.
+        Defaults to a temporary directory.
+        memoryLimit (int, optional): Maximum resident set size in MB. A
+        MemoryError is raised when a chunk leaves more than this in use.
+        Defaults to None (no limit).
+        networkTarget (str, optional): See `toRDF`.
+        linkReport (str, optional): See `toRDF`.
+        linkCache (str, optional): See `toRDF`.
+        canonical (bool, optional): See `toRDF`.
+        tablesTarget (str, optional): See `toRDF`.
+        graphTarget (str, optional): See `toRDF`.
+        validate (bool, optional): See `toRDF`.
+        metricsTarget (str, optional): See `toRDF`.
+
+    Returns:
+        dict: Run report with counts of the conversion.
+    """
+
+    spill = ChunkSpill(spillDirectory, shared=(nsPlace, nsOccupation))
+    spill.writeLines(VOCABULARY.lines)
+
+    networkBuilder = NetworkBuilder(rel2prop)
+    relationCollector = RelationCollector(rel2prop,
+                                          rel2prop_inverse,
+                                          default=schema.knows)
+
+    tables = ColumnarWriter(tablesTarget) if tablesTarget else None
+    propertyGraph = PropertyGraphWriter(graphTarget) if graphTarget else None
+    validation = ValidationReport(NOTARY_RULES) if validate else None
+
+    counts = Counter()
+    placenames = set()
+    links = set()
+    peakRss = currentRss()
+
+    notaries = d['notaries']
+
+    metrics = None
+    if metricsTarget:
+        metrics = Metrics(metricsTarget, total=len(notaries))
+        metrics.gauge('triples', lambda: spill.triples + len(g))
+        metrics.gauge('chunks', lambda: len(spill.chunks))
+        addCacheMetrics(metrics)
+
+    for n in range(0, len(notaries), chunkSize):
+
+        ds = Dataset()
+        g = rdfSubject.db = ds.graph(identifier=ns)
+
+        places = PlaceRegistry(newPlace)
+        if metrics:
+            metrics.cache('places', places)
+
+        counts += convertNotaries(notaries[n:n + chunkSize], g, places,
+                                  relationCollector, networkBuilder, tables,
+                                  propertyGraph, validation, metrics)
+        placenames.update(places.places)
+
+        if linkReport:
+            from linkChecker import collectLinks
+
+            links.update(collectLinks(g))
+
+        spill.write(g)
+
+        del ds, g, places
+        rdfSubject.db = None
+        gc.collect()
+
+        rss = currentRss()
+        peakRss = max(peakRss, rss)
+        if memoryLimit and rss > memoryLimit * 1024 * 1024:
+            spill.close()
+            raise MemoryError(
+                f"Chunk {len(spill.chunks)} leaves {rss // 2**20} MB in use, "
+                f"more than the limit of {memoryLimit} MB. Use a smaller "
+                "chunkSize.")
+
+    ds = Dataset()
+    g = rdfSubject.db = ds.graph(identifier=ns)
+
+    relations, relationTriples = relationsToRDF(g, relationCollector,
+                                                networkBuilder, tables,
+                                                propertyGraph)
+    spill.write(g)
+
+    if metrics:
+        metrics.gauge('triples', lambda: spill.triples)
+
+    if canonical:
+        published = publish(spill.lines(), target, ns)
+    else:
+        spill.merge(target, ns, NAMESPACES)
+
+    if networkTarget:
+        networkBuilder.build().write(networkTarget)
+
+    report = {
+        'notaries': len(notaries),
+        'places': {
+            'resources': len(placenames),
+            'linked': sum(1 for p in placenames if placeIndex.lookup(p))
+        },
+        'approximateStreets': counts['approximateStreets'],
+        'unresolvedStreets': counts['unresolvedStreets'],
+        'skippedEvents': skippedEvents(counts),
+        'relations': relationCollector.report(relations, relationTriples),
+        'chunks': {
+            'chunks': len(spill.chunks),
+            'chunkSize': chunkSize,
+            'triples': spill.triples,
+            'sharedDuplicates': spill.duplicates,
+            'mergedDuplicates': spill.mergedDuplicates,
+            'peakRss': peakRss // 2**20,
+            'memoryLimit': memoryLimit
+        }
+    }
+
+    if canonical:
+        report['publish'] = published
+
+    if tables:
+        report['tables'] = tables.close()
+
+    if propertyGraph:
+        report['propertyGraph'] = propertyGraph.close()
+
+    if validation:
+        report['validation'] = validation.report()
+
+    if metrics:
+        report['metrics'] = metrics.close()
+
+    spill.close()
+
+    if linkReport:
+        report['links'] = checkLinks(links, linkReport, linkCache)
+
+    return report
+
+
+def toRDFSubset(export: str,
+                ids: list,
+                target: str,
+                depth: int = 0,
+                **options) -> dict:
+    """Convert only some notaries of a saved export, read through an
+    `ExportIndex`. The fragment has the same URIs and triples as a full
+    run, including the relations with notaries outside the subset.
+
+    Args:
+        export (str): Path of the export (JSON).
+        ids (list): Ids of the notaries to convert.
+        target (str): Destination file path.
+        depth (int, optional): Also convert the relation neighbours of the
+        notaries up to this many steps away. Defaults to 0.
+        **options: Further keyword arguments of `toRDF`.
+
+    Returns:
+        dict: Run report with counts of the conversion.
+    """
+
+    index = ExportIndex(export)
+
+    missing = [i for i in ids if i not in index]
+    if missing:
+        raise KeyError(f"Notaries not in {export}: {missing}")
+
+    d = index.subset(ids, depth)
+    mentions = index.mentions(notary['id'] for notary in d['notaries'])
+
+    return toRDF(d, target, relationMentions=mentions, **options)
 
 
 if __name__ == "__main__":
 
-    # DATA = 'data/notarissen.json'
-    # with open(DATA) as infile:
-    #     DATA = json.load(infile)
+    from sources import fetchSources, SOURCES
 
-    DATA = requests.get(
-        "https://notarissennetwerk.nl/notarissen/export/json").json()
+    # Only the export, the EAD is fetched and converted by eadParser.py
+    PATHS = fetchSources({'notarissen': SOURCES['notarissen']}, 'sources')
 
-    TARGET = 'trig/notarissennetwerk.trig'
+    with open(PATHS['notarissen']) as infile:
+        DATA = json.load(infile)
 
-    main(loadData=DATA, target=TARGET)
+    # Keep every export, to rebuild earlier versions (see snapshots.py)
+    from snapshots import SnapshotStore
+
+    SNAPSHOTS = SnapshotStore('sources/snapshots.sqlite')
+    SNAPSHOTS.add(DATA)
+    SNAPSHOTS.close()
+
+    TARGET = 'trig/notarissennetwerk.trig'
+    NETWORK = 'trig/notarissennetwerk_network.json'
+    REPORT = 'trig/notarissennetwerk_report.json'
+    TABLES = 'trig/tables/'
+    METRICS = 'trig/notarissennetwerk.prom'
+
+    report = main(loadData=DATA,
+                  target=TARGET,
+                  networkTarget=NETWORK,
+                  canonical=True,
+                  tablesTarget=TABLES,
+                  metricsTarget=METRICS)
+
+    with open(REPORT, 'w') as outfile:
+        json.dump(report, outfile, indent=4)
@@ -0,0 +1,194 @@
+"""
+Declarative mapping of export records to RDF resources.
+
+The mapping of a kind of record (a notary, or an item in one of its lists)
+is a `Resource`: the class of the resource it becomes, the template of its
+URI, how its dates are read, and its properties:
+
+```python
+Resource(PostalAddress,
+         Template(nsAddress, '{id}-{n}'),
+         streetAddress=Field('street'),
+         name=[Field('street')])
+```
+
+Values are:
+
+    * `Field(key)`: a field of the record, `Field(key, 'notary')` of the
+      notary the record belongs to;
+    * `Var(name)`: a variable, given by the conversion (e.g. the resource a
+      Role is about) or read from the dates;
+    * `Const(value)`: any Python object;
+    * `Call(fn, *args)`: the result of a function, where `fn` is a function
+      or the name of a variable, and plain strings in `args` are fields;
+    * `Template(namespace, template)`: a URI in `namespace`, with `{name}`
+      replaced by variable `name` if it is given, or else by field `name` of
+      the notary (e.g. `'{id}-{n}'`). Without namespace, a string;
+    * a list of values. Other objects are constants.
+
+`Dates(fn, *args, names=...)` declares the dates of a record: `fn` (e.g.
+`main.roleDates`) is called with the values of `args`, and the parts of its
+result become the variables in `names`.
+
+`compileResource` compiles a `Resource` once into a function
+`emit(record, notary, variables)` with a prepared getter per value, so that
+the mapping is not interpreted again for every record.
+"""
+
+from string import Formatter
+
+
+class Field:
+
+    def __init__(self, key: str, record: str = None):
+        self.key = key
+        self.record = record
+
+    def compile(self):
+        key = self.key
+        if self.record == 'notary':
+            return lambda record, notary, variables: notary[key]
+        return lambda record, notary, variables: record[key]
+
+
+class Var:
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def compile(self):
+        name = self.name
+        return lambda record, notary, variables: variables[name]
+
+
+class Const:
+
+    def __init__(self, value):
+        self.value = value
+
+    def compile(self):
+        value = self.value
+        return lambda record, notary, variables: value
+
+
+class Call:
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def compile(self):
+        args = tuple(
+            compileValue(Field(a) if isinstance(a, str) else a)
+            for a in self.args)
+
+        if isinstance(self.fn, str):
+            name = self.fn
+
+            def call(record, notary, variables):
+                return variables[name](*[a(record, notary, variables)
+                                         for a in args])
+        else:
+            fn = self.fn
+
+            def call(record, notary, variables):
+                return fn(*[a(record, notary, variables) for a in args])
+
+        return call
+
+
+class Template:
+
+    def __init__(self, namespace, template: str):
+        self.namespace = namespace
+        self.template = template
+
+    def compile(self):
+        template = self.template
+        names = tuple(name for _, name, _, _ in Formatter().parse(template)
+                      if name)
+        term = self.namespace.term if self.namespace is not None else str
+
+        def format(record, notary, variables):
+            return term(
+                template.format(
+                    **{
+                        name:
+                        variables[name] if name in variables else notary[name]
+                        for name in names
+                    }))
+
+        return format
+
+
+class Dates:
+    """The dates of a record: `fn` of the values of `args`, with its result
+    as the variables in `names`."""
+
+    def __init__(self, fn, *args, names: tuple):
+        self.fn = fn
+        self.args = args
+        self.names = names
+
+
+class Resource:
+    """A resource of class `cls` with URI `uri`, dates and properties."""
+
+    def __init__(self, cls, uri, dates: Dates = None, **properties):
+        self.cls = cls
+        self.uri = uri
+        self.dates = dates
+        self.properties = properties
+
+
+def compileValue(value):
+    """A function `(record, notary, variables)` that gives `value`."""
+
+    if isinstance(value, (Field, Var, Const, Call, Template)):
+        return value.compile()
+
+    if isinstance(value, list):
+        items = tuple(compileValue(item) for item in value)
+        return lambda record, notary, variables: [
+            item(record, notary, variables) for item in items
+        ]
+
+    return lambda record, notary, variables: value
+
+
+def compileResource(resource: Resource):
+    """Compile a resource mapping into a function `emit(record, notary,
+    variables)` that creates the resource of a record. The dates of the
+    record are added to `variables`.
+
+    Returns:
+        function: The compiled function.
+    """
+
+    cls = resource.cls
+    uri = compileValue(resource.uri)
+    properties = tuple((name, compileValue(value))
+                       for name, value in resource.properties.items())
+
+    dates = resource.dates
+    if dates:
+        datesFn = dates.fn
+        datesNames = dates.names
+        datesArgs = Call(lambda *args: args, *dates.args).compile()
+
+    def emit(record: dict, notary: dict, variables: dict):
+
+        if dates:
+            variables.update(
+                zip(datesNames,
+                    datesFn(*datesArgs(record, notary, variables))))
+
+        return cls(
+            uri(record, notary, variables), **{
+                name: value(record, notary, variables)
+                for name, value in properties
+            })
+
+    emit.resource = resource
+
+    return emit
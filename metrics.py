@@ -0,0 +1,222 @@
+"""
+Live progress and metrics of long conversions.
+
+`Metrics` counts the processed items of a loop (notaries in `main.toRDF`,
+components in `eadParser.parseDsc`) and, at most every `interval` seconds,
+rewrites a metrics file in the Prometheus text format and prints a progress
+line. The file is replaced atomically, so that it can be read at any time,
+e.g. by the textfile collector of the node exporter:
+
+    notarissen_notaries_processed_total 1200
+    notarissen_notaries_per_second 85.3
+    notarissen_eta_seconds 44
+    notarissen_rss_bytes 327155712
+    notarissen_triples 152340
+    notarissen_cache_hits_total{cache="places"} 1187
+    notarissen_last_update_timestamp_seconds 1666000000.0
+
+A stalled run shows as a `last_update_timestamp_seconds` (or a
+`processed_total`) that does not increase. The overhead is a counter and a
+clock reading per `step`.
+"""
+
+import os
+import sys
+import time
+
+from spill import currentRss
+
+
+def duration(seconds: float) -> str:
+    """Format seconds as h:mm:ss.
+
+    >>> duration(3725)
+    '1:02:05'
+    """
+
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class Metrics:
+    """Progress and metrics of a loop over `total` items.
+
+    Args:
+        path (str, optional): Metrics file (Prometheus text format).
+        Defaults to None (only a progress line).
+        total (int, optional): Number of items, for the ETA. Defaults to
+        None (unknown).
+        unit (str, optional): Name of the items. Defaults to 'notaries'.
+        prefix (str, optional): Prefix of the metric names. Defaults to
+        'notarissen'.
+        interval (float, optional): Seconds between updates. Defaults to 10.
+        stream (file, optional): Stream for the progress line. Defaults to
+        stderr, None for no progress line.
+    """
+
+    def __init__(self,
+                 path: str = None,
+                 total: int = None,
+                 unit: str = 'notaries',
+                 prefix: str = 'notarissen',
+                 interval: float = 10,
+                 stream=sys.stderr):
+
+        self.path = path
+        self.total = total
+        self.unit = unit
+        self.prefix = prefix
+        self.interval = interval
+        self.stream = stream
+
+        self.processed = 0
+        self.gauges = {}
+        self.caches = {}
+        self.cacheBase = {}
+
+        self.start = self.last = time.monotonic()
+        self.lastProcessed = 0
+        self.rate = 0.0
+
+    def gauge(self, name: str, fn):
+        """Report the value of `fn()` as gauge `name` at every update."""
+        self.gauges[name] = fn
+
+    def cache(self, name: str, source):
+        """Report the hits and misses of cache `name`. `source` has `hits`
+        and `misses` attributes (e.g. a `PlaceRegistry`), or is a function
+        that returns such an object (e.g. the `cache_info` of an
+        `lru_cache`). If a cache is registered again (e.g. the registry of
+        the next chunk), the counts of the previous source are kept."""
+
+        if name in self.caches:
+            self.cacheBase[name] = self._cacheCounts(name)
+        self.caches[name] = source
+
+    def _cacheCounts(self, name: str) -> tuple:
+
+        source = self.caches[name]
+        info = source() if callable(source) else source
+        hits, misses = self.cacheBase.get(name, (0, 0))
+
+        return hits + info.hits, misses + info.misses
+
+    def step(self, n: int = 1):
+        """Count `n` processed items, and update if it is time."""
+
+        self.processed += n
+
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.update(now)
+
+    def update(self, now: float = None):
+        """Write the metrics file and the progress line."""
+
+        now = now or time.monotonic()
+        elapsed = now - self.start
+
+        if now > self.last:
+            self.rate = (self.processed - self.lastProcessed) / (now -
+                                                                self.last)
+        self.last = now
+        self.lastProcessed = self.processed
+
+        eta = None
+        if self.total and self.processed:
+            eta = (self.total - self.processed) * elapsed / self.processed
+
+        rss = currentRss()
+        gauges = {name: fn() for name, fn in self.gauges.items()}
+        caches = {name: self._cacheCounts(name) for name in self.caches}
+
+        if self.path:
+            self.write(elapsed, eta, rss, gauges, caches)
+
+        if self.stream:
+            progress = f"{self.unit} {self.processed}"
+            if self.total:
+                progress += (f"/{self.total} "
+                             f"({100 * self.processed / self.total:.1f}%)")
+            progress += f", {self.rate:.1f}/s"
+            progress += "".join(f", {value} {name}"
+                                for name, value in gauges.items())
+            progress += f", {rss // 2**20} MB"
+            if eta is not None:
+                progress += f", ETA {duration(eta)}"
+
+            print(progress, file=self.stream, flush=True)
+
+    def write(self, elapsed: float, eta: float, rss: int, gauges: dict,
+              caches: dict):
+
+        p = self.prefix
+        lines = []
+
+        def metric(name, kind, help, value, labels=''):
+            if not labels or not lines[-1].startswith(f"{name}{{"):
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{labels} {value}")
+
+        metric(f"{p}_{self.unit}_processed_total", 'counter',
+               f"Number of {self.unit} processed.", self.processed)
+        if self.total:
+            metric(f"{p}_{self.unit}", 'gauge', f"Number of {self.unit}.",
+                   self.total)
+        metric(f"{p}_{self.unit}_per_second", 'gauge',
+               f"{self.unit.capitalize()} processed per second.",
+               round(self.rate, 3))
+        metric(f"{p}_elapsed_seconds", 'gauge', "Seconds since the start.",
+               round(elapsed, 3))
+        if eta is not None:
+            metric(f"{p}_eta_seconds", 'gauge',
+                   "Estimated seconds until the end.", round(eta, 3))
+        metric(f"{p}_rss_bytes", 'gauge', "Resident set size.", rss)
+
+        for name, value in gauges.items():
+            metric(f"{p}_{name}", 'gauge', f"Number of {name}.", value)
+
+        for kind, n in (('hits', 0), ('misses', 1)):
+            for name, counts in caches.items():
+                metric(f"{p}_cache_{kind}_total", 'counter',
+                       f"Cache {kind}.", counts[n], f'{{cache="{name}"}}')
+
+        for name, (hits, misses) in caches.items():
+            if hits + misses:
+                metric(f"{p}_cache_hit_ratio", 'gauge', "Cache hit ratio.",
+                       round(hits / (hits + misses), 4),
+                       f'{{cache="{name}"}}')
+
+        metric(f"{p}_last_update_timestamp_seconds", 'gauge',
+               "Time of the last update.", round(time.time(), 3))
+
+        with open(self.path + '.tmp', 'w') as outfile:
+            outfile.write("\n".join(lines) + "\n")
+        os.replace(self.path + '.tmp', self.path)
+
+    def close(self) -> dict:
+        """Write the final metrics.
+
+        Returns:
+            dict: Number of processed items, seconds and cache hits and
+            misses.
+        """
+
+        self.update()
+
+        caches = {name: self._cacheCounts(name) for name in self.caches}
+
+        return {
+            'processed': self.processed,
+            'seconds': round(time.monotonic() - self.start, 3),
+            'caches': {
+                name: {
+                    'hits': hits,
+                    'misses': misses
+                }
+                for name, (hits, misses) in caches.items()
+            }
+        }
@@ -0,0 +1,388 @@
+"""
+Compact relation network of the notaries in https://notarissennetwerk.nl.
+
+The relations in the export (`notary['relations']`) are collected during the
+RDF conversion and stored as CSR (compressed sparse row) arrays, keyed by
+notary id and typed by relation type. This makes it possible to answer
+questions on e.g. succession chains, family clusters or connected components
+without loading the RDF into another tool.
+"""
+
+import csv
+import json
+from array import array
+from collections import deque
+
+SUCCESSION_FORWARD = 'opgevolgd door'  # A opgevolgd door B: A -> B
+SUCCESSION_BACKWARD = 'opvolger van'  # A opvolger van B: B -> A
+
+
+class NetworkBuilder:
+    """Collects typed relations between notaries, e.g. in the `toRDF` loop.
+
+    Args:
+        rel2prop (dict): Mapping of relation type to RDF property (or None).
+    """
+
+    def __init__(self, rel2prop: dict = None):
+        self.rel2prop = rel2prop or {}
+
+        self.nodes = set()
+        self.edges = set()
+
+    def addNode(self, notaryId):
+        self.nodes.add(int(notaryId))
+
+    def addEdge(self, source, target, relationType: str):
+        source = int(source)
+        target = int(target)
+
+        self.nodes.add(source)
+        self.nodes.add(target)
+        self.edges.add((source, target, relationType))
+
+    def build(self):
+        """Freeze the collected relations into a `RelationNetwork`."""
+
+        nodes = sorted(self.nodes)
+        relationTypes = sorted({t for _, _, t in self.edges})
+
+        properties = []
+        for t in relationTypes:
+            prop = self.rel2prop.get(t)
+            properties.append(str(prop) if prop else None)
+
+        return RelationNetwork.fromEdges(nodes, relationTypes, properties,
+                                         self.edges)
+
+
+def _csr(n: int, edges: list):
+    """Counting sort of (row, column, type) tuples into CSR arrays."""
+
+    offsets = array('l', bytes(array('l').itemsize * (n + 1)))
+    for row, _, _ in edges:
+        offsets[row + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    columns = array('l', bytes(array('l').itemsize * len(edges)))
+    types = array('h', bytes(array('h').itemsize * len(edges)))
+
+    position = array('l', offsets[:-1])
+    for row, column, t in sorted(edges):
+        columns[position[row]] = column
+        types[position[row]] = t
+        position[row] += 1
+
+    return offsets, columns, types
+
+
+class RelationNetwork:
+    """Relation network of notaries stored as CSR arrays.
+
+    Nodes are addressed by their index in `nodes` (sorted notary ids). The
+    outgoing edges of node `i` are `targets[offsets[i]:offsets[i + 1]]` with
+    their relation type index in `types`. The transposed arrays (`inOffsets`,
+    `sources`, `inTypes`) hold the incoming edges.
+    """
+
+    def __init__(self, nodes, relationTypes, properties, offsets, targets,
+                 types, inOffsets, sources, inTypes):
+
+        self.nodes = array('l', nodes)
+        self.index = {notaryId: i for i, notaryId in enumerate(self.nodes)}
+
+        self.relationTypes = list(relationTypes)
+        self.properties = list(properties)
+        self.typeIndex = {t: i for i, t in enumerate(self.relationTypes)}
+
+        self.offsets = offsets
+        self.targets = targets
+        self.types = types
+
+        self.inOffsets = inOffsets
+        self.sources = sources
+        self.inTypes = inTypes
+
+    @classmethod
+    def fromEdges(cls, nodes, relationTypes, properties, edges):
+
+        index = {notaryId: i for i, notaryId in enumerate(nodes)}
+        typeIndex = {t: i for i, t in enumerate(relationTypes)}
+
+        outEdges = [(index[s], index[o], typeIndex[t]) for s, o, t in edges]
+        inEdges = [(o, s, t) for s, o, t in outEdges]
+
+        offsets, targets, types = _csr(len(nodes), outEdges)
+        inOffsets, sources, inTypes = _csr(len(nodes), inEdges)
+
+        return cls(nodes, relationTypes, properties, offsets, targets, types,
+                   inOffsets, sources, inTypes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edgeCount(self):
+        return len(self.targets)
+
+    def _typeFilter(self, relationTypes):
+        if relationTypes is None:
+            return None
+        return {self.typeIndex[t] for t in relationTypes if t in self.typeIndex}
+
+    def _neighbours(self, i: int, typeFilter=None, direction='both'):
+
+        if direction in ('out', 'both'):
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                if typeFilter is None or self.types[j] in typeFilter:
+                    yield self.targets[j]
+
+        if direction in ('in', 'both'):
+            for j in range(self.inOffsets[i], self.inOffsets[i + 1]):
+                if typeFilter is None or self.inTypes[j] in typeFilter:
+                    yield self.sources[j]
+
+    def outDegree(self, notaryId) -> int:
+        i = self.index[int(notaryId)]
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def inDegree(self, notaryId) -> int:
+        i = self.index[int(notaryId)]
+        return self.inOffsets[i + 1] - self.inOffsets[i]
+
+    def degree(self, notaryId) -> int:
+        """Number of distinct notaries related to `notaryId`."""
+        i = self.index[int(notaryId)]
+        return len(set(self._neighbours(i)))
+
+    def neighbours(self, notaryId, relationTypes=None) -> list:
+        i = self.index[int(notaryId)]
+        typeFilter = self._typeFilter(relationTypes)
+        return sorted({
+            self.nodes[j]
+            for j in self._neighbours(i, typeFilter=typeFilter)
+        })
+
+    def components(self, relationTypes=None) -> list:
+        """Weakly connected components, largest first.
+
+        Args:
+            relationTypes (iterable, optional): Only follow relations of
+            these types (e.g. family relations). Defaults to all relations.
+
+        Returns:
+            list: A list of sorted lists of notary ids.
+        """
+
+        typeFilter = self._typeFilter(relationTypes)
+        component = array('l', [-1]) * len(self.nodes)
+
+        components = []
+        for start in range(len(self.nodes)):
+            if component[start] != -1:
+                continue
+
+            component[start] = len(components)
+            members = [start]
+            queue = deque([start])
+            while queue:
+                i = queue.popleft()
+                for j in self._neighbours(i, typeFilter=typeFilter):
+                    if component[j] == -1:
+                        component[j] = len(components)
+                        members.append(j)
+                        queue.append(j)
+
+            components.append(sorted(self.nodes[i] for i in members))
+
+        components.sort(key=lambda c: (-len(c), c[0]))
+
+        return components
+
+    def bfs(self, notaryId, maxDepth: int = None, relationTypes=None) -> dict:
+        """Breadth-first search from `notaryId`.
+
+        Returns:
+            dict: Notary id to its distance (number of relations) from
+            `notaryId`, including `notaryId` itself at distance 0.
+        """
+
+        typeFilter = self._typeFilter(relationTypes)
+        start = self.index[int(notaryId)]
+
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            if maxDepth is not None and distances[i] >= maxDepth:
+                continue
+            for j in self._neighbours(i, typeFilter=typeFilter):
+                if j not in distances:
+                    distances[j] = distances[i] + 1
+                    queue.append(j)
+
+        return {self.nodes[i]: d for i, d in distances.items()}
+
+    def shortestPath(self, source, target, relationTypes=None) -> list:
+        """Shortest path of notary ids from `source` to `target`, ignoring
+        the direction of relations. Returns an empty list if unconnected."""
+
+        typeFilter = self._typeFilter(relationTypes)
+        start = self.index[int(source)]
+        end = self.index[int(target)]
+
+        parents = {start: None}
+        queue = deque([start])
+        while queue and end not in parents:
+            i = queue.popleft()
+            for j in self._neighbours(i, typeFilter=typeFilter):
+                if j not in parents:
+                    parents[j] = i
+                    queue.append(j)
+
+        if end not in parents:
+            return []
+
+        path = []
+        i = end
+        while i is not None:
+            path.append(self.nodes[i])
+            i = parents[i]
+
+        return path[::-1]
+
+    def successors(self) -> dict:
+        """Succession edges (predecessor -> successors) from `opgevolgd door`
+        and `opvolger van` relations."""
+
+        succession = {}
+
+        forward = self.typeIndex.get(SUCCESSION_FORWARD)
+        backward = self.typeIndex.get(SUCCESSION_BACKWARD)
+
+        for i in range(len(self.nodes)):
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                t = self.types[j]
+                if t == forward:
+                    succession.setdefault(i, set()).add(self.targets[j])
+                elif t == backward:
+                    succession.setdefault(self.targets[j], set()).add(i)
+
+        return succession
+
+    def successionChains(self) -> list:
+        """Succession chains, e.g. [predecessor, notary, successor].
+
+        A chain runs from a notary with zero or several predecessors or
+        successors to the next such notary, through notaries with exactly one
+        predecessor and one successor, so that it stops at branches. Every
+        succession is part of exactly one chain. Cycles without a branch are
+        one chain, starting at their lowest notary.
+
+        Returns:
+            list: A list of lists of notary ids, in order of succession.
+        """
+
+        succession = self.successors()
+
+        predecessors = {}
+        for i, successors in succession.items():
+            for j in successors:
+                predecessors[j] = predecessors.get(j, 0) + 1
+
+        def passing(i):
+            return predecessors.get(i, 0) == 1 and len(
+                succession.get(i, ())) == 1
+
+        def follow(start, j, covered):
+            chain = [start]
+            while j != start:
+                chain.append(j)
+                covered.add(j)
+                if not passing(j):
+                    break
+                j = next(iter(succession[j]))
+            return [self.nodes[i] for i in chain]
+
+        chains = []
+        covered = set()
+
+        for i in sorted(succession):
+            if passing(i):
+                continue
+            successors = sorted(succession[i] - {i}) or [i]
+            for j in successors:
+                chains.append(follow(i, j, covered))
+
+        for i in sorted(succession):
+            if i not in covered and passing(i):
+                covered.add(i)
+                chains.append(follow(i, next(iter(succession[i])), covered))
+
+        return chains
+
+    def toDict(self) -> dict:
+
+        components = self.components()
+
+        return {
+            'nodes': list(self.nodes),
+            'relationTypes': self.relationTypes,
+            'properties': self.properties,
+            'offsets': list(self.offsets),
+            'targets': list(self.targets),
+            'types': list(self.types),
+            'metrics': {
+                'nodes': len(self.nodes),
+                'edges': self.edgeCount,
+                'components': len(components),
+                'largestComponent': len(components[0]) if components else 0,
+                'successionChains': self.successionChains()
+            }
+        }
+
+    def toJSON(self, target: str):
+        with open(target, 'w') as outfile:
+            json.dump(self.toDict(), outfile)
+
+    def toCSV(self, target: str, nodesTarget: str = None):
+        """Write the typed edge list to `target` and, optionally, a table of
+        per-notary metrics (degrees and component) to `nodesTarget`."""
+
+        with open(target, 'w', newline='') as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(['source', 'target', 'type', 'property'])
+            for i in range(len(self.nodes)):
+                for j in range(self.offsets[i], self.offsets[i + 1]):
+                    t = self.types[j]
+                    writer.writerow([
+                        self.nodes[i], self.nodes[self.targets[j]],
+                        self.relationTypes[t], self.properties[t] or ''
+                    ])
+
+        if nodesTarget:
+            component = {}
+            for n, members in enumerate(self.components()):
+                for notaryId in members:
+                    component[notaryId] = n
+
+            with open(nodesTarget, 'w', newline='') as outfile:
+                writer = csv.writer(outfile)
+                writer.writerow(
+                    ['id', 'degree', 'outDegree', 'inDegree', 'component'])
+                for notaryId in self.nodes:
+                    writer.writerow([
+                        notaryId,
+                        self.degree(notaryId),
+                        self.outDegree(notaryId),
+                        self.inDegree(notaryId), component[notaryId]
+                    ])
+
+    def write(self, target: str):
+        """Write the network as JSON or CSV, depending on the extension."""
+
+        if target.endswith('.csv'):
+            self.toCSV(target, nodesTarget=target[:-4] + '_nodes.csv')
+        else:
+            self.toJSON(target)
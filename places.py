@@ -0,0 +1,111 @@
+"""
+Place lookups for the conversion of https://notarissennetwerk.nl.
+
+Place names in the export are linked to the Getty Thesaurus of Geographic
+Names (TGN) and Ecartico through the tables in `data/`. Spelling variants
+(e.g. `'s Gravenhage`, `'s-Gravenhage` and `s-Gravenhage`) are matched through
+an accent- and punctuation-insensitive index of these tables.
+"""
+
+import re
+
+from unidecode import unidecode
+
+
+def normalizePlace(placename: str) -> str:
+    """Accent- and punctuation-insensitive key of a place name.
+
+    >>> normalizePlace("'s-Gravenhage") == normalizePlace("'s Gravenhage")
+    True
+    >>> normalizePlace('Utrécht')
+    'utrecht'
+    """
+
+    return re.sub(r'[^a-z0-9]', '', unidecode(placename).lower())
+
+
+class PlaceIndex:
+    """Exact and normalized lookup of sameAs links of place names.
+
+    Args:
+        *tables (dict): Mappings of place name to URI, e.g. `place2tgn` and
+        `place2ecartico`. Links are returned in the order of the tables.
+        cacheSize (int, optional): Maximum number of cached lookups, the
+        oldest are dropped first. Defaults to 100000.
+    """
+
+    def __init__(self, *tables: dict, cacheSize: int = 100000):
+        self.tables = tables
+        self.cacheSize = cacheSize
+        self.normalizedTables = []
+
+        for table in tables:
+            normalized = {}
+            for placename, uri in table.items():
+                normalized.setdefault(normalizePlace(placename), uri)
+            self.normalizedTables.append(normalized)
+
+        self.cache = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def links(self, placename: str) -> list:
+        """URIs of a place name, falling back on the normalized name. The
+        lookup is counted in the cache hits and misses."""
+
+        if placename in self.cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return self.lookup(placename)
+
+    def lookup(self, placename: str) -> list:
+        """Like `links`, but uncounted, e.g. for a report."""
+
+        if placename in self.cache:
+            return self.cache[placename]
+
+        key = normalizePlace(placename)
+
+        links = []
+        for table, normalized in zip(self.tables, self.normalizedTables):
+            uri = table.get(placename) or normalized.get(key)
+            if uri:
+                links.append(uri)
+
+        if len(self.cache) >= self.cacheSize:
+            del self.cache[next(iter(self.cache))]
+        self.cache[placename] = links
+
+        return links
+
+
+class PlaceRegistry:
+    """Creates every place resource of a conversion run only once.
+
+    Args:
+        factory (callable): Function that creates the resource of a place
+        name, e.g. a `Place` with its sameAs links.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.places = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, placename: str):
+        if not placename:
+            return None
+
+        place = self.places.get(placename)
+        if place is None:
+            self.misses += 1
+            place = self.places[placename] = self.factory(placename)
+        else:
+            self.hits += 1
+
+        return place
@@ -0,0 +1,231 @@
+"""
+Property-graph bulk-import files of the notary network.
+
+The notaries can be loaded into a property-graph database for traversal
+queries without translating the RDF. The conversion (`main.emitNotary`)
+writes the nodes and relationships in the same pass as the RDF, from the
+same values, in the CSV format of `neo4j-admin database import`:
+
+```bash
+neo4j-admin database import full --id-type=INTEGER --array-delimiter=';' \\
+    --nodes=graph/Person.csv --nodes=graph/Place.csv \\
+    --nodes=graph/PostalAddress.csv --nodes=graph/Occupation.csv \\
+    --nodes=graph/InventoryBook.csv \\
+    --relationships=graph/BORN_IN.csv --relationships=graph/ADDRESS.csv \\
+    --relationships=graph/OCCUPATION.csv --relationships=graph/AUTHOR.csv \\
+    --relationships=graph/RELATION.csv
+```
+
+Every node has a stable integer id, a hash of the IRI it has in the RDF (also
+in its `uri` property), so that both exports can be joined and repeated
+imports give the same ids. Rows are streamed to disk as they are added, only
+the ids of the nodes that were written are kept in memory.
+
+The relations between notaries keep their type: a `RELATION` has the
+relationship type of the relation in the export (e.g. `VADER_VAN`), with the
+type itself and the RDF property it is mapped to as properties.
+"""
+
+import csv
+import hashlib
+import os
+import re
+
+ARRAY_DELIMITER = ';'
+
+NODES = {
+    'Person': [
+        ('uri', 'string'),
+        ('name', 'string'),
+        ('title', 'string'),
+        ('givenName', 'string'),
+        ('patronym', 'string'),
+        ('surnamePrefix', 'string'),
+        ('baseSurname', 'string'),
+        ('familyName', 'string'),
+        ('alternateName', 'string[]'),
+        ('protocol', 'int'),
+        ('repertorium', 'int'),
+        ('url', 'string'),
+        ('portrait', 'string'),
+        ('page', 'string'),
+    ],
+    'Place': [
+        ('uri', 'string'),
+        ('name', 'string'),
+        ('sameAs', 'string[]'),
+    ],
+    'PostalAddress': [
+        ('uri', 'string'),
+        ('streetAddress', 'string'),
+        ('closeMatch', 'string'),
+    ],
+    'Occupation': [
+        ('uri', 'string'),
+        ('name', 'string'),
+    ],
+    'InventoryBook': [
+        ('uri', 'string'),
+        ('name', 'string'),
+    ],
+}
+
+ROLE = [
+    ('uri', 'string'),
+    ('startDate', 'string'),
+    ('endDate', 'string'),
+    ('hasEarliestBeginTimeStamp', 'date'),
+    ('hasLatestBeginTimeStamp', 'date'),
+    ('hasEarliestEndTimeStamp', 'date'),
+    ('hasLatestEndTimeStamp', 'date'),
+]
+
+EDGES = {
+    'BORN_IN': [],  # Person -> Place
+    'ADDRESS': ROLE,  # Person -> PostalAddress
+    'OCCUPATION': ROLE,  # Person -> Occupation
+    'AUTHOR': [],  # InventoryBook -> Person
+    'RELATION': [  # Person -> Person, typed by the RDF property
+        ('type', 'string'),
+        ('property', 'string'),
+    ],
+}
+
+
+def stableId(uri: str) -> int:
+    """Positive 63-bit integer id of a node IRI.
+
+    >>> stableId('https://example.org/a') == stableId('https://example.org/a')
+    True
+    >>> 0 <= stableId('https://example.org/a') < 2**63
+    True
+    """
+
+    digest = hashlib.blake2b(str(uri).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+
+def relationType(relation: str) -> str:
+    """Relationship type of a relation type of the export.
+
+    >>> relationType('vader van')
+    'VADER_VAN'
+    >>> relationType('achter-achterkleinzoon van')
+    'ACHTER_ACHTERKLEINZOON_VAN'
+    """
+
+    return re.sub(r'\W+', '_', relation).strip('_').upper()
+
+
+def _value(value, valueType: str):
+    if value is None or value == '' or value == []:
+        return ''
+    elif valueType == 'string[]':
+        return ARRAY_DELIMITER.join(str(v) for v in value)
+    elif valueType == 'int':
+        return int(value)
+    else:
+        return str(value)
+
+
+class PropertyGraphWriter:
+    """Writes node and relationship import files to a directory.
+
+    Args:
+        directory (str): Destination directory.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.files = []
+        self.writers = {}
+        self.counts = {}
+        self.ids = set()
+        self.dangling = 0
+
+        for label, properties in NODES.items():
+            self._open(label, ['id:ID'] +
+                       [f"{name}:{valueType}"
+                        for name, valueType in properties] + [':LABEL'])
+
+        for edgeType, properties in EDGES.items():
+            self._open(edgeType, [':START_ID', ':END_ID'] +
+                       [f"{name}:{valueType}"
+                        for name, valueType in properties] + [':TYPE'])
+
+    def _open(self, name: str, header: list):
+        f = open(os.path.join(self.directory, f"{name}.csv"),
+                 'w',
+                 newline='',
+                 encoding='utf-8')
+        self.files.append(f)
+        self.writers[name] = csv.writer(f)
+        self.writers[name].writerow(header)
+        self.counts[name] = 0
+
+    def node(self, label: str, uri: str, **properties) -> int:
+        """Write a node, unless a node with this `uri` was already written.
+
+        Returns:
+            int: The id of the node.
+        """
+
+        nodeId = stableId(uri)
+        if nodeId in self.ids:
+            return nodeId
+        self.ids.add(nodeId)
+
+        properties['uri'] = uri
+        self.writers[label].writerow(
+            [nodeId] +
+            [_value(properties.get(name), valueType)
+             for name, valueType in NODES[label]] + [label])
+        self.counts[label] += 1
+
+        return nodeId
+
+    def edge(self, edgeType: str, start: int, end: int, label: str = None,
+             **properties):
+        """Write a relationship to the `edgeType` file, with relationship
+        type `label` (defaults to `edgeType`)."""
+
+        self.writers[edgeType].writerow(
+            [start, end] +
+            [_value(properties.get(name), valueType)
+             for name, valueType in EDGES[edgeType]] + [label or edgeType])
+        self.counts[edgeType] += 1
+
+    def relation(self, start: str, relation: str, end: str, prop: str):
+        """Write a relation of type `relation` between two nodes (by IRI),
+        mapped to RDF property `prop`. Relations to nodes that were not
+        written (e.g. a notary that is not in the export) are counted as
+        dangling and skipped."""
+
+        start = stableId(start)
+        end = stableId(end)
+
+        if start not in self.ids or end not in self.ids:
+            self.dangling += 1
+            return
+
+        self.edge('RELATION',
+                  start,
+                  end,
+                  label=relationType(relation),
+                  type=relation,
+                  property=prop)
+
+    def close(self) -> dict:
+        """Close all files.
+
+        Returns:
+            dict: Number of nodes per label and relationships per file, and
+            the number of dangling relations.
+        """
+
+        for f in self.files:
+            f.close()
+
+        return dict(self.counts, danglingRelations=self.dangling)
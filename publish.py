@@ -0,0 +1,174 @@
+"""
+Canonical publication of the converted RDF.
+
+In canonical mode the TriG file contains one triple per line in N-Triples
+syntax, sorted by subject, predicate and object, inside a single named graph.
+The same graph therefore always gives the same bytes. A sidecar manifest
+(`<target>.manifest.json`) records the checksum of the file:
+
+    * if the checksum is unchanged, the file is not rewritten and the run
+      report says `changed: false`, so that reloading a triplestore can be
+      skipped;
+    * if it changed, a compact line diff of the added (`+`) and removed (`-`)
+      triples is written to `<target>.diff`. Otherwise (or for a first
+      version) there is no diff file, so that it never describes an older
+      run.
+
+The lines use full IRIs, so the file has no `@prefix` declarations.
+
+The lines are consumed as a sorted stream, so the output and the diff are
+produced without holding both versions in memory.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+from spill import tripleLine
+
+
+def canonicalLines(g) -> list:
+    """Sorted N-Triples lines of a graph."""
+    return sorted(tripleLine(s, p, o) for s, p, o in g)
+
+
+def manifestPath(target: str) -> str:
+    return target + '.manifest.json'
+
+
+def diffPath(target: str) -> str:
+    return target + '.diff'
+
+
+def readManifest(target: str) -> dict:
+    path = manifestPath(target)
+    if not os.path.exists(path) or not os.path.exists(target):
+        return None
+
+    with open(path) as infile:
+        return json.load(infile)
+
+
+def tripleLines(path: str):
+    """The triple lines of a canonical TriG file, in order."""
+
+    with open(path, encoding='utf-8') as infile:
+        inGraph = False
+        for line in infile:
+            if line.endswith('{\n'):
+                inGraph = True
+            elif line == '}\n':
+                inGraph = False
+            elif inGraph:
+                yield line
+
+
+def diffLines(old, new):
+    """Merge-walk two sorted line streams.
+
+    Yields:
+        tuple: ('+', line) for added and ('-', line) for removed lines.
+    """
+
+    old = iter(old)
+    new = iter(new)
+
+    a = next(old, None)
+    b = next(new, None)
+
+    while a is not None or b is not None:
+        if b is None or (a is not None and a < b):
+            yield '-', a
+            a = next(old, None)
+        elif a is None or b < a:
+            yield '+', b
+            b = next(new, None)
+        else:
+            a = next(old, None)
+            b = next(new, None)
+
+
+def removeDiff(target: str):
+    if os.path.exists(diffPath(target)):
+        os.remove(diffPath(target))
+
+
+def publish(lines, target: str, identifier) -> dict:
+    """Write sorted triple lines as canonical TriG, unless unchanged.
+
+    Args:
+        lines (iterable): Sorted N-Triples lines, see `canonicalLines`.
+        target (str): Destination file path.
+        identifier (URIRef): Name of the graph.
+
+    Returns:
+        dict: Checksum, number of triples, whether the file changed and, if
+        so, the number of added and removed triples, and the checksum of
+        the previous version (that the diff starts from).
+    """
+
+    tmp = target + '.tmp'
+    checksum = hashlib.sha256()
+    triples = 0
+
+    with open(tmp, 'w', encoding='utf-8') as outfile:
+
+        def write(s):
+            outfile.write(s)
+            checksum.update(s.encode('utf-8'))
+
+        write(f"<{identifier}> {{\n")
+        for line in lines:
+            write(line)
+            triples += 1
+        write("}\n")
+
+    checksum = f"sha256:{checksum.hexdigest()}"
+    previous = readManifest(target)
+
+    result = {
+        'checksum': checksum,
+        'triples': triples,
+        'changed': True,
+        'added': None,
+        'removed': None,
+        'previous': previous['checksum'] if previous else None
+    }
+
+    if previous and previous['checksum'] == checksum:
+        os.remove(tmp)
+        removeDiff(target)
+        result['changed'] = False
+        result['added'] = result['removed'] = 0
+        return result
+
+    if previous:
+        added = removed = 0
+        with open(diffPath(target), 'w', encoding='utf-8') as outfile:
+            for sign, line in diffLines(tripleLines(target), tripleLines(tmp)):
+                outfile.write(f"{sign} {line}")
+                if sign == '+':
+                    added += 1
+                else:
+                    removed += 1
+
+        result['added'] = added
+        result['removed'] = removed
+    else:
+        removeDiff(target)
+
+    os.replace(tmp, target)
+
+    with open(manifestPath(target), 'w') as outfile:
+        json.dump(
+            {
+                'checksum': checksum,
+                'triples': triples,
+                'published': datetime.datetime.now().isoformat(
+                    timespec='seconds')
+            },
+            outfile,
+            indent=4)
+
+    return result
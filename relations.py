@@ -0,0 +1,184 @@
+"""
+Collection and canonicalization of the relations between notaries.
+
+Relations are usually listed on the records of both notaries involved, and
+sometimes with the inverse type (`vader van` on one record, `zoon van` on the
+other). The `RelationCollector` gathers all relations of a conversion run,
+folds them onto one canonical direction per relation type, resolves
+conflicting statements and emits every resulting triple exactly once.
+"""
+
+from collections import Counter
+
+# Relation types that hold in both directions.
+SYMMETRIC = {
+    'broer van',
+    'kind trouwde met kind van',
+    'niet gespecificeerd',
+    'samenwerking met',
+    'zwager van',
+}
+
+# Pairs of (canonical, inverse) relation types.
+INVERSE_PAIRS = [
+    ('vader van', 'zoon van'),
+    ('grootvader van', 'kleinzoon van'),
+    ('overgrootvader van', 'achterkleinzoon van'),
+    ('betovergrootvader van', 'achter-achterkleinzoon van'),
+    ('schoonvader van', 'schoonzoon van'),
+    ('stiefvader van', 'stiefzoon van'),
+    ('opgevolgd door', 'opvolger van'),
+    ('had als klerk', 'was klerk bij'),
+    ('had als getuige', 'was getuige bij'),
+    ('had als vertaler', 'was vertaler bij'),
+]
+
+INVERSE = {inverse: canonical for canonical, inverse in INVERSE_PAIRS}
+CANONICAL = {canonical for canonical, _ in INVERSE_PAIRS}
+
+UNSPECIFIED = 'niet gespecificeerd'
+
+
+def canonicalRelation(source: int, relationType: str, target: int) -> tuple:
+    """Return the canonical (source, type, target) of a relation.
+
+    >>> canonicalRelation(2, 'zoon van', 1)
+    (1, 'vader van', 2)
+    >>> canonicalRelation(2, 'broer van', 1)
+    (1, 'broer van', 2)
+    """
+
+    if relationType in INVERSE:
+        return target, INVERSE[relationType], source
+    elif relationType in SYMMETRIC and target < source:
+        return target, relationType, source
+    else:
+        return source, relationType, target
+
+
+class RelationCollector:
+    """Gathers relations across notaries and resolves them into canonical
+    relations and distinct triples.
+
+    Args:
+        rel2prop (dict): Mapping of relation type to RDF property (or None).
+        rel2prop_inverse (dict): Mapping of relation type to the inverse RDF
+        property (or None).
+        default: Property for relation types without a mapping.
+    """
+
+    def __init__(self, rel2prop: dict, rel2prop_inverse: dict, default=None):
+        self.rel2prop = rel2prop
+        self.rel2prop_inverse = rel2prop_inverse
+        self.default = default
+
+        self.mentions = Counter()
+        self.selfRelations = 0
+
+        self.conflicts = 0
+        self.superseded = 0
+        self.emitted = 0
+
+        self.frozen = False
+
+    def freeze(self):
+        """Ignore further mentions, when all mentions were added up front
+        (e.g. for a subset of the notaries)."""
+        self.frozen = True
+
+    def add(self, source, relationType: str, target):
+        if self.frozen:
+            return
+
+        source = int(source)
+        target = int(target)
+
+        if source == target:
+            self.selfRelations += 1
+            return
+
+        self.mentions[canonicalRelation(source, relationType, target)] += 1
+
+    def resolve(self) -> list:
+        """Resolve the collected relations.
+
+        A relation that contradicts its mirror image (e.g. A `vader van` B
+        and B `vader van` A) is decided by the number of mentions, and on a
+        tie by the order in which they were added. An unspecified relation
+        is dropped if a specific relation between the same notaries exists.
+
+        Returns:
+            list: Canonical (source, type, target) relations.
+        """
+
+        self.conflicts = 0
+        self.superseded = 0
+
+        specified = {
+            frozenset((s, o))
+            for s, t, o in self.mentions if t != UNSPECIFIED
+        }
+
+        relations = []
+        kept = set()
+
+        for (s, t, o), n in self.mentions.items():
+
+            if t == UNSPECIFIED and frozenset((s, o)) in specified:
+                self.superseded += 1
+                continue
+
+            if t in CANONICAL and (o, t, s) in self.mentions:
+                mirrorCount = self.mentions[(o, t, s)]
+                if mirrorCount > n:
+                    self.conflicts += 1
+                    continue
+                elif mirrorCount == n and (o, t, s) in kept:
+                    self.conflicts += 1
+                    continue
+
+            relations.append((s, t, o))
+            kept.add((s, t, o))
+
+        return relations
+
+    def triples(self, relations: list, subjectNamespace) -> dict:
+        """Distinct triples for the canonical relations, in order.
+
+        Args:
+            relations (list): Output of `resolve()`.
+            subjectNamespace (Namespace): Namespace of the notary URIs.
+
+        Returns:
+            dict: Triples as keys (used as an ordered set).
+        """
+
+        triples = {}
+
+        for s, t, o in relations:
+            prop = self.rel2prop.get(t) or self.default
+            propInverse = self.rel2prop_inverse.get(t) or self.default
+
+            s = subjectNamespace.term(str(s))
+            o = subjectNamespace.term(str(o))
+
+            triples[(s, prop, o)] = None
+            triples[(o, propInverse, s)] = None
+            self.emitted += 2
+
+        return triples
+
+    def report(self, relations: list, triples: dict) -> dict:
+
+        mentions = sum(self.mentions.values())
+
+        return {
+            'mentions': mentions + self.selfRelations,
+            'selfRelations': self.selfRelations,
+            'duplicateMentions': mentions - len(self.mentions),
+            'conflicts': self.conflicts,
+            'superseded': self.superseded,
+            'relations': len(relations),
+            'triples': len(triples),
+            'duplicateTriples': self.emitted - len(triples)
+        }
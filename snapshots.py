@@ -0,0 +1,211 @@
+"""
+Versioned snapshot store of the notary exports.
+
+Every fetched export is added as a snapshot to a single SQLite file. Only the
+notaries that were added or changed since the previous snapshot are stored
+(as zlib-compressed JSON, deduplicated by checksum), together with the
+ordered list of notary ids of the snapshot. The input of any earlier
+snapshot, or its TriG, can therefore be rebuilt without keeping full copies:
+
+```python
+from snapshots import SnapshotStore
+
+store = SnapshotStore('sources/snapshots.sqlite')
+store.add(data, date='2022-11-02')
+
+data = store.export(date='2022-06-30')  # latest snapshot at that date
+store.toRDF('trig/notarissennetwerk-2022-06-30.trig', date='2022-06-30')
+```
+"""
+
+import datetime
+import hashlib
+import json
+import sqlite3
+import zlib
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY, date TEXT NOT NULL, checksum TEXT NOT NULL,
+        meta BLOB NOT NULL, notaries BLOB NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS snapshots_date ON snapshots (date)",
+    """CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS changes (
+        notary INTEGER NOT NULL, snapshot INTEGER NOT NULL,
+        hash TEXT NOT NULL, PRIMARY KEY (notary, snapshot)) WITHOUT ROWID""",
+]
+
+
+def pack(value) -> bytes:
+    return zlib.compress(
+        json.dumps(value, ensure_ascii=False,
+                   separators=(',', ':')).encode('utf-8'), 9)
+
+
+def unpack(data: bytes):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def checksum(value) -> str:
+    return hashlib.sha256(
+        json.dumps(value, ensure_ascii=False, sort_keys=True,
+                   separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+class SnapshotStore:
+    """Snapshots of the export in a SQLite file.
+
+    Args:
+        path (str): Database file.
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        for statement in SCHEMA:
+            self.db.execute(statement)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def snapshots(self) -> list:
+        """All snapshots, oldest first, with their id, date and checksum."""
+
+        return [{
+            'id': i,
+            'date': date,
+            'checksum': c
+        } for i, date, c in self.db.execute(
+            "SELECT id, date, checksum FROM snapshots ORDER BY id")]
+
+    def resolve(self, snapshot: int = None, date: str = None) -> int:
+        """Id of a snapshot: `snapshot` itself, the latest snapshot on or
+        before `date`, or else the latest snapshot."""
+
+        if snapshot is not None:
+            row = self.db.execute("SELECT id FROM snapshots WHERE id = ?",
+                                  (snapshot, )).fetchone()
+        elif date is not None:
+            row = self.db.execute(
+                "SELECT id FROM snapshots WHERE date <= ? "
+                "ORDER BY date DESC, id DESC LIMIT 1", (date, )).fetchone()
+        else:
+            row = self.db.execute(
+                "SELECT id FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+
+        if row is None:
+            raise KeyError(f"No snapshot for {snapshot or date or 'latest'}")
+
+        return row[0]
+
+    def _hashes(self, snapshot: int) -> dict:
+        """Notary id to the hash of its state in `snapshot`."""
+
+        # SQLite takes the hash from the row with the max(snapshot)
+        rows = self.db.execute(
+            "SELECT notary, hash, max(snapshot) FROM changes "
+            "WHERE snapshot <= ? GROUP BY notary", (snapshot, ))
+
+        return {notary: h for notary, h, _ in rows}
+
+    def add(self, export: dict, date: str = None) -> dict:
+        """Add an export as a new snapshot, unless it equals the latest one.
+
+        Args:
+            export (dict): Export of Notarissennetwerk (with `notaries`).
+            date (str, optional): Date of the export (ISO 8601). Defaults to
+            today.
+
+        Returns:
+            dict: Id of the snapshot and the number of added, changed,
+            removed and unchanged notaries.
+        """
+
+        date = date or datetime.date.today().isoformat()
+        meta = {k: v for k, v in export.items() if k != 'notaries'}
+        total = checksum(export)
+
+        previous = self.db.execute(
+            "SELECT id, checksum, notaries FROM snapshots "
+            "ORDER BY id DESC LIMIT 1").fetchone()
+
+        if previous and previous[1] == total:
+            return {'snapshot': previous[0], 'new': False}
+
+        hashes = self._hashes(previous[0]) if previous else {}
+        previousIds = set(unpack(previous[2])) if previous else set()
+        ids = [notary['id'] for notary in export['notaries']]
+
+        cursor = self.db.execute(
+            "INSERT INTO snapshots (date, checksum, meta, notaries) "
+            "VALUES (?, ?, ?, ?)", (date, total, pack(meta), pack(ids)))
+        snapshot = cursor.lastrowid
+
+        counts = {'added': 0, 'changed': 0, 'unchanged': 0}
+        for notary in export['notaries']:
+            h = checksum(notary)
+            old = hashes.get(notary['id'])
+
+            # A notary that was removed earlier keeps its last state in
+            # `hashes`, so it is added again even if that state is the same
+            if notary['id'] not in previousIds:
+                counts['added'] += 1
+            elif old == h:
+                counts['unchanged'] += 1
+            else:
+                counts['changed'] += 1
+
+            if old == h:
+                continue
+
+            self.db.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)",
+                            (h, pack(notary)))
+            self.db.execute(
+                "INSERT OR REPLACE INTO changes VALUES (?, ?, ?)",
+                (notary['id'], snapshot, h))
+
+        self.db.commit()
+
+        counts['removed'] = len(previousIds - set(ids))
+
+        return {'snapshot': snapshot, 'new': True, **counts}
+
+    def export(self, snapshot: int = None, date: str = None) -> dict:
+        """Rebuild the export of a snapshot, see `resolve`."""
+
+        snapshot = self.resolve(snapshot, date)
+
+        meta, ids = self.db.execute(
+            "SELECT meta, notaries FROM snapshots WHERE id = ?",
+            (snapshot, )).fetchone()
+        ids = unpack(ids)
+        hashes = self._hashes(snapshot)
+
+        blobs = {}
+        needed = list({hashes[i] for i in ids})
+        for n in range(0, len(needed), 500):
+            batch = needed[n:n + 500]
+            blobs.update(
+                self.db.execute(
+                    "SELECT hash, data FROM blobs WHERE hash IN "
+                    f"({','.join('?' * len(batch))})", batch).fetchall())
+
+        export = unpack(meta)
+        export['notaries'] = [unpack(blobs[hashes[i]]) for i in ids]
+
+        return export
+
+    def toRDF(self, target: str, snapshot: int = None, date: str = None,
+              **options) -> dict:
+        """Convert the export of a snapshot with `main.main`.
+
+        Returns:
+            dict: Run report of the conversion.
+        """
+
+        import main
+
+        return main.main(loadData=self.export(snapshot, date),
+                         target=target,
+                         **options)
@@ -0,0 +1,345 @@
+"""
+Acquisition of the input sources of the conversion.
+
+The notary export of https://notarissennetwerk.nl and the EAD of the
+Notarieel Archief (5075) of https://archief.amsterdam are downloaded
+concurrently with asyncio. Every download is streamed to disk, and resumed
+with a Range request if an earlier attempt was interrupted. The files are
+kept in a versioned local cache:
+
+    sources/<name>/versions.json          # checksum, url and date per version
+    sources/<name>/<sha256>.<extension>   # content of a version
+    sources/<name>/download.part          # unfinished download
+    sources/<name>/download.part.json     # ETag/Last-Modified of it
+
+A download is only resumed if the source did not change in the meantime:
+the Range request carries an `If-Range` with the `ETag` (or `Last-Modified`)
+of the unfinished download, so that a changed source is sent in full
+instead. A partial download without such a validator is started again.
+
+A new version is only added if the content changed (by sha256 checksum), and
+the `ETag`/`Last-Modified` of the latest version are sent along so that an
+unchanged source is not downloaded again. `onComplete` is called as soon as
+a source is available, so that its processing can start while the others
+are still downloading. Requires `aiohttp`:
+
+```python
+from sources import fetchSources, SOURCES
+
+paths = fetchSources(SOURCES, 'sources')
+```
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+
+import aiohttp
+
+SOURCES = {
+    'notarissen': {
+        'url': 'https://notarissennetwerk.nl/notarissen/export/json',
+        'extension': 'json'
+    },
+    '5075.ead': {
+        'url': 'https://archief.amsterdam/archives/xml/5075.ead.xml',
+        'extension': 'xml'
+    },
+}
+
+CHUNK_SIZE = 2**16
+
+
+class ChecksumError(ValueError):
+    pass
+
+
+class SourceCache:
+    """Versioned local cache of downloaded sources.
+
+    Args:
+        directory (str): Cache directory.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, name: str, *parts) -> str:
+        return os.path.join(self.directory, name, *parts)
+
+    def versions(self, name: str) -> list:
+        """All versions of a source, oldest first."""
+
+        path = self.path(name, 'versions.json')
+        if not os.path.exists(path):
+            return []
+
+        with open(path) as infile:
+            return json.load(infile)
+
+    def latest(self, name: str) -> dict:
+        versions = self.versions(name)
+        return versions[-1] if versions else None
+
+    def file(self, name: str, version: dict) -> str:
+        return self.path(name, version['file'])
+
+    def partial(self, name: str) -> str:
+        return self.path(name, 'download.part')
+
+    def partialValidator(self, name: str) -> dict:
+        """The `etag` and `lastModified` of the unfinished download."""
+
+        path = self.partial(name) + '.json'
+        if not os.path.exists(path):
+            return {}
+
+        with open(path) as infile:
+            return json.load(infile)
+
+    def startPartial(self, name: str, etag: str, lastModified: str):
+        with open(self.partial(name) + '.json', 'w') as outfile:
+            json.dump({'etag': etag, 'lastModified': lastModified}, outfile)
+
+    def removePartial(self, name: str):
+        for path in (self.partial(name), self.partial(name) + '.json'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def add(self, name: str, tmp: str, version: dict) -> dict:
+        """Store a finished download as a version of a source, unless its
+        content equals the latest version.
+
+        Returns:
+            dict: The stored (or latest) version.
+        """
+
+        latest = self.latest(name)
+        if latest and latest['sha256'] == version['sha256']:
+            self.removePartial(name)
+            return latest
+
+        os.replace(tmp, self.path(name, version['file']))
+        self.removePartial(name)
+
+        versions = self.versions(name) + [version]
+        with open(self.path(name, 'versions.json.tmp'), 'w') as outfile:
+            json.dump(versions, outfile, indent=4)
+        os.replace(self.path(name, 'versions.json.tmp'),
+                   self.path(name, 'versions.json'))
+
+        return version
+
+
+def ifRange(validator: dict) -> str:
+    """The `If-Range` value for a partial download, if it has a strong
+    validator.
+
+    >>> ifRange({'etag': '"abc"', 'lastModified': None})
+    '"abc"'
+    >>> ifRange({'etag': 'W/"abc"', 'lastModified': None}) is None
+    True
+    """
+
+    etag = validator.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+
+    return validator.get('lastModified')
+
+
+def completeLength(contentRange: str) -> int:
+    """The complete length in a `Content-Range` header, if known.
+
+    >>> completeLength('bytes */1200')
+    1200
+    >>> completeLength('bytes 0-99/*') is None
+    True
+    """
+
+    if contentRange and contentRange.rpartition('/')[2].isdigit():
+        return int(contentRange.rpartition('/')[2])
+
+
+def sha256File(path: str) -> str:
+
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as infile:
+        for block in iter(lambda: infile.read(CHUNK_SIZE), b''):
+            checksum.update(block)
+
+    return checksum.hexdigest()
+
+
+class SourceFetcher:
+    """Concurrent downloader of sources into a `SourceCache`.
+
+    Args:
+        directory (str): Cache directory.
+        retries (int, optional): Number of attempts per source. Interrupted
+        attempts are resumed. Defaults to 3.
+        timeout (float, optional): Timeout per attempt in seconds. Defaults
+        to 600.
+        refresh (bool, optional): Check for a newer version of sources that
+        are in the cache. Defaults to True.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 retries: int = 3,
+                 timeout: float = 600,
+                 refresh: bool = True):
+
+        self.cache = SourceCache(directory)
+        self.retries = retries
+        self.timeout = timeout
+        self.refresh = refresh
+
+        self.downloaded = 0  # bytes
+        self.resumed = 0
+        self.notModified = 0
+
+    async def _download(self, session, name: str, source: dict) -> dict:
+
+        os.makedirs(self.cache.path(name), exist_ok=True)
+
+        latest = self.cache.latest(name)
+        if latest and not self.refresh:
+            return latest
+
+        partial = self.cache.partial(name)
+        validator = self.cache.partialValidator(name)
+        headers = {}
+
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        if offset and not ifRange(validator):
+            # Cannot check that the source did not change, start again
+            self.cache.removePartial(name)
+            offset = 0
+
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = ifRange(validator)
+        elif latest:
+            if latest.get('etag'):
+                headers['If-None-Match'] = latest['etag']
+            if latest.get('lastModified'):
+                headers['If-Modified-Since'] = latest['lastModified']
+
+        async with session.get(source['url'], headers=headers) as r:
+
+            if r.status == 304:
+                self.notModified += 1
+                return latest
+
+            etag = r.headers.get('ETag', validator.get('etag'))
+            lastModified = r.headers.get('Last-Modified',
+                                         validator.get('lastModified'))
+
+            if offset and r.status == 416:
+                # Only complete if the partial has the full length
+                restart = completeLength(
+                    r.headers.get('Content-Range')) != offset
+
+            elif offset and r.status == 206:
+                # Resumed, unless the server ignored the If-Range
+                restart = (etag != validator.get('etag') or
+                           not r.headers.get('Content-Range', '').startswith(
+                               f"bytes {offset}-"))
+                if not restart:
+                    self.resumed += 1
+                    await self._write(r, partial, 'ab')
+
+            else:
+                # The server sent everything (e.g. the source changed)
+                r.raise_for_status()
+                restart = False
+                self.cache.startPartial(name, etag, lastModified)
+                await self._write(r, partial, 'wb')
+
+        if restart:
+            self.cache.removePartial(name)
+            return await self._download(session, name, source)
+
+        checksum = sha256File(partial)
+        if source.get('sha256') and source['sha256'] != checksum:
+            self.cache.removePartial(name)
+            raise ChecksumError(
+                f"{name}: expected sha256 {source['sha256']}, got {checksum}")
+
+        return self.cache.add(
+            name, partial, {
+                'sha256': checksum,
+                'file': f"{checksum}.{source.get('extension', 'bin')}",
+                'url': source['url'],
+                'size': os.path.getsize(partial),
+                'etag': etag,
+                'lastModified': lastModified,
+                'fetched': datetime.datetime.now().isoformat(
+                    timespec='seconds')
+            })
+
+    async def _write(self, r, partial: str, mode: str):
+
+        with open(partial, mode) as outfile:
+            async for block in r.content.iter_chunked(CHUNK_SIZE):
+                outfile.write(block)
+                self.downloaded += len(block)
+
+    async def _fetch(self, session, name: str, source: dict) -> tuple:
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                version = await self._download(session, name, source)
+                return name, self.cache.file(name, version)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # The partial download is kept and resumed
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(attempt)
+
+    async def fetchAll(self, sources: dict, onComplete=None) -> dict:
+        """Fetch `sources` concurrently.
+
+        Args:
+            sources (dict): Name to a dict with the `url`, and optionally the
+            `extension` and expected `sha256` of a source.
+            onComplete (callable, optional): Called with the name and path
+            of every source as soon as it is available.
+
+        Returns:
+            dict: Name to the path of the cached file of every source.
+        """
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        paths = {}
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for task in asyncio.as_completed([
+                    self._fetch(session, name, source)
+                    for name, source in sources.items()
+            ]):
+                name, path = await task
+                paths[name] = path
+
+                if onComplete:
+                    onComplete(name, path)
+
+        return {name: paths[name] for name in sources}
+
+
+def fetchSources(sources: dict = SOURCES,
+                 directory: str = 'sources',
+                 onComplete=None,
+                 **options) -> dict:
+    """Fetch the sources into the cache in `directory`. See `SourceFetcher`
+    for the options.
+
+    Returns:
+        dict: Name to the path of the cached file of every source.
+    """
+
+    fetcher = SourceFetcher(directory, **options)
+    return asyncio.run(fetcher.fetchAll(sources, onComplete))
@@ -0,0 +1,295 @@
+"""
+Publication of the converted graph to a SPARQL 1.1 Update endpoint.
+
+The triples of a canonical TriG file (see `publish.py`) are sent as
+`INSERT DATA` requests into a staging graph, which then replaces the named
+graph of the dataset with a single `MOVE`, so that queries never see a
+partly loaded graph. If the endpoint has the previous version of the file,
+only the diff (`<target>.diff`) is sent: the removed triples as
+`DELETE DATA` and then the added triples as `INSERT DATA`, directly in the
+named graph. Queries can see the graph halfway through such an update.
+
+The checksum of the last version that was completely sent to an endpoint
+and graph is kept in `<target>.sparql.json`, and is only written after the
+last request succeeded. A diff is only sent if it starts from that version;
+after a failed or interrupted run the whole graph is replaced.
+
+The triples are sent in batches of at most `batchSize` triples or
+`maxBytes` bytes, over a pool of keep-alive connections with a number of
+requests in flight. Failed requests (connection errors, timeouts and 5xx
+responses) are retried with a backoff. Requires `aiohttp`.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import aiohttp
+
+from publish import tripleLines, diffPath
+
+
+class UpdateError(Exception):
+    pass
+
+
+def batches(lines, batchSize: int, maxBytes: int):
+    """Group N-Triples lines in batches of at most `batchSize` lines or
+    `maxBytes` bytes (but at least one line).
+
+    >>> [len(b) for b in batches(['<a> <b> <c> .\\n'] * 5, 2, 10**6)]
+    [2, 2, 1]
+    """
+
+    batch = []
+    size = 0
+
+    for line in lines:
+        length = len(line.encode('utf-8'))
+        if batch and (len(batch) >= batchSize or size + length > maxBytes):
+            yield batch
+            batch = []
+            size = 0
+
+        batch.append(line)
+        size += length
+
+    if batch:
+        yield batch
+
+
+def diffLines(path: str, sign: str):
+    """The triple lines with `sign` ('+' or '-') of a diff file."""
+
+    with open(path, encoding='utf-8') as infile:
+        for line in infile:
+            if line.startswith(sign + ' '):
+                yield line[2:]
+
+
+def statePath(target: str) -> str:
+    return target + '.sparql.json'
+
+
+class SparqlPublisher:
+    """Sends triples to a SPARQL 1.1 Update endpoint.
+
+    Args:
+        endpoint (str): URL of the update endpoint.
+        graph (str): Name of the graph to update.
+        batchSize (int, optional): Maximum number of triples per request.
+        Defaults to 10000.
+        maxBytes (int, optional): Maximum size of the triples in a request.
+        Defaults to 4 MB.
+        concurrency (int, optional): Number of requests in flight. Defaults
+        to 4.
+        retries (int, optional): Number of attempts per request. Defaults to
+        5.
+        timeout (float, optional): Timeout per request in seconds. Defaults
+        to 300.
+        auth (tuple, optional): User name and password for basic
+        authentication. Defaults to None.
+    """
+
+    def __init__(self,
+                 endpoint: str,
+                 graph: str,
+                 batchSize: int = 10000,
+                 maxBytes: int = 4 * 2**20,
+                 concurrency: int = 4,
+                 retries: int = 5,
+                 timeout: float = 300,
+                 auth: tuple = None):
+
+        self.endpoint = endpoint
+        self.graph = str(graph)
+        self.staging = f"{self.graph}#staging"
+        self.batchSize = batchSize
+        self.maxBytes = maxBytes
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.auth = aiohttp.BasicAuth(*auth) if auth else None
+
+        self.requests = 0
+        self.retried = 0
+        self.inserted = 0
+        self.deleted = 0
+
+    async def _update(self, session, query: str):
+
+        for attempt in range(1, self.retries + 1):
+            self.requests += 1
+            try:
+                async with session.post(
+                        self.endpoint,
+                        data=query.encode('utf-8'),
+                        headers={
+                            'Content-Type':
+                            'application/sparql-update; charset=utf-8'
+                        }) as r:
+                    if r.status < 300:
+                        return
+                    text = await r.text()
+                    if r.status < 500:  # not worth retrying
+                        raise UpdateError(f"{r.status} {r.reason}: {text}")
+                    error = UpdateError(f"{r.status} {r.reason}: {text}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            if attempt == self.retries:
+                raise error
+
+            self.retried += 1
+            await asyncio.sleep(min(2**attempt / 4, 30))
+
+    async def _send(self, session, operation: str, lines, graph: str):
+        """Send `lines` in batches of `operation` (INSERT or DELETE)
+        DATA requests into `graph`, `concurrency` at a time."""
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        sent = 0
+
+        async def send(batch: list):
+            try:
+                query = (f"{operation} DATA {{ GRAPH <{graph}> {{\n" +
+                         "".join(batch) + "} }")
+                await self._update(session, query)
+            finally:
+                semaphore.release()
+
+        try:
+            for batch in batches(lines, self.batchSize, self.maxBytes):
+                # Read and build batches only as fast as they are sent
+                await semaphore.acquire()
+                tasks.add(asyncio.ensure_future(send(batch)))
+                sent += len(batch)
+
+                for task in [t for t in tasks if t.done()]:
+                    tasks.discard(task)
+                    task.result()  # raise errors early
+
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return sent
+
+    async def _publish(self, inserts=(), deletes=(), replace: bool = False):
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector,
+                                         timeout=timeout,
+                                         auth=self.auth) as session:
+            if replace:
+                await self._update(session,
+                                   f"DROP SILENT GRAPH <{self.staging}>")
+                self.inserted += await self._send(session, 'INSERT', inserts,
+                                                  self.staging)
+                await self._update(
+                    session,
+                    f"MOVE SILENT GRAPH <{self.staging}> TO <{self.graph}>")
+            else:
+                self.deleted += await self._send(session, 'DELETE', deletes,
+                                                 self.graph)
+                self.inserted += await self._send(session, 'INSERT', inserts,
+                                                  self.graph)
+
+    def _report(self, start: float, mode: str) -> dict:
+        return {
+            'mode': mode,
+            'inserted': self.inserted,
+            'deleted': self.deleted,
+            'requests': self.requests,
+            'retried': self.retried,
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+
+    def replace(self, lines) -> dict:
+        """Replace the graph by the triples in `lines` (N-Triples)."""
+
+        start = time.perf_counter()
+        asyncio.run(self._publish(inserts=lines, replace=True))
+
+        return self._report(start, 'replace')
+
+    def update(self, inserts=(), deletes=()) -> dict:
+        """Delete and insert the triples in `deletes` and `inserts`
+        (N-Triples lines)."""
+
+        start = time.perf_counter()
+        asyncio.run(self._publish(inserts=inserts, deletes=deletes))
+
+        return self._report(start, 'update')
+
+    def publishFile(self, target: str) -> dict:
+        """Replace the graph by the triples of a canonical TriG file."""
+        return self.replace(tripleLines(target))
+
+    def publishDiff(self, diff: str) -> dict:
+        """Apply a diff written by `publish.publish`."""
+        return self.update(inserts=diffLines(diff, '+'),
+                           deletes=diffLines(diff, '-'))
+
+    def pushed(self, target: str) -> str:
+        """Checksum of the version of `target` that was last completely
+        sent to this endpoint and graph, if any."""
+
+        if not os.path.exists(statePath(target)):
+            return None
+
+        with open(statePath(target)) as infile:
+            state = json.load(infile)
+
+        return state.get(f"{self.endpoint} {self.graph}", {}).get('checksum')
+
+    def _setPushed(self, target: str, checksum: str):
+
+        state = {}
+        if os.path.exists(statePath(target)):
+            with open(statePath(target)) as infile:
+                state = json.load(infile)
+
+        state[f"{self.endpoint} {self.graph}"] = {
+            'checksum': checksum,
+            'pushed': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+
+        with open(statePath(target) + '.tmp', 'w') as outfile:
+            json.dump(state, outfile, indent=4)
+        os.replace(statePath(target) + '.tmp', statePath(target))
+
+    def publish(self, target: str, published: dict) -> dict:
+        """Bring the graph up to date with canonical TriG file `target`: send
+        nothing if the endpoint has this version, only the diff if it has
+        the previous version, and else the whole file.
+
+        Args:
+            target (str): The canonical TriG file.
+            published (dict): Result of `publish.publish` for `target`.
+
+        Returns:
+            dict: The mode ('unchanged', 'update' or 'replace') and counts.
+        """
+
+        pushed = self.pushed(target)
+
+        if pushed == published['checksum']:
+            return {'mode': 'unchanged'}
+
+        if (pushed is not None and published['changed']
+                and published['previous'] == pushed
+                and os.path.exists(diffPath(target))):
+            report = self.publishDiff(diffPath(target))
+        else:
+            report = self.publishFile(target)
+
+        self._setPushed(target, published['checksum'])
+
+        return report
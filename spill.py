@@ -0,0 +1,207 @@
+"""
+On-disk spill of RDF chunks for the memory-bounded conversion mode.
+
+In chunked mode (`main.toRDFChunked`) a fixed number of notaries is converted
+into a fresh graph, whose triples are written to a chunk file on disk before
+the graph is released. Nodes that are shared between chunks (places and
+occupations) are emitted by every chunk that uses them. Their triples are
+written only once, by keeping a small on-disk set of triple keys. Fixed
+triples, such as the static vocabulary, can be written as a chunk of their
+own (`writeLines`). The sorted chunk files are finally merged into a single
+TriG file, dropping any other triple that more than one chunk has (e.g. an
+inventory book of two notaries), so that the output has the same triples
+as a conversion without chunks.
+"""
+
+import hashlib
+import heapq
+import os
+import resource
+import shutil
+import sqlite3
+import tempfile
+
+from rdflib import Literal
+
+
+def currentRss() -> int:
+    """Resident set size of this process in bytes."""
+
+    try:
+        with open('/proc/self/statm') as infile:
+            pages = int(infile.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Not on Linux: fall back on the peak resident set size
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == 'Darwin' else maxrss * 1024
+
+
+# Escapes of literals in N-Triples, the backslash first
+ESCAPES = [('\\', '\\\\'), ('"', '\\"'), ('\n', '\\n'), ('\r', '\\r')]
+
+
+def ntTerm(term) -> str:
+    """A term in N-Triples syntax. Unlike `n3()`, a literal is always on a
+    single line, with newlines escaped.
+
+    >>> print(ntTerm(Literal('a\\nb "c"', lang='nl')))
+    "a\\nb \\"c\\""@nl
+    """
+
+    if isinstance(term, Literal):
+        lexical = str(term)
+        for character, escaped in ESCAPES:
+            lexical = lexical.replace(character, escaped)
+
+        if term.language:
+            return f'"{lexical}"@{term.language}'
+        elif term.datatype:
+            return f'"{lexical}"^^<{term.datatype}>'
+        else:
+            return f'"{lexical}"'
+
+    return term.n3()
+
+
+def tripleLine(s, p, o) -> str:
+    """A triple in N-Triples syntax (which is also valid TriG), on a single
+    line."""
+    return f"{ntTerm(s)} {ntTerm(p)} {ntTerm(o)} .\n"
+
+
+class KeySet:
+    """Set of triple keys stored in SQLite.
+
+    Args:
+        path (str): Database file.
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS keys (key BLOB PRIMARY KEY)")
+
+    def add(self, line: str) -> bool:
+        """Add the key of `line`. Returns False if it was already there."""
+
+        key = hashlib.blake2b(line.encode(), digest_size=16).digest()
+        cursor = self.db.execute("INSERT OR IGNORE INTO keys VALUES (?)",
+                                 (key, ))
+        return cursor.rowcount == 1
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class ChunkSpill:
+    """Writes the triples of chunk graphs to disk and merges them.
+
+    Args:
+        directory (str, optional): Directory for the chunk files. Defaults
+        to a temporary directory that is removed by `close()`.
+        shared (tuple, optional): Namespaces of the nodes that can occur in
+        more than one chunk.
+    """
+
+    def __init__(self, directory: str = None, shared: tuple = ()):
+
+        self.temporary = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix='notarissen-')
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.shared = tuple(f"<{namespace}" for namespace in shared)
+        self.keys = KeySet(os.path.join(self.directory, 'shared.sqlite'))
+
+        self.chunks = []
+        self.triples = 0  # distinct after `lines` or `merge`
+        self.duplicates = 0  # of shared nodes, not written
+        self.mergedDuplicates = 0  # of other triples, dropped in `lines`
+
+    def write(self, g) -> int:
+        """Write the triples of `g` to a new chunk file.
+
+        Returns:
+            int: Number of triples written.
+        """
+
+        # Sorted, so that the same input gives the same chunk files
+        return self.writeLines(sorted(tripleLine(s, p, o) for s, p, o in g))
+
+    def writeLines(self, lines) -> int:
+        """Write sorted, pre-serialized triple lines to a new chunk file.
+
+        Returns:
+            int: Number of triples written.
+        """
+
+        path = os.path.join(self.directory,
+                            f"chunk-{len(self.chunks):05d}.nt")
+        written = 0
+
+        with open(path, 'w', encoding='utf-8') as outfile:
+            for line in lines:
+                if line.startswith(self.shared) and not self.keys.add(line):
+                    self.duplicates += 1
+                    continue
+
+                outfile.write(line)
+                written += 1
+
+        self.keys.commit()
+        self.chunks.append(path)
+        self.triples += written
+
+        return written
+
+    def merge(self, target: str, identifier, namespaces=()):
+        """Stream all chunks into the named graph `identifier` of a TriG
+        file.
+
+        Args:
+            target (str): Destination file path.
+            identifier (URIRef): Name of the graph.
+            namespaces (iterable): (prefix, namespace) tuples to declare.
+        """
+
+        with open(target, 'w', encoding='utf-8') as outfile:
+            for prefix, namespace in namespaces:
+                outfile.write(f"@prefix {prefix}: <{namespace}> .\n")
+
+            outfile.write(f"\n<{identifier}> {{\n")
+            outfile.writelines(self.lines())
+            outfile.write("}\n")
+
+    def lines(self):
+        """All distinct triple lines of the chunks in sorted order, streamed
+        with a merge of the (sorted) chunk files. Lines that are in more than
+        one chunk are written once, and counted in `mergedDuplicates`."""
+
+        files = [open(path, encoding='utf-8') for path in self.chunks]
+        previous = None
+        triples = duplicates = 0
+
+        try:
+            for line in heapq.merge(*files):
+                if line == previous:
+                    duplicates += 1
+                    continue
+
+                previous = line
+                triples += 1
+                yield line
+        finally:
+            for f in files:
+                f.close()
+
+        self.triples = triples
+        self.mergedDuplicates = duplicates
+
+    def close(self):
+        self.keys.close()
+
+        if self.temporary:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,314 @@
+"""
+Persistent, embedded rdflib store backed by SQLite.
+
+`toRDF` normally builds its `Dataset` in memory, so the converted graph is
+lost when the process exits. With a `SQLiteStore` the quads are written to a
+single SQLite file instead, in large transactions (one commit per
+`batchSize` changes). The file can be reopened read-only for fast queries
+without parsing the TriG again:
+
+```python
+from sqliteStore import openDataset
+
+ds = openDataset('trig/notarissennetwerk.sqlite', readonly=True)
+```
+
+Terms are stored in their N3 notation, quads are indexed on subject,
+predicate-object, object and graph.
+"""
+
+import os
+import sqlite3
+from functools import lru_cache
+from itertools import groupby
+
+import rdflib.graph
+from rdflib import Dataset, Graph, URIRef
+from rdflib.store import Store, VALID_STORE, NO_STORE
+from rdflib.util import from_n3
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS quads (
+        s TEXT NOT NULL, p TEXT NOT NULL, o TEXT NOT NULL, c TEXT NOT NULL,
+        PRIMARY KEY (s, p, o, c)) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS quads_po ON quads (p, o)",
+    "CREATE INDEX IF NOT EXISTS quads_o ON quads (o)",
+    "CREATE INDEX IF NOT EXISTS quads_c ON quads (c)",
+    "CREATE TABLE IF NOT EXISTS graphs (c TEXT PRIMARY KEY)",
+    """CREATE TABLE IF NOT EXISTS namespaces (
+        prefix TEXT PRIMARY KEY, uri TEXT NOT NULL)""",
+]
+
+
+@lru_cache(maxsize=100000)
+def decode(n3: str):
+    return from_n3(n3)
+
+
+def encode(term) -> str:
+    return term.n3()
+
+
+def _identifier(context) -> str:
+    if context is None:
+        return None
+    return encode(getattr(context, 'identifier', context))
+
+
+class SQLiteStore(Store):
+    """Context-aware rdflib store in a SQLite file.
+
+    Args:
+        configuration (str, optional): Path of the database file. If given,
+        the store is opened (and created) immediately.
+        readonly (bool, optional): Open the database read-only. Defaults to
+        False.
+        batchSize (int, optional): Number of changes per transaction.
+        Defaults to 100000.
+    """
+
+    context_aware = True
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = True
+
+    def __init__(self,
+                 configuration: str = None,
+                 identifier=None,
+                 readonly: bool = False,
+                 batchSize: int = 100000):
+
+        self.readonly = readonly
+        self.batchSize = batchSize
+        self.pending = 0
+        self.db = None
+
+        super().__init__(configuration, identifier)
+
+    def open(self, configuration: str, create: bool = True):
+
+        if self.readonly:
+            if not os.path.exists(configuration):
+                return NO_STORE
+            self.db = sqlite3.connect(f"file:{configuration}?mode=ro",
+                                      uri=True)
+            return VALID_STORE
+
+        if not create and not os.path.exists(configuration):
+            return NO_STORE
+
+        self.db = sqlite3.connect(configuration)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.db.execute(statement)
+        self.db.commit()
+
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = True):
+        if self.db is not None:
+            if commit_pending_transaction and not self.readonly:
+                self.commit()
+            self.db.close()
+            self.db = None
+
+    def commit(self):
+        self.db.commit()
+        self.pending = 0
+
+    def rollback(self):
+        self.db.rollback()
+        self.pending = 0
+
+    def _changed(self, n: int = 1):
+        self.pending += n
+        if self.pending >= self.batchSize:
+            self.commit()
+
+    def _checkWritable(self):
+        if self.readonly:
+            raise PermissionError("This SQLiteStore is opened read-only")
+
+    ##########
+    # Writes #
+    ##########
+
+    def add(self, triple, context, quoted: bool = False):
+        self._checkWritable()
+        Store.add(self, triple, context, quoted)
+
+        s, p, o = triple
+        self.db.execute("INSERT OR IGNORE INTO quads VALUES (?, ?, ?, ?)",
+                        (encode(s), encode(p), encode(o),
+                         _identifier(context)))
+        self._changed()
+
+    def addN(self, quads):
+        self._checkWritable()
+
+        rows = [(encode(s), encode(p), encode(o), _identifier(c))
+                for s, p, o, c in quads]
+        self.db.executemany("INSERT OR IGNORE INTO quads VALUES (?, ?, ?, ?)",
+                            rows)
+        self._changed(len(rows))
+
+    def remove(self, triple, context=None):
+        self._checkWritable()
+        Store.remove(self, triple, context)
+
+        where, params = self._where(triple, context)
+        cursor = self.db.execute(f"DELETE FROM quads{where}", params)
+        self._changed(max(cursor.rowcount, 1))
+
+    def add_graph(self, graph):
+        c = _identifier(graph)
+
+        # rdflib also "adds" the graphs it reads, e.g. in `Dataset.graph`
+        if self.readonly:
+            if self._hasGraph(c):
+                return
+            self._checkWritable()
+
+        self.db.execute("INSERT OR IGNORE INTO graphs VALUES (?)", (c, ))
+        self._changed()
+
+    def remove_graph(self, graph):
+        self._checkWritable()
+        c = _identifier(graph)
+        self.db.execute("DELETE FROM quads WHERE c = ?", (c, ))
+        self.db.execute("DELETE FROM graphs WHERE c = ?", (c, ))
+        self._changed()
+
+    #########
+    # Reads #
+    #########
+
+    @staticmethod
+    def _where(triple, context=None):
+        clauses = []
+        params = []
+
+        for column, term in zip('spo', triple):
+            if term is not None:
+                clauses.append(f"{column} = ?")
+                params.append(encode(term))
+
+        c = _identifier(context)
+        if c is not None:
+            clauses.append("c = ?")
+            params.append(c)
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+        return where, params
+
+    def _hasGraph(self, c: str) -> bool:
+        # Always there, also when empty. Read at call time, as main.py sets
+        # its own default graph
+        if c == URIRef(rdflib.graph.DATASET_DEFAULT_GRAPH_ID).n3():
+            return True
+
+        row = self.db.execute(
+            "SELECT 1 FROM graphs WHERE c = ? UNION ALL "
+            "SELECT 1 FROM quads WHERE c = ? LIMIT 1", (c, c)).fetchone()
+        return row is not None
+
+    def _graph(self, c: str):
+        return Graph(store=self, identifier=decode(c))
+
+    def triples(self, triple_pattern, context=None):
+
+        where, params = self._where(triple_pattern, context)
+
+        if context is not None:
+            graph = context if isinstance(context, Graph) else self._graph(
+                _identifier(context))
+            for s, p, o in self.db.execute(
+                    f"SELECT s, p, o FROM quads{where}", params).fetchall():
+                yield (decode(s), decode(p), decode(o)), iter([graph])
+        else:
+            rows = self.db.execute(
+                f"SELECT s, p, o, c FROM quads{where} ORDER BY s, p, o",
+                params).fetchall()
+            for (s, p, o), group in groupby(rows, key=lambda r: r[:3]):
+                graphs = [self._graph(r[3]) for r in group]
+                yield (decode(s), decode(p), decode(o)), iter(graphs)
+
+    def __len__(self, context=None):
+        if context is not None:
+            (n, ), = self.db.execute("SELECT COUNT(*) FROM quads WHERE c = ?",
+                                     (_identifier(context), ))
+        else:
+            (n, ), = self.db.execute(
+                "SELECT COUNT(*) FROM (SELECT DISTINCT s, p, o FROM quads)")
+        return n
+
+    def contexts(self, triple=None):
+        if triple is None:
+            rows = self.db.execute(
+                "SELECT c FROM graphs UNION SELECT DISTINCT c FROM quads")
+        else:
+            where, params = self._where(triple)
+            rows = self.db.execute(f"SELECT DISTINCT c FROM quads{where}",
+                                   params)
+
+        for c, in rows.fetchall():
+            yield self._graph(c)
+
+    ##############
+    # Namespaces #
+    ##############
+
+    def bind(self, prefix: str, namespace, override: bool = True):
+        if self.readonly:
+            return
+
+        if override:
+            self.db.execute("DELETE FROM namespaces WHERE uri = ?",
+                            (str(namespace), ))
+            self.db.execute("INSERT OR REPLACE INTO namespaces VALUES (?, ?)",
+                            (prefix, str(namespace)))
+        else:
+            self.db.execute("INSERT OR IGNORE INTO namespaces VALUES (?, ?)",
+                            (prefix, str(namespace)))
+        self._changed()
+
+    def namespace(self, prefix: str):
+        row = self.db.execute("SELECT uri FROM namespaces WHERE prefix = ?",
+                              (prefix, )).fetchone()
+        return URIRef(row[0]) if row else None
+
+    def prefix(self, namespace):
+        row = self.db.execute("SELECT prefix FROM namespaces WHERE uri = ?",
+                              (str(namespace), )).fetchone()
+        return row[0] if row else None
+
+    def namespaces(self):
+        for prefix, uri in self.db.execute(
+                "SELECT prefix, uri FROM namespaces").fetchall():
+            yield prefix, URIRef(uri)
+
+
+def openDataset(path: str = None,
+                readonly: bool = False,
+                overwrite: bool = False) -> Dataset:
+    """Open a `Dataset` in a SQLite file, or in memory if `path` is None.
+
+    Args:
+        path (str, optional): Path of the database file. Defaults to None.
+        readonly (bool, optional): Open an existing file read-only.
+        Defaults to False.
+        overwrite (bool, optional): Start with an empty database, removing
+        an existing file. Defaults to False.
+    """
+
+    if path is None:
+        return Dataset()
+
+    if overwrite and not readonly:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    return Dataset(store=SQLiteStore(path, readonly=readonly))
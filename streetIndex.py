@@ -0,0 +1,186 @@
+"""
+Approximate matching of street names against Adamlink.
+
+Streets that cannot be resolved exactly in `data/name2adamlink.json` often
+differ in historic spelling only (e.g. `Heerengracht` vs `Herengracht`). The
+`StreetIndex` is a trigram inverted index over the Adamlink names that
+returns the names within a small edit distance of a street, without scanning
+all names:
+
+    1. Candidates are generated from the postings of the rarest trigrams of
+       the street (prefix filter). A name within edit distance k shares at
+       least `len(grams) - k * 3` distinct trigrams with the street, so it
+       has to occur in at least one of these postings.
+    2. Candidates are filtered on length and trigram overlap, and only then
+       verified with a banded Levenshtein distance.
+
+Streets shorter than `minLength` (normalized) are not matched, and matches
+below `minConfidence` are dropped, as short names (e.g. `Op`) are within a
+few edits of many unrelated names.
+"""
+
+import re
+from collections import defaultdict
+
+from unidecode import unidecode
+
+Q = 3
+
+
+def normalizeStreet(street: str) -> str:
+    """Lowercased and accent-free street name with single spaces."""
+    street = unidecode(street).lower()
+    street = re.sub(r'[^a-z0-9 ]', '', street)
+    return ' '.join(street.split())
+
+
+def trigrams(s: str) -> set:
+    padded = '$' * (Q - 1) + s + '$' * (Q - 1)
+    return {padded[i:i + Q] for i in range(len(padded) - Q + 1)}
+
+
+def levenshtein(a: str, b: str, maxDistance: int) -> int:
+    """Edit distance of `a` and `b`, or `maxDistance + 1` if it exceeds
+    `maxDistance`."""
+
+    if abs(len(a) - len(b)) > maxDistance:
+        return maxDistance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        lo = max(1, i - maxDistance)
+        hi = min(len(b), i + maxDistance)
+        if lo > 1:
+            current[lo - 1] = maxDistance + 1
+        for j in range(lo, hi + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ca != b[j - 1]))
+        if hi < len(b):
+            current[hi + 1:] = [maxDistance + 1] * (len(b) - hi)
+        if min(current[lo - 1:hi + 1]) > maxDistance:
+            return maxDistance + 1
+        previous = current
+
+    return min(previous[-1], maxDistance + 1)
+
+
+class StreetIndex:
+    """Trigram index over a mapping of street name to URI (`name2adamlink`).
+
+    Args:
+        name2uri (dict): Street names and their URIs.
+        maxDistance (int, optional): Default edit distance budget. Defaults
+        to 2.
+        minLength (int, optional): Minimum length of a normalized street
+        name to match. Defaults to 5.
+        minConfidence (float, optional): Minimum confidence of a match.
+        Defaults to 0.8.
+        cacheSize (int, optional): Maximum number of cached searches, the
+        oldest are dropped first. Defaults to 100000.
+    """
+
+    def __init__(self,
+                 name2uri: dict,
+                 maxDistance: int = 2,
+                 minLength: int = 5,
+                 minConfidence: float = 0.8,
+                 cacheSize: int = 100000):
+        self.maxDistance = maxDistance
+        self.minLength = minLength
+        self.minConfidence = minConfidence
+        self.cacheSize = cacheSize
+
+        self.keys = []  # normalized names
+        self.uris = []  # per key, list of (name, uri)
+        self.grams = []  # per key, set of trigrams
+
+        key2index = {}
+        for name, uri in name2uri.items():
+            key = normalizeStreet(name)
+            if key not in key2index:
+                key2index[key] = len(self.keys)
+                self.keys.append(key)
+                self.uris.append([])
+                self.grams.append(trigrams(key))
+            self.uris[key2index[key]].append((name, uri))
+
+        self.postings = defaultdict(list)
+        self.byLength = defaultdict(list)
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(i)
+            self.byLength[len(self.keys[i])].append(i)
+
+        self.cache = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _candidates(self, key: str, grams: set, maxDistance: int):
+
+        threshold = len(grams) - maxDistance * Q
+
+        if threshold <= 0:
+            # Too short for the trigram filter, check names of similar length
+            for length in range(
+                    len(key) - maxDistance,
+                    len(key) + maxDistance + 1):
+                yield from self.byLength.get(length, ())
+            return
+
+        rarest = sorted(grams, key=lambda g: len(self.postings.get(g, ())))
+        seen = set()
+        for gram in rarest[:len(grams) - threshold + 1]:
+            for i in self.postings.get(gram, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                if abs(len(self.keys[i]) - len(key)) > maxDistance:
+                    continue
+                if len(grams & self.grams[i]) >= threshold:
+                    yield i
+
+    def search(self, street: str, maxDistance: int = None,
+               limit: int = 3) -> list:
+        """Adamlink names within `maxDistance` edits of `street`.
+
+        Returns:
+            list: Up to `limit` (name, uri, confidence) tuples, best first.
+            The confidence is one minus the edit distance relative to the
+            length of the longest of both names.
+        """
+
+        if maxDistance is None:
+            maxDistance = self.maxDistance
+
+        cacheKey = (street, maxDistance, limit)
+        if cacheKey in self.cache:
+            self.hits += 1
+            return self.cache[cacheKey]
+
+        self.misses += 1
+
+        key = normalizeStreet(street)
+        results = []
+
+        if len(key) >= self.minLength:
+            grams = trigrams(key)
+            for i in self._candidates(key, grams, maxDistance):
+                distance = levenshtein(key, self.keys[i], maxDistance)
+                if distance > maxDistance:
+                    continue
+                confidence = 1 - distance / max(len(key), len(self.keys[i]))
+                if confidence < self.minConfidence:
+                    continue
+                for name, uri in self.uris[i]:
+                    results.append((name, uri, round(confidence, 3)))
+
+        results.sort(key=lambda r: (-r[2], r[0]))
+        results = results[:limit]
+
+        if len(self.cache) >= self.cacheSize:
+            del self.cache[next(iter(self.cache))]
+        self.cache[cacheKey] = results
+
+        return results
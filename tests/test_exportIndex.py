@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from exportIndex import ExportIndex
+
+
+def notary(n: int, name: str, *others) -> dict:
+    return {
+        'id': n,
+        'uri': f"https://notarissennetwerk.nl/notaris/{n}",
+        'place': 'Leiden',
+        'title': None,
+        'firstName': name,
+        'patronym': None,
+        'lastName': 'Jansen',
+        'prefix': None,
+        'name': f"{name} Jansen",
+        'section_id': None,
+        'col_id': None,
+        'rep_id': None,
+        'name_variants': [],
+        'addresses': [],
+        'events': [],
+        'jobs': [{
+            'details': 'notaris',
+            'from': '1650',
+            'to': None
+        }],
+        'portrait': None,
+        'relations': [{
+            'type': 'broer van',
+            'id': other
+        } for other in others]
+    }
+
+
+NOTARIES = [
+    notary(1, 'Jean-Loüis', 2),
+    notary(2, 'Søren', 1, 3),
+    notary(3, 'Ĳsbrand', 2, 4),
+    notary(4, 'Jan'),
+]
+
+
+def write(path, lineEnding: str = '\n'):
+    text = json.dumps({'count': 4, 'notaries': NOTARIES},
+                      indent=2,
+                      ensure_ascii=False)
+    with open(path, 'w', encoding='utf-8', newline='') as outfile:
+        outfile.write(text.replace('\n', lineEnding))
+    return str(path)
+
+
+@pytest.mark.parametrize('lineEnding', ['\n', '\r\n'])
+def test_offsets(tmp_path, lineEnding):
+    path = write(tmp_path / 'export.json', lineEnding)
+    index = ExportIndex(path)
+
+    assert len(index) == 4
+    assert [index.get(n['id']) for n in NOTARIES] == NOTARIES
+    assert list(index.read([3, 1])) == [NOTARIES[2], NOTARIES[0]]
+
+    # From the index file
+    index = ExportIndex(path)
+    assert index.get(2) == NOTARIES[1]
+
+
+def test_subset(tmp_path):
+    index = ExportIndex(write(tmp_path / 'export.json'))
+
+    assert index.neighbourhood([1]) == {1}
+    assert index.neighbourhood([1], depth=2) == {1, 2, 3}
+    assert index.subset([3, 1]) == {'notaries': [NOTARIES[0], NOTARIES[2]]}
+    assert index.mentions([4]) == [(3, 'broer van', 4)]
+
+
+def test_subset_triples_are_in_full_run(tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    path = write(tmp_path / 'export.json', '\r\n')
+    with open(path, encoding='utf-8') as infile:
+        d = json.load(infile)
+
+    full = tmp_path / 'full.trig'
+    subset = tmp_path / 'subset.trig'
+    main.toRDF(d, str(full), canonical=True)
+    main.toRDFSubset(path, [1], str(subset), depth=1, canonical=True)
+
+    fullLines = set(full.read_text(encoding='utf-8').splitlines())
+    subsetLines = set(subset.read_text(encoding='utf-8').splitlines())
+
+    assert 'Søren' in subset.read_text(encoding='utf-8')
+    assert 'Ĳsbrand' not in subset.read_text(encoding='utf-8')
+    assert subsetLines < fullLines
@@ -0,0 +1,167 @@
+import datetime
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from rdflib import Dataset, Graph, Literal, URIRef, OWL, RDF
+
+from linkChecker import LinkChecker, collectLinks, schema, writeReport
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, body: bool):
+        Handler.requests.append((self.command, self.path, time.monotonic()))
+
+        if self.path == '/ok':
+            status = 200
+        elif self.path == '/missing':
+            status = 404
+        elif self.path == '/error':
+            status = 500
+        elif self.path == '/nohead':
+            status = 405 if self.command == 'HEAD' else 200
+        else:
+            status = 200
+
+        self.send_response(status)
+        self.send_header('Content-Length', '2' if body else '0')
+        self.end_headers()
+        if body:
+            self.wfile.write(b'ok')
+
+    def do_HEAD(self):
+        self.respond(False)
+
+    def do_GET(self):
+        self.respond(True)
+
+
+def check(base, paths, **options):
+    checker = LinkChecker(**options)
+    results = checker.check([base + path for path in paths])
+    return checker, {url[len(base):]: r for url, r in results.items()}
+
+
+def test_statuses(serve, tmp_path):
+    Handler.requests = []
+    base = serve(Handler)
+
+    _, results = check(base, ['/ok', '/missing', '/error'], rateLimit=0)
+
+    assert results['/ok']['status'] == 200
+    assert results['/missing']['status'] == 404
+    assert results['/error']['status'] == 500
+
+    report = tmp_path / 'broken.csv'
+    assert writeReport(results, str(report)) == 2
+
+
+def test_unreachable():
+    checker = LinkChecker(timeout=5)
+    results = checker.check(['http://127.0.0.1:9/'])
+
+    assert results['http://127.0.0.1:9/']['status'] is None
+
+
+def test_head_falls_back_on_get(serve):
+    Handler.requests = []
+    base = serve(Handler)
+
+    _, results = check(base, ['/nohead'], rateLimit=0)
+
+    assert results['/nohead']['status'] == 200
+    assert [r[0] for r in Handler.requests] == ['HEAD', 'GET']
+
+
+def test_throttling_per_host(serve):
+    Handler.requests = []
+    base = serve(Handler)
+
+    check(base, [f"/page{n}" for n in range(4)], rateLimit=10)
+
+    times = sorted(t for _, _, t in Handler.requests)
+    assert len(times) == 4
+    assert all(b - a >= 0.09 for a, b in zip(times, times[1:]))
+
+
+def test_cache_rechecks_failures(serve, tmp_path):
+    Handler.requests = []
+    base = serve(Handler)
+    cache = str(tmp_path / 'cache.json')
+
+    check(base, ['/ok', '/error'], cachePath=cache, rateLimit=0)
+
+    # Both are cached within the hour
+    Handler.requests = []
+    checker, _ = check(base, ['/ok', '/error'], cachePath=cache, rateLimit=0)
+    assert checker.cacheHits == 2
+    assert Handler.requests == []
+
+    # After that the failure is checked again, the success is not
+    checker, _ = check(base, ['/ok', '/error'],
+                       cachePath=cache,
+                       rateLimit=0,
+                       failureMaxAge=0)
+    assert checker.cacheHits == 1
+    assert [r[1] for r in Handler.requests] == ['/error']
+
+    old = datetime.datetime.now() - datetime.timedelta(days=8)
+    checker.cache[base + '/ok']['checked'] = old.isoformat()
+    assert not checker._isFresh(base + '/ok')
+
+
+def test_collect_links():
+    g = Graph()
+    person = URIRef('https://example.org/person/1')
+    g.add((person, schema.url,
+           Literal('https://archief.amsterdam/inventarissen/file/1')))
+    g.add((person, OWL.sameAs, URIRef('http://vocab.getty.edu/tgn/1')))
+    g.add((person, schema.url, Literal('not a link')))
+
+    assert collectLinks(g) == [
+        'http://vocab.getty.edu/tgn/1',
+        'https://archief.amsterdam/inventarissen/file/1'
+    ]
+
+
+def test_collect_links_of_converted_notary(tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    notary = {
+        'id': 1,
+        'uri': 'https://notarissennetwerk.nl/notaris/1',
+        'place': None,
+        'title': None,
+        'firstName': 'Jan',
+        'patronym': None,
+        'lastName': 'Jansen',
+        'prefix': None,
+        'name': 'Jan Jansen',
+        'section_id': None,
+        'col_id': None,
+        'rep_id': 9,
+        'name_variants': [],
+        'addresses': [],
+        'events': [],
+        'jobs': [],
+        'portrait': 'https://notarissennetwerk.nl/images/jan jansen.jpg',
+        'relations': []
+    }
+    target = str(tmp_path / 'notary.trig')
+    main.toRDF({'notaries': [notary]}, target, validate=False)
+
+    g = Dataset(default_union=True)
+    g.parse(target, format='trig')
+
+    portraits = list(g.subjects(RDF.type, schema.VisualArtwork))
+    assert len(portraits) == 1 and '/.well-known/genid/' in portraits[0]
+
+    assert collectLinks(g) == [
+        'https://notarissennetwerk.nl/images/jan%20jansen.jpg'
+    ]
@@ -0,0 +1,55 @@
+from rdflib import Namespace
+
+from mapping import (compileResource, Call, Const, Dates, Field, Resource,
+                     Template, Var)
+
+ex = Namespace('https://example.org/')
+
+
+class Thing:
+
+    def __init__(self, uri, **properties):
+        self.uri = uri
+        self.properties = properties
+
+
+def years(begin, end) -> tuple:
+    return int(begin), int(end)
+
+
+def test_compile_resource():
+    emit = compileResource(
+        Resource(Thing,
+                 Template(ex, '{id}-{n}'),
+                 dates=Dates(years, 'from', Field('to'), names=('begin',
+                                                              'end')),
+                 name=[Field('street'), Field('name', 'notary')],
+                 begin=Var('begin'),
+                 end=Var('end'),
+                 kind=Const('address'),
+                 upper=Call(str.upper, 'street'),
+                 place=Call('getPlace', 'street'),
+                 label=Template(None, '{name} ({end})')))
+
+    variables = {'n': 2, 'getPlace': {'Dam': ex.dam}.get}
+    thing = emit({
+        'street': 'Dam',
+        'from': '1650',
+        'to': '1660'
+    }, {
+        'id': 7,
+        'name': 'Jan'
+    }, variables)
+
+    assert thing.uri == ex['7-2']
+    assert thing.properties == {
+        'name': ['Dam', 'Jan'],
+        'begin': 1650,
+        'end': 1660,
+        'kind': 'address',
+        'upper': 'DAM',
+        'place': ex.dam,
+        'label': 'Jan (1660)'
+    }
+    assert (variables['begin'], variables['end']) == (1650, 1660)
+    assert emit.resource.cls is Thing
@@ -0,0 +1,62 @@
+import pytest
+
+
+def notary(n: int) -> dict:
+    return {
+        'id': n,
+        'uri': f"https://notarissennetwerk.nl/notaris/{n}",
+        'place': 'Leiden',
+        'title': None,
+        'firstName': 'Jan',
+        'patronym': None,
+        'lastName': f"Jansen{n}",
+        'prefix': None,
+        'name': f"Jan Jansen{n}",
+        'section_id': None,
+        'col_id': None,
+        'rep_id': None,
+        'name_variants': [],
+        'addresses': [{
+            'street': 'Keizersgracht',
+            'from': '1650',
+            'to': str(1660 + n % 2)
+        }],
+        'events': [{
+            'type': 'geboren',
+            'date': '1620-05-00',
+            'place': 'Amsterdam'
+        }],
+        'jobs': [{
+            'details': 'notaris',
+            'from': '1650',
+            'to': None
+        }],
+        'portrait': None,
+        'relations': []
+    }
+
+
+def test_chunked_cache_metrics(tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    report = main.toRDFChunked({'notaries': [notary(n) for n in range(7)]},
+                               str(tmp_path / 'notaries.trig'),
+                               chunkSize=2,
+                               validate=False,
+                               metricsTarget=str(tmp_path / 'notaries.prom'))
+    caches = report['metrics']['caches']
+
+    # The global caches are counted once, not again for every chunk
+    for name, fn in (('eventDates', main.eventDates), ('roleDates',
+                                                       main.roleDates)):
+        info = fn.cache_info()
+        assert caches[name] == {'hits': info.hits, 'misses': info.misses}
+
+    assert caches['placeLinks'] == {
+        'hits': main.placeIndex.hits,
+        'misses': main.placeIndex.misses
+    }
+
+    # The places are built once per chunk
+    assert caches['places']['misses'] == 4 * 2
@@ -0,0 +1,115 @@
+import json
+import sys
+
+from network import NetworkBuilder, RelationNetwork
+
+
+def network(*edges, nodes=()) -> RelationNetwork:
+    builder = NetworkBuilder({'vader van': 'https://example.org/father'})
+    for notaryId in nodes:
+        builder.addNode(notaryId)
+    for source, target, relationType in edges:
+        builder.addEdge(source, target, relationType)
+    return builder.build()
+
+
+def chain(*ids, relationType='opgevolgd door'):
+    return [(s, o, relationType) for s, o in zip(ids, ids[1:])]
+
+
+def test_csr():
+    n = network((30, 10, 'vader van'), (10, 20, 'broer van'),
+                (10, 30, 'zoon van'), nodes=[40])
+
+    assert list(n.nodes) == [10, 20, 30, 40]
+    assert n.relationTypes == ['broer van', 'vader van', 'zoon van']
+    assert n.properties == [None, 'https://example.org/father', None]
+    assert list(n.offsets) == [0, 2, 2, 3, 3]
+    assert list(n.targets) == [1, 2, 0]
+    assert list(n.types) == [0, 2, 1]
+    assert list(n.inOffsets) == [0, 1, 2, 3, 3]
+    assert list(n.sources) == [2, 0, 0]
+    assert n.edgeCount == 3
+
+    assert (n.outDegree(10), n.inDegree(10), n.degree(10)) == (2, 1, 2)
+    assert n.degree(40) == 0
+    assert n.neighbours(10) == [20, 30]
+    assert n.neighbours(10, relationTypes=['vader van']) == [30]
+
+
+def test_components():
+    n = network((1, 2, 'vader van'), (3, 2, 'broer van'), (4, 5, 'zoon van'),
+                nodes=[6])
+
+    assert n.components() == [[1, 2, 3], [4, 5], [6]]
+    assert n.components(relationTypes=['vader van', 'onbekend']) == [
+        [1, 2], [3], [4], [5], [6]
+    ]
+
+
+def test_bfs_and_shortest_path():
+    n = network(*chain(1, 2, 3, 4, relationType='broer van'),
+                (5, 1, 'vader van'), nodes=[6])
+
+    assert n.bfs(2) == {2: 0, 1: 1, 3: 1, 4: 2, 5: 2}
+    assert n.bfs(2, maxDepth=1) == {2: 0, 1: 1, 3: 1}
+    assert n.bfs(2, relationTypes=['vader van']) == {2: 0}
+
+    assert n.shortestPath(4, 5) == [4, 3, 2, 1, 5]
+    assert n.shortestPath(4, 5, relationTypes=['broer van']) == []
+    assert n.shortestPath(4, 6) == []
+    assert n.shortestPath(3, 3) == [3]
+
+
+def test_succession_chains():
+    n = network(*chain(1, 2, 3), (5, 4, 'opvolger van'),
+                (3, 4, 'opgevolgd door'), (9, 8, 'vader van'))
+
+    assert n.successionChains() == [[1, 2, 3, 4, 5]]
+
+    # A branch ends a chain, the chains after it start at the branch
+    n = network(*chain(1, 2, 3), *chain(2, 4, 5), *chain(6, 4))
+
+    assert n.successionChains() == [[1, 2], [2, 3], [2, 4], [4, 5], [6, 4]]
+
+    n = network(*chain(3, 1, 2, 3), (7, 7, 'opgevolgd door'))
+
+    assert n.successionChains() == [[1, 2, 3], [7]]
+
+
+def test_succession_chains_scale():
+    # A lattice of 19 pairs branches at every step, and has 2 ** 19 paths
+    edges = []
+    for i in range(1, 37, 2):
+        for j in (i, i + 1):
+            edges += [(j, i + 2, 'opgevolgd door'),
+                      (j, i + 3, 'opgevolgd door')]
+    n = network(*edges)
+
+    chains = n.successionChains()
+    assert len(chains) == len(edges)
+    assert sorted(tuple(c) for c in chains) == sorted(
+        (s, o) for s, o, _ in edges)
+
+    # A chain longer than the recursion limit
+    length = sys.getrecursionlimit() + 100
+    n = network(*chain(*range(length)))
+
+    assert n.successionChains() == [list(range(length))]
+
+
+def test_to_dict(tmp_path):
+    n = network(*chain(1, 2), (2, 3, 'vader van'))
+    target = str(tmp_path / 'network.json')
+    n.write(target)
+
+    with open(target) as infile:
+        data = json.load(infile)
+
+    assert data['metrics'] == {
+        'nodes': 3,
+        'edges': 2,
+        'components': 1,
+        'largestComponent': 3,
+        'successionChains': [[1, 2]]
+    }
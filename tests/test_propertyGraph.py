@@ -0,0 +1,46 @@
+import csv
+
+from propertyGraph import PropertyGraphWriter, stableId
+
+
+def rows(path):
+    with open(path, newline='', encoding='utf-8') as infile:
+        return list(csv.reader(infile))
+
+
+def test_relations_keep_their_type(tmp_path):
+    writer = PropertyGraphWriter(str(tmp_path))
+
+    a = writer.node('Person', 'https://example.org/person/1', name='A')
+    b = writer.node('Person', 'https://example.org/person/2', name='B')
+    assert writer.node('Person', 'https://example.org/person/1') == a
+
+    writer.relation('https://example.org/person/1', 'vader van',
+                    'https://example.org/person/2',
+                    'http://purl.org/vocab/relationship/parentOf')
+    writer.relation('https://example.org/person/1', 'had als klerk',
+                    'https://example.org/person/2', 'https://schema.org/knows')
+    writer.relation('https://example.org/person/1', 'zoon van',
+                    'https://example.org/person/3', 'https://schema.org/knows')
+
+    report = writer.close()
+
+    assert report['Person'] == 2
+    assert report['RELATION'] == 2
+    assert report['danglingRelations'] == 1
+
+    header, *relations = rows(tmp_path / 'RELATION.csv')
+    assert header[-1] == ':TYPE'
+    assert relations == [
+        [
+            str(a),
+            str(b), 'vader van',
+            'http://purl.org/vocab/relationship/parentOf', 'VADER_VAN'
+        ],
+        [
+            str(a),
+            str(b), 'had als klerk', 'https://schema.org/knows',
+            'HAD_ALS_KLERK'
+        ],
+    ]
+    assert a == stableId('https://example.org/person/1')
@@ -0,0 +1,58 @@
+import hashlib
+import os
+
+from rdflib import Dataset, Graph, Literal, URIRef
+
+from publish import canonicalLines, diffPath, publish, tripleLines
+
+GRAPH = URIRef('https://example.org/graph')
+PERSON = URIRef('https://example.org/person/1')
+NAME = URIRef('https://schema.org/name')
+
+
+def graph(*names) -> Graph:
+    g = Graph()
+    for name in names:
+        g.add((PERSON, NAME, Literal(name)))
+    return g
+
+
+def test_round_trip(tmp_path):
+    target = str(tmp_path / 'test.trig')
+    g = graph('Jan "de" Vries\nsr.', 'Piet\\')
+
+    result = publish(canonicalLines(g), target, GRAPH)
+
+    with open(target, 'rb') as infile:
+        data = infile.read()
+    assert result['checksum'] == f"sha256:{hashlib.sha256(data).hexdigest()}"
+    assert result['triples'] == 2
+    assert b'@prefix' not in data
+
+    ds = Dataset()
+    ds.parse(target, format='trig')
+    assert set(ds.graph(GRAPH)) == set(g)
+    assert not os.path.exists(diffPath(target))
+
+
+def test_diff_and_unchanged(tmp_path):
+    target = str(tmp_path / 'test.trig')
+
+    publish(canonicalLines(graph('Jan\nsr.', 'Piet')), target, GRAPH)
+    result = publish(canonicalLines(graph('Jan\nsr.', 'Klaas')), target,
+                     GRAPH)
+
+    assert result['changed']
+    assert (result['added'], result['removed']) == (1, 1)
+    with open(diffPath(target), encoding='utf-8') as infile:
+        assert infile.readlines() == [
+            f'+ <{PERSON}> <{NAME}> "Klaas" .\n',
+            f'- <{PERSON}> <{NAME}> "Piet" .\n',
+        ]
+    assert len(list(tripleLines(target))) == 2
+
+    result = publish(canonicalLines(graph('Jan\nsr.', 'Klaas')), target,
+                     GRAPH)
+
+    assert not result['changed']
+    assert not os.path.exists(diffPath(target))
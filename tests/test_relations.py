@@ -0,0 +1,113 @@
+from rdflib import Namespace
+
+from relations import RelationCollector, canonicalRelation
+
+ns = Namespace('https://example.org/person/')
+EX = Namespace('https://example.org/')
+
+rel2prop = {'vader van': EX.fatherOf, 'broer van': EX.brotherOf}
+rel2prop_inverse = {'vader van': EX.sonOf, 'broer van': EX.brotherOf}
+
+
+def collect(*mentions):
+    collector = RelationCollector(rel2prop, rel2prop_inverse, EX.relatedTo)
+    for mention in mentions:
+        collector.add(*mention)
+    relations = collector.resolve()
+    triples = collector.triples(relations, ns)
+    return relations, triples, collector.report(relations, triples)
+
+
+def test_canonical_relation():
+    assert canonicalRelation(2, 'zoon van', 1) == (1, 'vader van', 2)
+    assert canonicalRelation(1, 'vader van', 2) == (1, 'vader van', 2)
+    assert canonicalRelation(1, 'opvolger van', 2) == (2, 'opgevolgd door', 1)
+
+    assert canonicalRelation(2, 'broer van', 1) == (1, 'broer van', 2)
+    assert canonicalRelation(1, 'broer van', 2) == (1, 'broer van', 2)
+
+    # Unknown types keep their direction
+    assert canonicalRelation(2, 'buurman van', 1) == (2, 'buurman van', 1)
+
+
+def test_mentions_are_folded():
+    relations, triples, report = collect(('1', 'vader van', '2'),
+                                         ('2', 'zoon van', '1'),
+                                         ('2', 'broer van', '3'),
+                                         ('3', 'broer van', '2'))
+
+    assert relations == [(1, 'vader van', 2), (2, 'broer van', 3)]
+    assert list(triples) == [
+        (ns['1'], EX.fatherOf, ns['2']),
+        (ns['2'], EX.sonOf, ns['1']),
+        (ns['2'], EX.brotherOf, ns['3']),
+        (ns['3'], EX.brotherOf, ns['2']),
+    ]
+    assert report == {
+        'mentions': 4,
+        'selfRelations': 0,
+        'duplicateMentions': 2,
+        'conflicts': 0,
+        'superseded': 0,
+        'relations': 2,
+        'triples': 4,
+        'duplicateTriples': 0
+    }
+
+
+def test_self_relations_are_dropped():
+    relations, triples, report = collect(('1', 'vader van', '1'),
+                                         ('1', 'broer van', '2'))
+
+    assert relations == [(1, 'broer van', 2)]
+    assert (ns['1'], EX.fatherOf, ns['1']) not in triples
+    assert (report['mentions'], report['selfRelations']) == (2, 1)
+    assert report['relations'] == 1
+
+
+def test_conflicts():
+    # The relation with the most mentions wins
+    relations, triples, report = collect(('1', 'vader van', '2'),
+                                         ('2', 'zoon van', '1'),
+                                         ('2', 'vader van', '1'))
+
+    assert relations == [(1, 'vader van', 2)]
+    assert (ns['2'], EX.fatherOf, ns['1']) not in triples
+    assert (ns['1'], EX.sonOf, ns['2']) not in triples
+    assert (report['conflicts'], report['relations']) == (1, 1)
+    assert report['triples'] == 2
+
+    # On a tie, the relation that was added first wins
+    relations, triples, report = collect(('2', 'zoon van', '1'),
+                                         ('1', 'zoon van', '2'))
+
+    assert relations == [(1, 'vader van', 2)]
+    assert (report['conflicts'], report['relations']) == (1, 1)
+
+    relations, _, _ = collect(('1', 'zoon van', '2'), ('2', 'zoon van', '1'))
+
+    assert relations == [(2, 'vader van', 1)]
+
+
+def test_unspecified_is_superseded():
+    relations, triples, report = collect(('2', 'niet gespecificeerd', '1'),
+                                         ('1', 'broer van', '2'),
+                                         ('1', 'niet gespecificeerd', '3'))
+
+    assert relations == [(1, 'broer van', 2), (1, 'niet gespecificeerd', 3)]
+    assert list(triples) == [
+        (ns['1'], EX.brotherOf, ns['2']),
+        (ns['2'], EX.brotherOf, ns['1']),
+        (ns['1'], EX.relatedTo, ns['3']),
+        (ns['3'], EX.relatedTo, ns['1']),
+    ]
+    assert (report['superseded'], report['relations']) == (1, 2)
+
+
+def test_frozen():
+    collector = RelationCollector(rel2prop, rel2prop_inverse)
+    collector.add('1', 'vader van', '2')
+    collector.freeze()
+    collector.add('1', 'broer van', '3')
+
+    assert collector.resolve() == [(1, 'vader van', 2)]
@@ -0,0 +1,47 @@
+from snapshots import SnapshotStore
+
+
+def notary(i: int, name: str) -> dict:
+    return {'id': i, 'name': name, 'events': []}
+
+
+def test_deltas(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.sqlite'))
+
+    first = {'notaries': [notary(1, 'A'), notary(2, 'B')]}
+    second = {'notaries': [notary(1, 'A2')]}
+    third = {'notaries': [notary(1, 'A2'), notary(2, 'B')]}
+
+    assert store.add(first, date='2022-01-01') == {
+        'snapshot': 1,
+        'new': True,
+        'added': 2,
+        'changed': 0,
+        'unchanged': 0,
+        'removed': 0
+    }
+    assert store.add(second, date='2022-02-01') == {
+        'snapshot': 2,
+        'new': True,
+        'added': 0,
+        'changed': 1,
+        'unchanged': 0,
+        'removed': 1
+    }
+
+    # Removed and then added again with the same content
+    assert store.add(third, date='2022-03-01') == {
+        'snapshot': 3,
+        'new': True,
+        'added': 1,
+        'changed': 0,
+        'unchanged': 1,
+        'removed': 0
+    }
+    assert store.add(third)['new'] is False
+
+    assert store.export(date='2022-01-15') == first
+    assert store.export(snapshot=2) == second
+    assert store.export() == third
+
+    store.close()
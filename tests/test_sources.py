@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import os
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from sources import ChecksumError, SourceFetcher
+
+OLD = b'old version of the export, ' * 40
+NEW = b'new version of the export, ' * 50
+
+
+class Handler(BaseHTTPRequestHandler):
+    content = NEW
+    etag = '"new"'
+    honorIfRange = True
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status: int, body: bytes = b'', **headers):
+        self.send_response(status)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace('_', '-'), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        Handler.requests.append(dict(self.headers))
+        content = self.content
+
+        if self.headers.get('If-None-Match') == self.etag:
+            return self.send(304)
+
+        byteRange = self.headers.get('Range')
+        if byteRange and (self.headers.get('If-Range') == self.etag
+                          or not self.honorIfRange):
+            start = int(byteRange[len('bytes='):-1])
+            if start >= len(content):
+                return self.send(416,
+                                 Content_Range=f"bytes */{len(content)}")
+            return self.send(206,
+                             content[start:],
+                             Content_Range=(f"bytes {start}-"
+                                            f"{len(content) - 1}/"
+                                            f"{len(content)}"))
+
+        self.send(200, content)
+
+
+@pytest.fixture
+def server(serve):
+    Handler.content = NEW
+    Handler.etag = '"new"'
+    Handler.honorIfRange = True
+    Handler.requests = []
+    return serve(Handler)
+
+
+def fetch(server, directory, **source):
+    fetcher = SourceFetcher(str(directory), retries=1)
+    sources = {'export': dict({'url': server + '/export'}, **source)}
+    paths = asyncio.run(fetcher.fetchAll(sources))
+
+    with open(paths['export'], 'rb') as infile:
+        return fetcher, infile.read()
+
+
+def interrupted(directory, data: bytes, etag: str = None):
+    """A partial download, as left by an interrupted attempt."""
+
+    os.makedirs(directory / 'export', exist_ok=True)
+    with open(directory / 'export' / 'download.part', 'wb') as outfile:
+        outfile.write(data)
+    if etag:
+        with open(directory / 'export' / 'download.part.json', 'w') as f:
+            json.dump({'etag': etag, 'lastModified': None}, f)
+
+
+def test_not_modified(server, tmp_path):
+    fetch(server, tmp_path)
+    fetcher, content = fetch(server, tmp_path)
+
+    assert content == NEW
+    assert fetcher.notModified == 1
+    assert Handler.requests[-1]['If-None-Match'] == '"new"'
+    assert len(json.load(open(tmp_path / 'export' / 'versions.json'))) == 1
+
+
+def test_resume(server, tmp_path):
+    interrupted(tmp_path, NEW[:100], '"new"')
+
+    fetcher, content = fetch(server, tmp_path)
+
+    assert content == NEW
+    assert fetcher.resumed == 1
+    assert fetcher.downloaded == len(NEW) - 100
+    assert Handler.requests[-1]['Range'] == 'bytes=100-'
+    assert Handler.requests[-1]['If-Range'] == '"new"'
+    assert sorted(os.listdir(tmp_path / 'export')) == [
+        f"{hashlib.sha256(NEW).hexdigest()}.bin", 'versions.json'
+    ]
+
+
+def test_complete_partial(server, tmp_path):
+    interrupted(tmp_path, NEW, '"new"')
+
+    fetcher, content = fetch(server, tmp_path)
+
+    assert content == NEW
+    assert fetcher.downloaded == 0
+    assert len(Handler.requests) == 1
+
+
+def test_etag_changed(server, tmp_path):
+    interrupted(tmp_path, OLD[:100], '"old"')
+
+    fetcher, content = fetch(server, tmp_path)
+
+    assert content == NEW
+    assert fetcher.resumed == 0
+
+
+def test_etag_changed_if_range_ignored(server, tmp_path):
+    Handler.honorIfRange = False
+    interrupted(tmp_path, OLD[:100], '"old"')
+
+    fetcher, content = fetch(server, tmp_path)
+
+    assert content == NEW
+    assert fetcher.resumed == 0
+    assert 'Range' not in Handler.requests[-1]
+
+
+def test_stale_complete_partial(server, tmp_path):
+    Handler.honorIfRange = False
+    Handler.content = OLD[:500]
+    interrupted(tmp_path, OLD, '"old"')
+
+    _, content = fetch(server, tmp_path)
+
+    assert content == OLD[:500]
+    assert [r.get('Range') for r in Handler.requests] == [
+        f"bytes={len(OLD)}-", None
+    ]
+
+
+def test_partial_without_validator(server, tmp_path):
+    interrupted(tmp_path, OLD[:100])
+
+    fetcher, content = fetch(server, tmp_path)
+
+    assert content == NEW
+    assert 'Range' not in Handler.requests[-1]
+
+
+def test_checksum_mismatch(server, tmp_path):
+
+    with pytest.raises(ChecksumError):
+        fetch(server, tmp_path, sha256='0' * 64)
+
+    assert os.listdir(tmp_path / 'export') == []
+
+    _, content = fetch(server,
+                       tmp_path,
+                       sha256=hashlib.sha256(NEW).hexdigest())
+    assert content == NEW
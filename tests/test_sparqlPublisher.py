@@ -0,0 +1,131 @@
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from rdflib import Graph, Literal, URIRef
+
+from publish import canonicalLines, publish
+from sparqlPublisher import SparqlPublisher, UpdateError, statePath
+
+GRAPH = 'https://example.org/graph'
+PERSON = URIRef('https://example.org/person/1')
+NAME = URIRef('https://schema.org/name')
+
+
+class Handler(BaseHTTPRequestHandler):
+    queries = []
+    fail = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        query = self.rfile.read(int(self.headers['Content-Length']))
+        query = query.decode('utf-8')
+        Handler.queries.append(query)
+
+        status = 400 if self.fail and self.fail in query else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def server(serve):
+    Handler.queries = []
+    Handler.fail = None
+    return serve(Handler)
+
+
+def version(target: str, *names) -> dict:
+    g = Graph()
+    for name in names:
+        g.add((PERSON, NAME, Literal(name)))
+    return publish(canonicalLines(g), target, URIRef(GRAPH))
+
+
+def push(server, target: str, published: dict) -> dict:
+    Handler.queries = []
+    return SparqlPublisher(server + '/update', GRAPH).publish(target, published)
+
+
+def test_replace_then_diff(server, tmp_path):
+    target = str(tmp_path / 'test.trig')
+
+    result = push(server, target, version(target, 'Jan\nsr.', 'Piet'))
+
+    assert result['mode'] == 'replace'
+    assert result['inserted'] == 2
+    staging = f"<{GRAPH}#staging>"
+    assert Handler.queries[0] == f"DROP SILENT GRAPH {staging}"
+    assert Handler.queries[1].startswith(f"INSERT DATA {{ GRAPH {staging}")
+    assert '"Jan\\nsr."' in Handler.queries[1]
+    assert Handler.queries[2] == (f"MOVE SILENT GRAPH {staging} "
+                                  f"TO <{GRAPH}>")
+
+    result = push(server, target, version(target, 'Jan\nsr.', 'Klaas'))
+
+    assert result['mode'] == 'update'
+    assert (result['inserted'], result['deleted']) == (1, 1)
+    assert [q.split(' {')[0] for q in Handler.queries] == [
+        'DELETE DATA', 'INSERT DATA'
+    ]
+    assert '"Piet"' in Handler.queries[0]
+    assert '"Klaas"' in Handler.queries[1]
+
+    result = push(server, target, version(target, 'Jan\nsr.', 'Klaas'))
+
+    assert result['mode'] == 'unchanged'
+    assert Handler.queries == []
+
+
+def test_failed_push_replaces(server, tmp_path):
+    target = str(tmp_path / 'test.trig')
+    first = version(target, 'Jan', 'Piet')
+    push(server, target, first)
+
+    Handler.fail = '"Klaas"'
+    with pytest.raises(UpdateError):
+        push(server, target, version(target, 'Jan', 'Klaas'))
+
+    with open(statePath(target)) as infile:
+        state = json.load(infile)
+    assert state[f"{server}/update {GRAPH}"]['checksum'] == first['checksum']
+
+    # Unchanged locally, but the endpoint does not have this version
+    Handler.fail = None
+    result = push(server, target, version(target, 'Jan', 'Klaas'))
+    assert result['mode'] == 'replace'
+
+    # The diff of the next version starts from the version that was pushed
+    result = push(server, target, version(target, 'Jan', 'Kees'))
+    assert result['mode'] == 'update'
+
+
+def test_diff_from_other_version_replaces(server, tmp_path):
+    target = str(tmp_path / 'test.trig')
+    push(server, target, version(target, 'Jan'))
+
+    version(target, 'Jan', 'Piet')  # not pushed
+    result = push(server, target, version(target, 'Jan', 'Klaas'))
+
+    assert result['mode'] == 'replace'
+    assert result['inserted'] == 2
+
+
+def test_endpoint_needs_canonical_output(server, tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    target = tmp_path / 'test.trig'
+    with pytest.raises(ValueError):
+        main.main(loadData={'notaries': []},
+                  target=str(target),
+                  sparqlEndpoint=server + '/update')
+
+    # Before the conversion
+    assert not target.exists()
+    assert Handler.queries == []
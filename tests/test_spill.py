@@ -0,0 +1,135 @@
+import pytest
+from rdflib import Dataset, Graph, Literal, Namespace, URIRef, XSD
+from rdflib.compare import isomorphic
+
+from spill import ChunkSpill, tripleLine
+
+ex = Namespace('https://example.org/')
+graph = URIRef('https://example.org/graph/')
+
+
+def chunkGraphs() -> list:
+    first = Graph()
+    first.add((ex.a, ex.note, Literal('line 1\nline 2\r\n"quoted" \\ end')))
+    first.add((ex.a, ex.name, Literal('Jan', lang='nl')))
+    first.add((ex.a, ex.place, ex.amsterdam))
+
+    second = Graph()
+    second.add((ex.b, ex.note, Literal('"""\n"""', lang='nl')))
+    second.add((ex.b, ex.date, Literal('1650', datatype=XSD.gYear)))
+    second.add((ex.b, ex.place, ex.amsterdam))
+
+    return [first, second]
+
+
+def union(graphs) -> Graph:
+    g = Graph()
+    for chunk in graphs:
+        g += chunk
+    return g
+
+
+def parse(path) -> Graph:
+    ds = Dataset()
+    ds.parse(path, format='trig')
+    return union(ds.graphs())
+
+
+def test_triple_line_is_one_line():
+    for chunk in chunkGraphs():
+        for triple in chunk:
+            line = tripleLine(*triple)
+            assert line.count('\n') == 1 and line.endswith(' .\n')
+
+
+def test_merge_round_trip(tmp_path):
+    graphs = chunkGraphs()
+
+    spill = ChunkSpill(str(tmp_path / 'spill'), shared=(ex.amsterdam, ))
+    for chunk in graphs:
+        spill.write(chunk)
+    spill.merge(str(tmp_path / 'out.trig'), graph)
+
+    assert spill.duplicates == 0
+    assert isomorphic(parse(str(tmp_path / 'out.trig')), union(graphs))
+    spill.close()
+
+
+def test_sorted_lines_round_trip(tmp_path):
+    graphs = chunkGraphs()
+
+    spill = ChunkSpill(str(tmp_path / 'spill'))
+    for chunk in graphs:
+        spill.write(chunk)
+
+    lines = list(spill.lines())
+    assert lines == sorted(lines)
+    assert len(lines) == len(union(graphs))
+
+    path = tmp_path / 'out.trig'
+    path.write_text(f"<{graph}> {{\n" + "".join(lines) + "}\n",
+                    encoding='utf-8')
+
+    assert isomorphic(parse(str(path)), union(graphs))
+    spill.close()
+
+
+def test_lines_across_chunks_are_distinct(tmp_path):
+    first, second = chunkGraphs()
+    second.add((ex.a, ex.name, Literal('Jan', lang='nl')))
+
+    spill = ChunkSpill(str(tmp_path / 'spill'))
+    spill.write(first)
+    spill.write(second)
+
+    lines = list(spill.lines())
+    assert len(lines) == len(set(lines)) == len(first + second)
+    assert (spill.triples, spill.mergedDuplicates) == (len(lines), 1)
+    spill.close()
+
+
+def notary(n: int) -> dict:
+    return {
+        'id': n,
+        'uri': f"https://notarissennetwerk.nl/notaris/{n}",
+        'place': 'Leiden',
+        'title': None,
+        'firstName': 'Jan',
+        'patronym': None,
+        'lastName': f"Jansen{n}",
+        'prefix': None,
+        'name': f"Jan Jansen{n}",
+        'section_id': None,
+        'col_id': None,
+        'rep_id': None,
+        'name_variants': [],
+        'addresses': [],
+        'events': [],
+        'jobs': [{
+            'details': 'notaris',
+            'from': '1650',
+            'to': None
+        }],
+        'portrait': 'https://example.org/portrait.jpg',
+        'relations': [{
+            'type': 'broer van',
+            'id': (n + 1) % 5
+        }]
+    }
+
+
+def test_chunked_output_is_the_full_output(tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    d = {'notaries': [notary(n) for n in range(5)]}
+
+    full = main.toRDF(d, str(tmp_path / 'full.trig'), canonical=True)
+    chunked = main.toRDFChunked(d,
+                                str(tmp_path / 'chunked.trig'),
+                                chunkSize=2,
+                                canonical=True)
+
+    assert chunked['chunks']['mergedDuplicates'] > 0
+    assert chunked['publish']['triples'] == full['publish']['triples']
+    assert chunked['publish']['checksum'] == full['publish']['checksum']
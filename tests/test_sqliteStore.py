@@ -0,0 +1,54 @@
+import pytest
+import rdflib.graph
+from rdflib import Literal, Namespace, URIRef
+
+from sqliteStore import openDataset
+
+GRAPH = URIRef('https://example.org/graph')
+PERSON = URIRef('https://example.org/person/1')
+NAME = URIRef('https://schema.org/name')
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'test.sqlite')
+
+    ds = openDataset(path, overwrite=True)
+    ds.graph(GRAPH).add((PERSON, NAME, Literal('Jan "de" Vries\nsr.')))
+    ds.store.close()
+
+    return path
+
+
+def test_reopen_readonly_graph_query(database):
+    ds = openDataset(database, readonly=True)
+
+    rows = list(
+        ds.query("SELECT ?g ?name WHERE { GRAPH ?g { ?s ?p ?name } }"))
+    assert [(g, name) for g, name in rows
+            ] == [(GRAPH, Literal('Jan "de" Vries\nsr.'))]
+
+    g = ds.graph(GRAPH)
+    assert len(g) == 1
+    assert ds.get_graph(GRAPH) is not None
+
+
+def test_readonly_with_own_default_graph(database, monkeypatch):
+    # As set by main.py
+    monkeypatch.setattr(rdflib.graph, 'DATASET_DEFAULT_GRAPH_ID',
+                        Namespace('https://example.org/'))
+
+    ds = openDataset(database, readonly=True)
+
+    rows = list(ds.query("SELECT ?g WHERE { GRAPH ?g { ?s ?p ?o } }"))
+    assert [g for g, in rows] == [GRAPH]
+
+
+def test_readonly_rejects_writes(database):
+    ds = openDataset(database, readonly=True)
+
+    with pytest.raises(PermissionError):
+        ds.graph(URIRef('https://example.org/other'))
+
+    with pytest.raises(PermissionError):
+        ds.graph(GRAPH).add((PERSON, NAME, Literal('Piet')))
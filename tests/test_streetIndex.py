@@ -0,0 +1,55 @@
+from streetIndex import StreetIndex, levenshtein
+
+NAME2URI = {
+    'Herengracht': 'https://adamlink.nl/geo/street/herengracht/1768',
+    'Keizersgracht': 'https://adamlink.nl/geo/street/keizersgracht/2337',
+    'Buurt O': 'https://adamlink.nl/geo/district/buurt-o/1',
+    'Buurt P': 'https://adamlink.nl/geo/district/buurt-p/1',
+}
+
+
+def test_levenshtein():
+    assert levenshtein('heerengracht', 'herengracht', 2) == 1
+    assert levenshtein('abc', 'xyzxyz', 2) == 3
+
+
+def test_spelling_variant():
+    index = StreetIndex(NAME2URI)
+    results = index.search('Heerengracht')
+
+    assert results[0][:2] == ('Herengracht', NAME2URI['Herengracht'])
+    assert results[0][2] >= 0.8
+
+
+def test_short_names_are_not_matched():
+    index = StreetIndex(NAME2URI)
+
+    assert index.search('Op') == []
+    assert index.search('Op de') == []
+
+
+def test_confidence_floor():
+    index = StreetIndex(NAME2URI, minConfidence=0.9)
+
+    assert index.search('Kijzersgraght') == []
+    assert index.search('Keizersgraght')[0][0] == 'Keizersgracht'
+
+
+def test_cache_counts():
+    index = StreetIndex(NAME2URI)
+    index.search('Heerengracht')
+    index.search('Heerengracht')
+
+    assert (index.hits, index.misses) == (1, 1)
+
+
+def test_cache_is_bounded():
+    index = StreetIndex(NAME2URI, cacheSize=2)
+    for street in ('Heerengracht', 'Keizersgraght', 'Buurt P'):
+        index.search(street)
+
+    assert len(index.cache) == 2
+    assert ('Heerengracht', 2, 3) not in index.cache
+
+    index.search('Buurt P')
+    assert index.hits == 1
@@ -0,0 +1,139 @@
+import re
+
+import pytest
+
+from validator import (compileRules, ValidationReport, Ordered, Required,
+                       Valid)
+
+YEAR = re.compile(r"\d{4}")
+
+RULES = [
+    Required(None, 'id'),
+    Valid('jobs', 'from', YEAR.fullmatch),
+    Valid('jobs', 'to', YEAR.fullmatch),
+    Ordered('jobs', 'from', 'to'),
+]
+
+validate = compileRules('validate', RULES)
+
+
+def test_values_of_other_types():
+    report = ValidationReport(RULES)
+
+    validate(
+        {
+            'id': 1,
+            'jobs': [
+                {'from': 1650, 'to': '1660'},
+                {'from': 1670, 'to': 1660},
+                {'from': ['1650'], 'to': None},
+            ]
+        }, report)
+
+    result = report.report()
+    assert result['violations'] == 2
+    assert result['rules']['jobs.from-to.ordered']['examples'] == [{
+        'notary': 1,
+        'path': 'jobs[2]',
+        'value': [1670, 1660]
+    }]
+    assert result['rules']['jobs.from.valid']['examples'] == [{
+        'notary': 1,
+        'path': 'jobs[3]',
+        'value': ['1650']
+    }]
+
+
+def notary(n: int, events=(), relations=(), jobs=()) -> dict:
+    return {
+        'id': n,
+        'uri': f"https://notarissennetwerk.nl/notaris/{n}",
+        'place': None,
+        'title': None,
+        'firstName': 'Jan',
+        'patronym': None,
+        'lastName': 'Jansen',
+        'prefix': None,
+        'name': 'Jan Jansen',
+        'section_id': None,
+        'col_id': None,
+        'rep_id': None,
+        'name_variants': [],
+        'addresses': [],
+        'events': [{
+            'type': t,
+            'date': date,
+            'place': None
+        } for t, date in events],
+        'jobs': [{
+            'details': 'notaris',
+            'from': begin,
+            'to': end
+        } for begin, end in jobs],
+        'portrait': None,
+        'relations': [{
+            'type': t,
+            'id': other
+        } for t, other in relations]
+    }
+
+
+def test_lifespan():
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    def lifespan(birth, death):
+        return main.lifespan(
+            notary(1, [('geboren', birth), ('overlijden', death)]))
+
+    assert lifespan('1670-01-02', '1650-05-00') == ['1670-01-02', '1650-05-00']
+    assert lifespan(1670, '1650') == [1670, '1650']
+    assert lifespan('1650-01-02', '1650-05-00') is None
+    assert lifespan('1670', None) is None
+
+    # Invalid dates are only reported as invalid
+    assert lifespan('16xx', '1650-05-00') is None
+    assert lifespan('1670', '1650-13-00') is None
+
+
+def test_relation_without_id(tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    d = {
+        'notaries': [
+            notary(1, relations=[('broer van', None), ('broer van', 2)]),
+            notary(2, events=[('geboren', '16xx'), ('overlijden', '1650')])
+        ]
+    }
+    report = main.toRDF(d, str(tmp_path / 'test.trig'))
+
+    assert report['relations']['mentions'] == 1
+    assert report['relations']['relations'] == 1
+
+    rules = report['validation']['rules']
+    assert rules['relations.id.required']['examples'] == [{
+        'notary': 1,
+        'path': 'relations[1]',
+        'value': None
+    }]
+    assert rules['events.date.valid']['count'] == 1
+    assert 'notary.lifespan.ordered' not in rules
+
+
+def test_unhashable_dates(tmp_path):
+    pytest.importorskip('rdfalchemy')
+    import main
+
+    d = {
+        'notaries': [
+            notary(1,
+                   events=[('geboren', ['1620'])],
+                   jobs=[(['1650'], '1660')])
+        ]
+    }
+    report = main.toRDF(d, str(tmp_path / 'test.trig'))
+
+    rules = report['validation']['rules']
+    assert rules['events.date.valid']['examples'][0]['value'] == ['1620']
+    assert rules['jobs.from.valid']['examples'][0]['value'] == ['1650']
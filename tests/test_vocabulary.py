@@ -0,0 +1,22 @@
+from rdflib import Literal, Namespace, RDFS
+
+from vocabulary import Vocabulary
+
+ex = Namespace('https://example.org/')
+
+
+def test_lines_are_single_lines():
+    vocabulary = Vocabulary([
+        (ex.a, RDFS.label, Literal('line 1\nline 2 "quoted" \\', lang='nl')),
+        (ex.a, RDFS.label, Literal('line 1\nline 2 "quoted" \\', lang='nl')),
+        (ex.b, RDFS.subPropertyOf, ex.knows),
+    ])
+
+    assert len(vocabulary) == 2
+    assert vocabulary.lines == (
+        '<https://example.org/a> <http://www.w3.org/2000/01/rdf-schema#label>'
+        ' "line 1\\nline 2 \\"quoted\\" \\\\"@nl .\n',
+        '<https://example.org/b> '
+        '<http://www.w3.org/2000/01/rdf-schema#subPropertyOf> '
+        '<https://example.org/knows> .\n',
+    )
@@ -0,0 +1,326 @@
+"""
+Data-quality checks of the notaries in the export.
+
+A rule set declares shape-style checks of the notary records and of the
+records in their lists (`events`, `addresses`, ...): required fields, valid
+values, known vocabulary, date ordering and mapping coverage (no fields that
+the mapping does not know):
+
+```python
+RULES = [
+    Required(None, 'name'),
+    Known('events', 'type', type2class),
+    Ordered('jobs', 'from', 'to'),
+]
+```
+
+`compileRules` compiles the rules once into a single function that checks a
+notary with inline expressions, looping over every list only once, so that
+it can run in the conversion loop at negligible cost (see
+`main.NOTARY_RULES`). Violations are collected in a `ValidationReport`, with
+counts and the first examples per rule.
+"""
+
+from collections import Counter
+from itertools import count
+
+
+def partialDate(dateString):
+    """An ISO date, or the known part of it, or None if unknown. Other
+    values than strings (e.g. a year as a number) are taken as strings.
+
+    >>> partialDate('1650-05-00')
+    '1650-05'
+    >>> partialDate(1650)
+    '1650'
+    >>> partialDate('0000-00-00') is None
+    True
+    """
+
+    if not dateString:
+        return None
+
+    dateString = str(dateString)
+    if dateString.startswith('0000'):
+        return None
+
+    while dateString.endswith('-00'):
+        dateString = dateString[:-3]
+
+    return dateString
+
+
+def after(start, end) -> bool:
+    """Whether (partial) date `start` is certainly after `end`.
+
+    >>> after('1670', '1650-05-00')
+    True
+    >>> after('1650', '1650-05-00')
+    False
+    """
+
+    start = partialDate(start)
+    end = partialDate(end)
+
+    if not start or not end:
+        return False
+
+    n = min(len(start), len(end))
+    return start[:n] > end[:n]
+
+
+#########
+# Rules #
+#########
+
+
+class Rule:
+    """A check of every record in `scope` (a list field of the notary), or
+    of the notary itself if `scope` is None.
+
+    `test` gives the expression that is true for a violation, and `value`
+    the expression of the value that is reported with it.
+    """
+
+    def __init__(self, name: str, scope: str = None, message: str = ''):
+        self.name = name
+        self.scope = scope
+        self.message = message
+
+    def test(self, record: str, compiler) -> str:
+        raise NotImplementedError
+
+    def value(self, record: str, compiler) -> str:
+        return "None"
+
+    def compile(self, record: str, compiler) -> tuple:
+        return self.test(record, compiler), self.value(record, compiler)
+
+
+class Required(Rule):
+    """Field `field` should have a value."""
+
+    def __init__(self, scope: str, field: str, message: str = ''):
+        super().__init__(f"{scope or 'notary'}.{field}.required", scope,
+                         message or f"No {field}")
+        self.field = field
+
+    def test(self, record, compiler):
+        return f"not {record}.get({self.field!r})"
+
+
+class Valid(Rule):
+    """The value of field `field`, if any, should pass `fn`. The value is
+    passed as a string, so that values of another type (e.g. a year as a
+    number) are checked as the conversion reads them, instead of making `fn`
+    raise."""
+
+    def __init__(self, scope: str, field: str, fn, message: str = ''):
+        super().__init__(f"{scope or 'notary'}.{field}.valid", scope,
+                         message or f"Invalid {field}")
+        self.field = field
+        self.fn = fn
+
+    def test(self, record, compiler):
+        value = f"{record}.get({self.field!r})"
+        return (f"{value} and not "
+                f"{compiler.constant(self.fn)}(str({value}))")
+
+    def value(self, record, compiler):
+        return f"{record}[{self.field!r}]"
+
+
+class Known(Rule):
+    """The value of field `field` should be one of `values`."""
+
+    def __init__(self, scope: str, field: str, values, message: str = ''):
+        super().__init__(f"{scope or 'notary'}.{field}.known", scope,
+                         message or f"Unknown {field}")
+        self.field = field
+        self.values = frozenset(values)
+
+    def test(self, record, compiler):
+        return (f"{record}.get({self.field!r}) "
+                f"not in {compiler.constant(self.values)}")
+
+    def value(self, record, compiler):
+        return f"{record}.get({self.field!r})"
+
+
+class Ordered(Rule):
+    """The (partial) date in field `start` should not be after the one in
+    field `end`."""
+
+    def __init__(self, scope: str, start: str, end: str, message: str = ''):
+        super().__init__(f"{scope or 'notary'}.{start}-{end}.ordered", scope,
+                         message or f"{start} after {end}")
+        self.start = start
+        self.end = end
+
+    def test(self, record, compiler):
+        return (f"{compiler.constant(after)}({record}.get({self.start!r}), "
+                f"{record}.get({self.end!r}))")
+
+    def value(self, record, compiler):
+        return f"[{record}[{self.start!r}], {record}[{self.end!r}]]"
+
+
+class Covered(Rule):
+    """The record should have no other fields than `fields`, so that all of
+    its data is mapped."""
+
+    def __init__(self, scope: str, fields, message: str = ''):
+        super().__init__(f"{scope or 'notary'}.covered", scope, message or
+                         "Fields that are not in the mapping")
+        self.fields = frozenset(fields)
+
+    def test(self, record, compiler):
+        return f"not {compiler.constant(self.fields)}.issuperset({record})"
+
+    def value(self, record, compiler):
+        return f"sorted(set({record}) - {compiler.constant(self.fields)})"
+
+
+class Check(Rule):
+    """A check of the whole record by `fn`, which returns the reported value
+    for a violation and None otherwise."""
+
+    def __init__(self, name: str, scope: str, fn, message: str = ''):
+        super().__init__(name, scope, message)
+        self.fn = fn
+
+    def compile(self, record, compiler):
+        value = compiler.local('value')
+        return (f"({value} := {compiler.constant(self.fn)}({record})) "
+                "is not None", value)
+
+
+############
+# Compiler #
+############
+
+
+class Compiler:
+    """Collects the lines of the generated source, and the Python objects
+    (functions, sets) it refers to as constants."""
+
+    def __init__(self):
+        self.constants = {}
+        self.names = {}
+        self.lines = []
+        self.depth = 1
+        self.counter = count()
+
+    def constant(self, value) -> str:
+        if value is None or type(value) in (str, int, bool):
+            return repr(value)
+
+        key = id(value)
+        if key not in self.names:
+            self.names[key] = f"_c{len(self.names)}"
+            self.constants[self.names[key]] = value
+        return self.names[key]
+
+    def local(self, prefix: str) -> str:
+        return f"_{prefix}{next(self.counter)}"
+
+    def emit(self, line: str, indent: int = 0):
+        self.lines.append("    " * (self.depth + indent) + line)
+
+
+##########
+# Report #
+##########
+
+
+class ValidationReport:
+    """Violations of a rule set.
+
+    Args:
+        rules (list): The rules.
+        examples (int, optional): Number of examples kept per rule. Defaults
+        to 10.
+    """
+
+    def __init__(self, rules: list, examples: int = 10):
+        self.messages = {rule.name: rule.message for rule in rules}
+        self.maxExamples = examples
+
+        self.notaries = 0
+        self.counts = Counter()
+        self.examples = {}
+
+    def add(self, rule: str, notary, scope: str, n: int, value):
+        """Add a violation of `rule` by record `n` (from 1) in `scope` of
+        `notary`."""
+
+        self.counts[rule] += 1
+
+        examples = self.examples.setdefault(rule, [])
+        if len(examples) < self.maxExamples:
+            examples.append({
+                'notary': notary,
+                'path': f"{scope}[{n}]" if scope else None,
+                'value': value
+            })
+
+    def report(self) -> dict:
+        return {
+            'notaries': self.notaries,
+            'violations': sum(self.counts.values()),
+            'rules': {
+                rule: {
+                    'message': self.messages[rule],
+                    'count': count,
+                    'examples': self.examples[rule]
+                }
+                for rule, count in sorted(self.counts.items())
+            }
+        }
+
+
+def compileRules(name: str, rules: list):
+    """Compile rules into a function `name(notary, report)` that adds the
+    violations of a notary to a `ValidationReport`.
+
+    Returns:
+        function: The compiled function.
+    """
+
+    compiler = Compiler()
+    compiler.emit(f"def {name}(notary, report):", -1)
+    compiler.emit("report.notaries += 1")
+    compiler.emit("notaryId = notary.get('id')")
+
+    scopes = {}
+    for rule in rules:
+        scopes.setdefault(rule.scope, []).append(rule)
+
+    for scope, scopeRules in scopes.items():
+        if scope is None:
+            record, n = 'notary', 'None'
+        else:
+            record, n = 'r', 'n'
+            compiler.emit(f"for n, r in enumerate("
+                          f"notary.get({scope!r}) or (), 1):")
+            compiler.depth += 1
+
+        for rule in scopeRules:
+            test, value = rule.compile(record, compiler)
+            compiler.emit(f"if {test}:")
+            compiler.emit(
+                f"report.add({rule.name!r}, notaryId, {scope!r}, {n}, "
+                f"{value})", 1)
+
+        if scope is not None:
+            compiler.depth -= 1
+
+    source = "\n".join(compiler.lines) + "\n"
+
+    namespace = dict(compiler.constants)
+    exec(compile(source, f"<rules {name}>", 'exec'), namespace)
+
+    function = namespace[name]
+    function.source = source
+
+    return function
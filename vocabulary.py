@@ -0,0 +1,43 @@
+"""
+Static vocabulary of the conversion.
+
+Some triples are the same in every run: the `sem:EventType` resources of the
+event types and the `rdfs:subPropertyOf schema:knows` axioms of the relation
+properties. `Vocabulary` builds them once per process, directly as rdflib
+terms (without rdfalchemy), and keeps them both as triples and as
+pre-serialized N-Triples lines. A conversion adds the triples to its graph
+(`addTo`), and the chunked conversion writes the lines once into the output
+instead of having every chunk regenerate them (see `main.VOCABULARY`).
+"""
+
+from spill import tripleLine
+
+
+class Vocabulary:
+    """A fixed set of triples, with interned terms.
+
+    Args:
+        triples (iterable): (subject, predicate, object) triples.
+    """
+
+    def __init__(self, triples):
+
+        terms = {}
+
+        def intern(term):
+            return terms.setdefault(term, term)
+
+        # Interned, so that every triple refers to the same term objects
+        self.triples = tuple(
+            dict.fromkeys(
+                (intern(s), intern(p), intern(o)) for s, p, o in triples))
+        self.terms = len(terms)
+
+        self.lines = tuple(sorted(tripleLine(*t) for t in self.triples))
+
+    def __len__(self) -> int:
+        return len(self.triples)
+
+    def addTo(self, g):
+        """Add the triples to graph `g`."""
+        g.addN((s, p, o, g) for s, p, o in self.triples)